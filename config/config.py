@@ -4,16 +4,67 @@ from typing import Dict, List, Any
 # Ollama Configuration
 OLLAMA_BASE_URL = "http://llm-eva.univ-pau.fr:11434"
 DEFAULT_MODEL = "gemma3:12b"
-EMBEDDING_MODEL = "nomic-embed-text:latest"  # NOTE: Not used - ChromaDB handles embeddings internally
+EMBEDDING_MODEL = "nomic-embed-text:latest"  # Used by the persistent RAG system's Nomic embedding function
+EMBEDDING_BATCH_SIZE = 32  # Texts per Ollama embedding request
+EMBEDDING_MAX_CONCURRENCY = 4  # Embedding batches in flight at once
+EMBEDDING_MAX_RETRIES = 3  # Attempts per batch before falling back to zero vectors
+
+# Shared LLM gateway (src/services/llm_gateway.py): one keep-alive connection pool
+# to Ollama for every component. Requests in flight are limited per model, starting
+# at LLM_GATEWAY_DEFAULT_CONCURRENCY (LLM_GATEWAY_MODEL_CONCURRENCY overrides it for
+# a model); transient failures are retried with jittered exponential backoff. With
+# LLM_GATEWAY_SINGLE_FLIGHT, concurrent identical requests share one generation.
+LLM_GATEWAY_MAX_CONNECTIONS = 16
+LLM_GATEWAY_KEEPALIVE_SECONDS = 120
+LLM_GATEWAY_CONNECT_TIMEOUT_SECONDS = 10
+LLM_GATEWAY_TIMEOUT_SECONDS = 300  # Read timeout, covers a whole non-streamed generation
+LLM_GATEWAY_DEFAULT_CONCURRENCY = 4
+LLM_GATEWAY_MODEL_CONCURRENCY = {"nomic-embed-text:latest": 8}
+LLM_GATEWAY_MAX_RETRIES = 3
+LLM_GATEWAY_RETRY_BASE_DELAY = 0.5
+LLM_GATEWAY_SINGLE_FLIGHT = True
+
+# Adaptive (AIMD) concurrency: a model's limit grows while its p95 latency stays
+# within LLM_GATEWAY_LATENCY_TOLERANCE x its baseline and is multiplied by
+# LLM_GATEWAY_BACKOFF_RATIO on timeouts, overload responses or latency inflation.
+# Disable to keep the starting limits fixed.
+LLM_GATEWAY_ADAPTIVE_CONCURRENCY = True
+LLM_GATEWAY_MAX_CONCURRENCY = 32
+LLM_GATEWAY_LATENCY_TOLERANCE = 2.0
+LLM_GATEWAY_BACKOFF_RATIO = 0.7
+
+# LLM call priorities: queued "interactive" calls (chat) are served before queued
+# "batch" calls (generation, extraction); a waiting call gains one priority level
+# every LLM_GATEWAY_PRIORITY_AGING_SECONDS so batch jobs are never starved.
+LLM_GATEWAY_DEFAULT_PRIORITY = "batch"
+LLM_GATEWAY_PRIORITY_AGING_SECONDS = 30
+
+# LLM Response Cache Configuration
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = "./data/llm_cache.db"
+LLM_CACHE_MAX_ENTRIES = 5000
 
 # Vector Database Configuration
 VECTORDB_PATH = "./data/vectordb"
 COLLECTION_NAME = "safe_mbse_requirements"
+VECTORSTORE_BATCH_SIZE = 64  # Chunks per collection.add call during ingestion
+VECTOR_STORE_BACKEND = "chroma"  # "chroma", "numpy" (in-process memory-mapped index) or "faiss" (ANN); the last two embed with Nomic
+NUMPY_VECTORSTORE_PATH = "./data/vectorstore_numpy"  # Also holds the faiss backend's partitions and index files
+
+# FAISS backend: partitions below FAISS_MIN_IVF_SIZE vectors are searched exactly;
+# larger ones through an IVF index probing FAISS_NPROBE cells per query (raise it
+# for recall, lower it for latency; see scripts/benchmark_ann_recall.py)
+FAISS_NPROBE = 16
+FAISS_MIN_IVF_SIZE = 20000
+FAISS_SAVE_EVERY = 10000  # Additions before the index file is rewritten (the rest is replayed on load)
 
 # Document Processing
 SUPPORTED_EXTENSIONS = ['.pdf', '.docx', '.txt', '.xml', '.json', '.aird', '.capella', '.md']
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+INGESTION_PARSE_WORKERS = None  # Processes parsing documents (None = CPU count)
+INGESTION_WRITE_WORKERS = 4  # Threads persisting chunks and writing vectors
+INGESTION_MAX_PENDING_DOCUMENTS = 8  # Parsed documents allowed to wait for the write stage
 
 # Streamlit Configuration
 PAGE_TITLE = "SAFE MBSE Requirements Generator"
@@ -32,6 +83,37 @@ EVALUATION_METRICS = [
     "stakeholder_satisfaction"
 ]
 
+# Maximum concurrent LLM generations when producing requirements for several phases
+REQUIREMENTS_MAX_LLM_PARALLELISM = 4
+
+# Maximum concurrent extraction steps when running the structured ARCADIA analysis DAG
+STRUCTURED_ANALYSIS_MAX_CONCURRENCY = 3
+
+# Checkpoints of structured analyses that did not complete (resumable runs) are
+# deleted after this many hours; completed runs delete theirs immediately
+ANALYSIS_CHECKPOINT_MAX_AGE_HOURS = 72
+
+# Traceability candidate blocking: only phase pairs with more element pairs than
+# TRACEABILITY_BLOCKING_MIN_PAIRS are blocked. Each source element is scored
+# against at most TRACEABILITY_MAX_CANDIDATES targets sharing key terms (raise it
+# for recall, lower it for speed); terms shared by more than
+# TRACEABILITY_MAX_TERM_POSTINGS targets are too common to discriminate.
+TRACEABILITY_BLOCKING_MIN_PAIRS = 100000
+TRACEABILITY_MAX_CANDIDATES = 50
+TRACEABILITY_MAX_TERM_POSTINGS = 500
+
+# Hybrid project retrieval: BM25 and vector candidates (HYBRID_CANDIDATES from
+# each) are merged with weighted reciprocal rank fusion. Raise a weight to favour
+# that ranking; HYBRID_RRF_K damps the advantage of the very first ranks.
+HYBRID_LEXICAL_WEIGHT = 1.0
+HYBRID_DENSE_WEIGHT = 1.0
+HYBRID_RRF_K = 60
+HYBRID_CANDIDATES = 20
+
+# Chat retrieval cache: results per (project, normalized query, content version)
+RETRIEVAL_CACHE_MAX_ENTRIES = 512
+RETRIEVAL_CACHE_TTL_SECONDS = 600
+
 # AI Model Configuration
 AI_MODELS = {
     "requirements_generation": {
@@ -385,9 +385,11 @@ plus pertinents et contextualisés.
                 
                 # Afficher le meilleur résultat
                 best_result = results["results"][0]
-                similarity = 1 - best_result.get("distance", 1)
-                
-                print(f"🎯 Meilleur score : {similarity:.3f}")
+                if best_result.get("distance") is not None:
+                    print(f"🎯 Meilleur score : {1 - best_result['distance']:.3f}")
+                else:
+                    # Trouvé par la seule recherche plein texte : score RRF
+                    print(f"🎯 Meilleur score (RRF) : {best_result['score']:.4f}")
                 content_preview = best_result["content"][:100] + "..."
                 print(f"📝 Aperçu : {content_preview}")
                 
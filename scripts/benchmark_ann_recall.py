@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Recall / latency benchmark of the FAISS vector store against exact search
+
+Builds a FaissVectorStore partition from synthetic clustered embeddings (or
+from an existing NumPy/FAISS store partition with --partition-dir), then for
+each nprobe value measures recall@k against exact matrix-product search and
+the per-query latency. Use it to choose config.FAISS_NPROBE.
+
+    python scripts/benchmark_ann_recall.py --vectors 200000 --nprobe 1 4 16 64
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.faiss_vector_store import FaissVectorStore
+from src.core.vector_store import NumpyVectorStore
+
+
+def synthetic_embeddings(count: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """Normalized vectors drawn around random cluster centres (like topic-grouped chunks)"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    assignment = rng.integers(0, clusters, size=count)
+    vectors = centres[assignment] + 0.35 * rng.normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_partition(partition_dir: str) -> np.ndarray:
+    """Vectors of an existing store partition (vectors.f32 + records.jsonl header)"""
+    directory = Path(partition_dir)
+    with open(directory / "records.jsonl", "r", encoding="utf-8") as f:
+        dimension = json.loads(f.readline())["dimension"]
+    return np.fromfile(directory / "vectors.f32", dtype=np.float32).reshape(-1, dimension)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000, help="Synthetic corpus size")
+    parser.add_argument("--dimension", type=int, default=768, help="Synthetic embedding dimension (Nomic: 768)")
+    parser.add_argument("--clusters", type=int, default=500, help="Synthetic topic clusters")
+    parser.add_argument("--partition-dir", help="Benchmark an existing store partition instead of synthetic data")
+    parser.add_argument("--queries", type=int, default=200, help="Queries (perturbed corpus vectors)")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64], help="nprobe values to sweep")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.partition_dir:
+        vectors = load_partition(args.partition_dir)
+    else:
+        vectors = synthetic_embeddings(args.vectors, args.dimension, args.clusters, args.seed)
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.integers(0, len(vectors), size=args.queries)]
+    queries = queries + 0.05 * rng.normal(size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(f"Corpus: {len(vectors)} vectors x {vectors.shape[1]} dims, {args.queries} queries, k={args.k}")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = FaissVectorStore("benchmark", embedding_function=None, root_path=root, min_ivf_size=1)
+        ids = [str(i) for i in range(len(vectors))]
+        metadatas = [{"project_id": "benchmark"}] * len(vectors)
+
+        start = time.perf_counter()
+        store.add([""] * len(vectors), metadatas, ids, embeddings=vectors)
+        view = store._partitions["benchmark"].snapshot()
+        store._index_for(view)
+        print(f"Index build: {time.perf_counter() - start:.1f}s ({store.index_stats()['benchmark']['kind']})")
+
+        # Vérité terrain : recherche exacte sur la matrice mappée
+        exact_ids, exact_times = [], []
+        for query in queries:
+            start = time.perf_counter()
+            top = NumpyVectorStore._search_partition(store, view, query, args.k, None)
+            exact_times.append(time.perf_counter() - start)
+            exact_ids.append({row for _, row in top})
+
+        results = [{
+            "nprobe": "exact",
+            "recall": 1.0,
+            "mean_ms": 1000 * float(np.mean(exact_times)),
+            "p95_ms": 1000 * float(np.percentile(exact_times, 95))
+        }]
+
+        for nprobe in args.nprobe:
+            store.nprobe = nprobe
+            hits, times = 0, []
+            for query, truth in zip(queries, exact_ids):
+                start = time.perf_counter()
+                top = store._search_partition(view, query, args.k, None)
+                times.append(time.perf_counter() - start)
+                hits += len(truth & {row for _, row in top})
+            results.append({
+                "nprobe": nprobe,
+                "recall": hits / (len(queries) * args.k),
+                "mean_ms": 1000 * float(np.mean(times)),
+                "p95_ms": 1000 * float(np.percentile(times, 95))
+            })
+
+    print(f"{'nprobe':>8} {'recall@' + str(args.k):>10} {'mean ms':>9} {'p95 ms':>9}")
+    for row in results:
+        print(f"{row['nprobe']:>8} {row['recall']:>10.3f} {row['mean_ms']:>9.3f} {row['p95_ms']:>9.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"vectors": len(vectors), "dimension": int(vectors.shape[1]), "k": args.k,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Migrate shared vector collections to per-project partitions
+
+Earlier versions stored every project of the persistent RAG systems in one
+ChromaDB collection (<COLLECTION_NAME>_persistent / _simple) filtered with
+where={"project_id": ...}. This script copies each project's vectors,
+documents and metadata, with their stored embeddings (no re-embedding), into
+the partitioned store of the configured backend: one collection per project
+for "chroma", one shard per project for "numpy" / "faiss".
+
+The copy is idempotent (ids already present are skipped), so an interrupted
+run can simply be restarted. The source collection is only deleted with
+--delete-source, once every project's vector count matches.
+
+    python scripts/migrate_vector_partitions.py --dry-run
+    python scripts/migrate_vector_partitions.py --backend numpy --delete-source
+"""
+
+import sys
+import argparse
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import config
+from src.core.vector_store import create_vector_store, get_chroma_client
+
+DEFAULT_SOURCES = [f"{config.COLLECTION_NAME}_persistent", f"{config.COLLECTION_NAME}_simple"]
+
+
+def iter_source(collection, batch_size: int):
+    """Pages of (ids, documents, metadatas, embeddings) of a ChromaDB collection"""
+    offset = 0
+    while True:
+        page = collection.get(include=["documents", "metadatas", "embeddings"], limit=batch_size, offset=offset)
+        if not page["ids"]:
+            return
+        yield page["ids"], page["documents"], page["metadatas"], page["embeddings"]
+        offset += len(page["ids"])
+
+
+def target_embedding_function(backend: str):
+    """Query-time embedding function of a numpy/faiss target (the copy itself reuses stored embeddings)"""
+    if backend == "chroma":
+        return None
+    from src.core.embedding_service import NomicEmbeddingFunction
+    from src.services.llm_gateway import get_llm_gateway
+    return NomicEmbeddingFunction(get_llm_gateway())
+
+
+def migrate_collection(source_name: str, backend: str, batch_size: int, dry_run: bool, delete_source: bool) -> bool:
+    client = get_chroma_client()
+    try:
+        source = client.get_collection(name=source_name)
+    except Exception:
+        print(f"- {source_name}: not found, skipped")
+        return True
+
+    source_counts: Counter = Counter()
+    for _, _, metadatas, _ in iter_source(source, batch_size):
+        source_counts.update((metadata or {}).get("project_id") for metadata in metadatas)
+
+    print(f"- {source_name}: {sum(source_counts.values())} vectors in {len(source_counts)} projects")
+    for project_id, count in sorted(source_counts.items(), key=lambda item: str(item[0])):
+        print(f"    {project_id or '(no project)'}: {count}")
+
+    if dry_run or not source_counts:
+        return True
+
+    target = create_vector_store(
+        source_name,
+        embedding_function=target_embedding_function(backend),
+        metadata=source.metadata,
+        backend=backend,
+        partition_by_project=True
+    )
+
+    copied = 0
+    for ids, documents, metadatas, embeddings in iter_source(source, batch_size):
+        target.add(
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids,
+            embeddings=np.asarray(embeddings, dtype=np.float32).tolist()
+        )
+        copied += len(ids)
+        print(f"    copied {copied}/{sum(source_counts.values())}", end="\r")
+    print()
+
+    mismatches = {
+        project_id: (count, len(target.get(where={"project_id": project_id})["ids"]))
+        for project_id, count in source_counts.items()
+        if project_id is not None
+    }
+    mismatches = {project_id: counts for project_id, counts in mismatches.items() if counts[0] != counts[1]}
+    if mismatches:
+        print(f"    count mismatch (source, target): {mismatches}")
+        return False
+
+    if delete_source:
+        client.delete_collection(name=source_name)
+        print(f"    source collection {source_name} deleted")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", nargs="+", default=DEFAULT_SOURCES, help="Shared ChromaDB collections to migrate")
+    parser.add_argument("--backend", default=config.VECTOR_STORE_BACKEND, choices=["chroma", "numpy", "faiss"],
+                        help="Target backend (defaults to config.VECTOR_STORE_BACKEND)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Vectors read per page")
+    parser.add_argument("--dry-run", action="store_true", help="Only report per-project counts")
+    parser.add_argument("--delete-source", action="store_true", help="Delete each source once its copy is verified")
+    args = parser.parse_args()
+
+    if args.backend != "chroma" and any(name.endswith("_simple") for name in args.source):
+        print("Note: the _simple collection uses ChromaDB default embeddings; numpy/faiss targets query with "
+              "Nomic embeddings, so re-ingest those projects instead of copying their vectors.")
+
+    ok = all(
+        migrate_collection(name, args.backend, args.batch_size, args.dry_run, args.delete_source)
+        for name in args.source
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Token streaming of chat answers
+
+A chat answer used to be returned only once the model had generated it
+entirely, so the perceived latency was the full generation time. Streaming
+answers are produced as a sequence of events:
+
+    {"type": "sources", "sources": [...]}          retrieved context, sent first
+    {"type": "token", "content": "..."}            answer text as it is generated
+    {"type": "done", "answer": "...", "metrics": {...}}
+    {"type": "error", "message": "..."}            instead of "done" on failure
+
+The metrics of each turn include time-to-first-token (ttft_ms, about the
+retrieval + prompt-eval time) and the total latency (total_ms), plus the
+Ollama prompt/eval counters when the server reports them.
+"""
+
+import time
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ChatTurnMetrics:
+    """Latency measurements of one chat turn"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.server: Dict[str, Any] = {}
+
+    def mark_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def finish(self, final_chunk: Optional[Dict[str, Any]] = None):
+        self.finished_at = time.perf_counter()
+        if final_chunk:
+            # Durées Ollama en nanosecondes
+            for key in ("prompt_eval_duration", "eval_duration", "load_duration"):
+                if final_chunk.get(key):
+                    self.server[key.replace("_duration", "_ms")] = round(final_chunk[key] / 1e6, 1)
+            for key in ("prompt_eval_count", "eval_count"):
+                if final_chunk.get(key) is not None:
+                    self.server[key] = final_chunk[key]
+
+    def as_dict(self) -> Dict[str, Any]:
+        finished = self.finished_at or time.perf_counter()
+        first_token = self.first_token_at or finished
+        return {
+            "ttft_ms": round(1000 * (first_token - self.started), 1),
+            "total_ms": round(1000 * (finished - self.started), 1),
+            **self.server
+        }
+
+
+def stream_chat_answer(ollama_client, model: str, messages: List[Dict[str, str]], sources: List[Any],
+                       metrics: Optional[ChatTurnMetrics] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream an Ollama chat completion as sources / token / done events
+
+    Args:
+        metrics: Turn metrics started before retrieval, so that the reported
+            time-to-first-token covers the whole turn (created here if omitted)
+    """
+    metrics = metrics or ChatTurnMetrics()
+    yield {"type": "sources", "sources": sources}
+
+    pieces: List[str] = []
+    final_chunk = None
+    for chunk in ollama_client.chat(model=model, messages=messages, stream=True):
+        content = chunk.get("message", {}).get("content", "")
+        if content:
+            metrics.mark_token()
+            pieces.append(content)
+            yield {"type": "token", "content": content}
+        if chunk.get("done"):
+            final_chunk = chunk
+
+    metrics.finish(final_chunk)
+    turn_metrics = metrics.as_dict()
+    logger.info(f"Chat turn: first token {turn_metrics['ttft_ms']} ms, total {turn_metrics['total_ms']} ms")
+    yield {"type": "done", "answer": "".join(pieces), "metrics": turn_metrics}
+
+
+def static_answer_events(answer: str, sources: List[Any],
+                         metrics: Optional[ChatTurnMetrics] = None) -> Iterator[Dict[str, Any]]:
+    """Events of an answer that is already complete (fallbacks, error messages)"""
+    metrics = metrics or ChatTurnMetrics()
+    yield {"type": "sources", "sources": sources}
+    metrics.mark_token()
+    yield {"type": "token", "content": answer}
+    metrics.finish()
+    yield {"type": "done", "answer": answer, "metrics": metrics.as_dict()}
+
+
+def collect_answer(events: Iterable[Dict[str, Any]],
+                   on_text: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Consume a stream of events into the non-streaming {"answer", "sources", "metrics"} result
+
+    Args:
+        on_text: Called with the answer text so far after each token (live display)
+    """
+    result: Dict[str, Any] = {"answer": "", "sources": [], "metrics": {}}
+    pieces: List[str] = []
+    for event in events:
+        if event["type"] == "sources":
+            result["sources"] = event["sources"]
+        elif event["type"] == "token":
+            pieces.append(event["content"])
+            if on_text:
+                on_text("".join(pieces))
+        elif event["type"] == "done":
+            result["answer"] = event["answer"]
+            result["metrics"] = event["metrics"]
+        elif event["type"] == "error":
+            result["answer"] = event["message"]
+            return result
+    if not result["answer"]:
+        result["answer"] = "".join(pieces)
+    return result
@@ -0,0 +1,130 @@
+"""
+Nomic Embedding Function for the persistent RAG systems
+
+Embeds texts with the Ollama-hosted Nomic model. Texts are grouped into
+batches that are sent as single requests, and a bounded pool of batches is
+kept in flight so ingestion throughput follows server capacity rather than
+per-request network latency.
+
+When an embedding cache is supplied (the PersistenceService), vectors are
+looked up by (embedding model, content hash) before any request is made, so
+re-indexing content that was already embedded costs no embedding calls.
+Only document chunks go through the cache: query embeddings (embed_query)
+are one-off and would make the unbounded cache table grow with every chat
+question.
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import config
+
+
+class NomicEmbeddingFunction:
+    """ChromaDB-compatible embedding function with batched, concurrent Ollama requests"""
+
+    def __init__(self,
+                 ollama_client,
+                 model: Optional[str] = None,
+                 batch_size: Optional[int] = None,
+                 max_concurrency: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 embedding_cache=None):
+        self.ollama_client = ollama_client
+        self.embedding_cache = embedding_cache
+        self.model = model or config.EMBEDDING_MODEL
+        self.batch_size = max(1, batch_size or config.EMBEDDING_BATCH_SIZE)
+        self.max_concurrency = max(1, max_concurrency or config.EMBEDDING_MAX_CONCURRENCY)
+        self.max_retries = max(1, max_retries or config.EMBEDDING_MAX_RETRIES)
+        self.dimension = 768  # Dimension typique pour Nomic, mise à jour à la première réponse
+        self.logger = logging.getLogger(__name__)
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """Génère des embeddings avec le modèle Nomic - Interface ChromaDB v0.4.16+"""
+        texts = list(input)
+        if not texts:
+            return []
+
+        if self.embedding_cache is None:
+            return self._embed_texts(texts)
+
+        content_hashes = [self.embedding_cache.compute_content_hash(text) for text in texts]
+        cached = self.embedding_cache.get_cached_embeddings(self.model, content_hashes)
+
+        # Embedder une seule fois chaque contenu absent du cache
+        missing: Dict[str, str] = {}
+        for text, content_hash in zip(texts, content_hashes):
+            if content_hash not in cached and content_hash not in missing:
+                missing[content_hash] = text
+
+        if missing:
+            fresh_hashes = list(missing.keys())
+            fresh_embeddings = self._embed_texts(list(missing.values()))
+            fresh = {
+                content_hash: vector
+                for content_hash, vector in zip(fresh_hashes, fresh_embeddings)
+                if any(vector)  # Ne pas mettre en cache les vecteurs zéro de repli
+            }
+            self.embedding_cache.save_cached_embeddings(self.model, fresh)
+            cached.update(dict(zip(fresh_hashes, fresh_embeddings)))
+
+        self.logger.debug(f"Embeddings : {len(texts) - len(missing)} depuis le cache, {len(missing)} calculés")
+        return [cached[content_hash] for content_hash in content_hashes]
+
+    def embed_query(self, input: List[str]) -> List[List[float]]:
+        """Embeddings of search queries, never read from or written to the embedding cache"""
+        texts = list(input)
+        return self._embed_texts(texts) if texts else []
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts through batched, concurrent Ollama requests"""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+        if len(batches) == 1 or self.max_concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                results = list(executor.map(self._embed_batch, batches))
+
+        embeddings: List[List[float]] = []
+        for batch, batch_embeddings in zip(batches, results):
+            if batch_embeddings is None:
+                # Fallback: vecteurs zéro pour un lot définitivement en échec
+                batch_embeddings = [[0.0] * self.dimension for _ in batch]
+            embeddings.extend(batch_embeddings)
+
+        return embeddings
+
+    def _embed_batch(self, batch: List[str]) -> Optional[List[List[float]]]:
+        """Embed one batch, retrying the whole batch with exponential backoff"""
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                embeddings = self._request_embeddings(batch)
+                if len(embeddings) != len(batch):
+                    raise ValueError(f"{len(embeddings)} embeddings reçus pour {len(batch)} textes")
+                if embeddings:
+                    self.dimension = len(embeddings[0])
+                return embeddings
+            except Exception as e:
+                self.logger.warning(
+                    f"Erreur embedding du lot ({len(batch)} textes), tentative {attempt}/{self.max_retries} : {str(e)}"
+                )
+                if attempt < self.max_retries:
+                    time.sleep(0.5 * (2 ** (attempt - 1)))
+
+        self.logger.error(f"Échec définitif de l'embedding d'un lot de {len(batch)} textes")
+        return None
+
+    def _request_embeddings(self, batch: List[str]) -> List[List[float]]:
+        """Send one batch to Ollama, using the multi-input endpoint when available"""
+        if hasattr(self.ollama_client, "embed"):
+            response = self.ollama_client.embed(model=self.model, input=batch)
+            return [list(vector) for vector in response["embeddings"]]
+
+        # Anciennes versions du client : un appel par texte au sein du lot
+        return [
+            self.ollama_client.embeddings(model=self.model, prompt=text)["embedding"]
+            for text in batch
+        ]
@@ -1,6 +1,3 @@
-import ollama
-import chromadb
-from chromadb.config import Settings
 from typing import List, Dict, Tuple, Optional, Any
 import json
 import numpy as np
@@ -10,7 +7,13 @@ import hashlib
 
 from .rag_system import SAFEMBSERAGSystem
 from .enhanced_structured_rag_system import EnhancedStructuredRAGSystem
+from .embedding_service import NomicEmbeddingFunction
 from ..services.persistence_service import PersistenceService, Project, ProcessedDocument
+from .ingestion_pipeline import DocumentIngestionPipeline
+from .hybrid_retriever import HybridRetriever
+from .retrieval_cache import RetrievalCache
+from .vector_store import create_vector_store
+from ..services.llm_gateway import get_llm_gateway
 from config import config
 
 class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
@@ -28,14 +31,8 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
         # Initialiser le service de persistance en premier
         self.persistence_service = PersistenceService()
         
-        # Initialiser le client Ollama pour l'embedding
-        self.ollama_client = ollama.Client(host=config.OLLAMA_BASE_URL)
-        
-        # Configuration ChromaDB avec embeddings custom
-        self.chroma_client = chromadb.PersistentClient(
-            path=config.VECTORDB_PATH,
-            settings=Settings(allow_reset=True)
-        )
+        # Passerelle LLM partagée (pool de connexions Ollama) pour l'embedding et la génération
+        self.ollama_client = get_llm_gateway()
         
         # Project management
         self.current_project_id = project_id
@@ -47,6 +44,10 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
         # Créer/récupérer la collection avec embedding function custom
         self._setup_collection()
         
+        # Recherche hybride BM25 + vectorielle
+        self.hybrid_retriever = HybridRetriever(self.persistence_service)
+        self.retrieval_cache = RetrievalCache()
+        
         # Initialiser les autres composants depuis la classe parent
         # Nous ne pouvons pas appeler super().__init__() car nous avons modifié l'initialisation
         from .document_processor import ArcadiaDocumentProcessor
@@ -57,7 +58,9 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
         self.doc_processor = ArcadiaDocumentProcessor()
         self.req_generator = RequirementsGenerator(self.ollama_client)
         self.enhanced_extractor = EnhancedRequirementExtractor()
-        self.structured_service = StructuredARCADIAService(self.ollama_client)
+        self.structured_service = StructuredARCADIAService(
+            self.ollama_client, checkpoint_store=self.persistence_service
+        )
         
         # Charger le projet actuel si spécifié
         if self.current_project_id:
@@ -66,84 +69,23 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
         self.logger.info("Système RAG persistant initialisé avec embedding Nomic")
     
     def _setup_collection(self):
-        """Configure la collection ChromaDB avec l'embedding function Nomic"""
-        
-        # Créer une fonction d'embedding custom utilisant Nomic
-        class NomicEmbeddingFunction:
-            def __init__(self, ollama_client):
-                self.ollama_client = ollama_client
-                self.model = config.EMBEDDING_MODEL
-                
-            def __call__(self, input: list[str]) -> list[list[float]]:
-                """Génère des embeddings avec le modèle Nomic - Interface ChromaDB v0.4.16+"""
-                embeddings = []
-                for text in input:
-                    try:
-                        response = self.ollama_client.embeddings(
-                            model=self.model,
-                            prompt=text
-                        )
-                        embeddings.append(response['embedding'])
-                    except Exception as e:
-                        logging.error(f"Erreur embedding pour le texte : {str(e)}")
-                        # Fallback: vecteur zéro
-                        embeddings.append([0.0] * 768)  # Dimension typique pour Nomic
-                return embeddings
-        
-        self.embedding_function = NomicEmbeddingFunction(self.ollama_client)
-        
-        # Créer ou récupérer la collection avec gestion des conflits
-        collection_name = f"{config.COLLECTION_NAME}_persistent"
+        """Configure le vectorstore partitionné par projet avec l'embedding function Nomic"""
         
-        try:
-            # Tenter de récupérer la collection existante
-            self.collection = self.chroma_client.get_collection(
-                name=collection_name
-            )
-            self.logger.info(f"Collection existante récupérée : {collection_name}")
-            
-            # Mettre à jour la fonction d'embedding si nécessaire
-            try:
-                # Tester si la collection fonctionne avec notre embedding function
-                test_result = self.collection.query(
-                    query_texts=["test"],
-                    n_results=1
-                )
-                self.logger.info("Collection existante compatible")
-            except Exception:
-                self.logger.warning("Collection existante incompatible, recréation...")
-                self.chroma_client.delete_collection(name=collection_name)
-                raise Exception("Force recreation")
-                
-        except Exception:
-            # Créer une nouvelle collection
-            try:
-                self.collection = self.chroma_client.create_collection(
-                    name=collection_name,
-                    embedding_function=self.embedding_function,
-                    metadata={"description": "MBSE Persistent System with Nomic Embeddings"}
-                )
-                self.logger.info(f"Nouvelle collection créée : {collection_name}")
-            except Exception as e:
-                self.logger.error(f"Erreur création collection : {str(e)}")
-                # Fallback: utiliser collection sans embedding function custom
-                try:
-                    # Supprimer toute collection conflictuelle
-                    try:
-                        self.chroma_client.delete_collection(name=collection_name)
-                    except:
-                        pass
-                    
-                    # Créer collection simple
-                    self.collection = self.chroma_client.create_collection(
-                        name=collection_name,
-                        metadata={"description": "MBSE Persistent System - Fallback Mode"}
-                    )
-                    self.logger.warning(f"Collection créée en mode fallback : {collection_name}")
-                    self.embedding_function = None  # Utiliser embeddings par défaut
-                except Exception as final_error:
-                    self.logger.error(f"Échec complet création collection : {str(final_error)}")
-                    raise
+        # Fonction d'embedding Nomic avec requêtes par lots et cache persistant
+        self.embedding_function = NomicEmbeddingFunction(
+            self.ollama_client,
+            embedding_cache=self.persistence_service
+        )
+        
+        # Une partition (collection ChromaDB ou shard NumPy/FAISS) par projet
+        collection_name = f"{config.COLLECTION_NAME}_persistent"
+        self.collection = create_vector_store(
+            collection_name,
+            embedding_function=self.embedding_function,
+            metadata={"description": "MBSE Persistent System with Nomic Embeddings"},
+            partition_by_project=True
+        )
+        self.logger.info(f"Vectorstore {config.VECTOR_STORE_BACKEND} partitionné par projet : {collection_name}")
     
     # ===== GESTION DES PROJETS =====
     
@@ -170,6 +112,10 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
         """Récupérer tous les projets"""
         return self.persistence_service.get_all_projects()
     
+    def list_projects(self) -> List[Project]:
+        """Lister les projets sans proposal_text (affichage de la barre latérale)"""
+        return self.persistence_service.list_projects()
+    
     def get_current_project(self) -> Optional[Project]:
         """Récupérer le projet actuel"""
         return self.current_project
@@ -205,59 +151,18 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
         
         start_time = datetime.now()
         
-        for file_path in file_paths:
-            try:
-                self.logger.info(f"Traitement du fichier : {file_path}")
-                
-                # Vérifier si le document a déjà été traité
-                is_processed, doc_id = self.persistence_service.is_document_processed(file_path, project_id)
-                
-                if is_processed:
-                    self.logger.info(f"Document déjà traité, récupération des chunks : {file_path}")
-                    results["skipped_files"].append({
-                        "file_path": file_path,
-                        "reason": "already_processed",
-                        "document_id": doc_id
-                    })
-                    
-                    # Récupérer les chunks existants pour les statistiques
-                    existing_chunks = self._get_document_chunks_from_db(doc_id)
-                    results["total_chunks"] += len(existing_chunks)
-                    
-                else:
-                    # Traiter le nouveau document
-                    self.logger.info(f"Nouveau document, traitement en cours : {file_path}")
-                    
-                    # Enregistrer le document
-                    doc_id = self.persistence_service.register_document(file_path, project_id)
-                    
-                    # Extraire et traiter le contenu
-                    chunks = self._process_document_content(file_path)
-                    
-                    # Sauvegarder les chunks dans la base
-                    success = self.persistence_service.save_document_chunks(doc_id, project_id, chunks)
-                    
-                    if success:
-                        # Ajouter les chunks à ChromaDB avec embeddings Nomic
-                        self._add_chunks_to_vectorstore(chunks, doc_id, project_id)
-                        
-                        results["processed_files"].append({
-                            "file_path": file_path,
-                            "document_id": doc_id,
-                            "chunks_count": len(chunks)
-                        })
-                        
-                        results["new_chunks"] += len(chunks)
-                        results["total_chunks"] += len(chunks)
-                        
-                        self.logger.info(f"Document traité avec succès : {len(chunks)} chunks")
-                    else:
-                        results["errors"].append(f"Erreur sauvegarde chunks : {file_path}")
-                        
-            except Exception as e:
-                error_msg = f"Erreur traitement {file_path} : {str(e)}"
-                self.logger.error(error_msg)
-                results["errors"].append(error_msg)
+        # Pipeline parallèle : analyse en processus, embedding et écriture en threads
+        pipeline = DocumentIngestionPipeline(self.persistence_service, self._add_chunks_to_vectorstore)
+        pipeline_results = pipeline.run(file_paths, project_id)
+        
+        for key in ["processed_files", "skipped_files", "errors"]:
+            results[key].extend(pipeline_results[key])
+        results["new_chunks"] += pipeline_results["new_chunks"]
+        results["total_chunks"] += pipeline_results["total_chunks"]
+        
+        # Récupérer les chunks existants des documents ignorés pour les statistiques
+        for skipped in pipeline_results["skipped_files"]:
+            results["total_chunks"] += len(self._get_document_chunks_from_db(skipped["document_id"]))
         
         results["processing_time"] = (datetime.now() - start_time).total_seconds()
         
@@ -267,44 +172,6 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
         
         return results
     
-    def _process_document_content(self, file_path: str) -> List[Dict[str, Any]]:
-        """Traiter le contenu d'un document et créer les chunks"""
-        try:
-            # Extraction du contenu selon le type de fichier
-            content = ""
-            file_extension = file_path.lower().split('.')[-1]
-            
-            if file_extension in ['txt', 'md']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            
-            elif file_extension == 'pdf':
-                try:
-                    import PyPDF2
-                    with open(file_path, 'rb') as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
-                        content = ""
-                        for page in pdf_reader.pages:
-                            content += page.extract_text() + "\n"
-                except ImportError:
-                    self.logger.error("PyPDF2 non installé pour traiter les PDF")
-                    raise
-            
-            else:
-                raise ValueError(f"Type de fichier non supporté : {file_extension}")
-            
-            # Chunking du contenu
-            chunks = self.doc_processor._chunk_text_with_metadata(
-                content, 
-                {"source": file_path, "filename": file_path.split('/')[-1]}
-            )
-            
-            return chunks
-            
-        except Exception as e:
-            self.logger.error(f"Erreur lors du traitement du document {file_path} : {str(e)}")
-            raise
-    
     def _add_chunks_to_vectorstore(self, chunks: List[Dict[str, Any]], doc_id: str, project_id: str):
         """Ajouter les chunks à ChromaDB avec embeddings Nomic"""
         try:
@@ -344,6 +211,10 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
         except Exception as e:
             self.logger.error(f"Erreur lors de l'ajout à ChromaDB : {str(e)}")
             raise
+        finally:
+            # La version du contenu a changé avant l'écriture des vecteurs :
+            # les recherches faites entre-temps ne doivent pas rester en cache
+            self.retrieval_cache.invalidate(project_id)
     
     def _get_document_chunks_from_db(self, doc_id: str) -> List[Dict[str, Any]]:
         """Récupérer les chunks d'un document depuis la base de données"""
@@ -363,7 +234,8 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
                                        requirement_types: Optional[List[str]] = None,
                                        enable_structured_analysis: bool = True,
                                        enable_cross_phase_analysis: bool = True,
-                                       project_id: Optional[str] = None) -> Dict[str, Any]:
+                                       project_id: Optional[str] = None,
+                                       analysis_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Générer des requirements avec persistance automatique
         
@@ -374,6 +246,7 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
             enable_structured_analysis: Activer l'analyse structurée
             enable_cross_phase_analysis: Activer l'analyse inter-phases
             project_id: ID du projet (utilise le projet actuel si None)
+            analysis_id: Analyse structurée interrompue à reprendre
             
         Returns:
             Résultats avec persistence automatique
@@ -397,7 +270,8 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
             target_phase=target_phase,
             requirement_types=requirement_types,
             enable_structured_analysis=enable_structured_analysis,
-            enable_cross_phase_analysis=enable_cross_phase_analysis
+            enable_cross_phase_analysis=enable_cross_phase_analysis,
+            analysis_id=analysis_id
         )
         
         # Sauvegarder les requirements dans la base
@@ -449,30 +323,24 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
             raise ValueError("Aucun projet spécifié ou chargé")
         
         try:
-            # Recherche avec filtre par projet
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=top_k,
-                where={"project_id": project_id}
-            )
+            # Recherche hybride (BM25 + vectorielle) filtrée par projet
+            # Cache invalidé dès que le contenu du projet change
+            generation = self.retrieval_cache.generation(project_id)
+            content_version = self.persistence_service.get_project_content_version(project_id)
+            results = self.retrieval_cache.get(project_id, query, content_version, top_k=top_k)
+            if results is None:
+                results = self.hybrid_retriever.retrieve(self.collection, query, project_id, top_k)
+                self.retrieval_cache.put(project_id, query, results, content_version,
+                                         generation=generation, top_k=top_k)
             
             # Formater les résultats
             formatted_results = {
                 "query": query,
                 "project_id": project_id,
-                "total_results": len(results["documents"][0]) if results["documents"] else 0,
-                "results": []
+                "total_results": len(results),
+                "results": results
             }
             
-            if results["documents"]:
-                for i in range(len(results["documents"][0])):
-                    formatted_results["results"].append({
-                        "content": results["documents"][0][i],
-                        "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                        "distance": results["distances"][0][i] if results["distances"] else 0,
-                        "id": results["ids"][0][i] if results["ids"] else ""
-                    })
-            
             return formatted_results
             
         except Exception as e:
@@ -545,12 +413,10 @@ class EnhancedPersistentRAGSystem(EnhancedStructuredRAGSystem):
             raise ValueError("Aucun projet spécifié ou chargé")
         
         try:
-            # Récupérer tous les IDs de chunks pour ce projet
-            results = self.collection.get(where={"project_id": project_id})
-            
-            if results["ids"]:
-                self.collection.delete(ids=results["ids"])
-                self.logger.info(f"Supprimé {len(results['ids'])} vecteurs pour le projet {project_id}")
+            # Suppression de la partition du projet, sans lister ses vecteurs
+            self.collection.drop_partition(project_id)
+            self.retrieval_cache.invalidate(project_id)
+            self.logger.info(f"Partition vectorielle supprimée pour le projet {project_id}")
             
         except Exception as e:
             self.logger.error(f"Erreur nettoyage vecteurs : {str(e)}")
@@ -32,7 +32,8 @@ class EnhancedStructuredRAGSystem(SAFEMBSERAGSystem):
                                                    target_phase: str = "all",
                                                    requirement_types: Optional[List[str]] = None,
                                                    enable_structured_analysis: bool = True,
-                                                   enable_cross_phase_analysis: bool = True) -> Dict:
+                                                   enable_cross_phase_analysis: bool = True,
+                                                   analysis_id: Optional[str] = None) -> Dict:
         """
         Generate both traditional requirements and structured ARCADIA analysis
         
@@ -42,6 +43,7 @@ class EnhancedStructuredRAGSystem(SAFEMBSERAGSystem):
             requirement_types: Types of requirements to generate ["functional", "non_functional", "stakeholder"]
             enable_structured_analysis: Whether to perform structured ARCADIA analysis
             enable_cross_phase_analysis: Whether to perform cross-phase analysis
+            analysis_id: Interrupted structured analysis to resume (its checkpointed phases are reused)
             
         Returns:
             Enhanced results containing both traditional requirements and structured outputs
@@ -67,14 +69,24 @@ class EnhancedStructuredRAGSystem(SAFEMBSERAGSystem):
                 # Determine phases for structured analysis
                 target_phases = self._determine_structured_phases(target_phase)
                 
-                # Generate structured analysis
-                structured_results = self.structured_service.extract_complete_arcadia_analysis(
-                    context_chunks=context_chunks,
-                    proposal_text=proposal_text,
-                    target_phases=target_phases,
-                    source_documents=["proposal_text"],
-                    enable_cross_phase_analysis=enable_cross_phase_analysis
-                )
+                # Generate structured analysis, resuming an interrupted run if requested
+                if analysis_id:
+                    structured_results = self.structured_service.resume_arcadia_analysis(
+                        analysis_id=analysis_id,
+                        context_chunks=context_chunks,
+                        proposal_text=proposal_text,
+                        target_phases=target_phases,
+                        source_documents=["proposal_text"],
+                        enable_cross_phase_analysis=enable_cross_phase_analysis
+                    )
+                else:
+                    structured_results = self.structured_service.extract_complete_arcadia_analysis(
+                        context_chunks=context_chunks,
+                        proposal_text=proposal_text,
+                        target_phases=target_phases,
+                        source_documents=["proposal_text"],
+                        enable_cross_phase_analysis=enable_cross_phase_analysis
+                    )
                 
                 self.logger.info(f"Structured analysis completed for phases: {target_phases}")
                 
@@ -0,0 +1,304 @@
+"""
+FAISS approximate nearest neighbour backend for large project corpora
+
+Extends the NumPy vector store: each project partition keeps its memory-mapped
+float32 matrix and metadata sidecar as the source of truth, plus a persisted
+FAISS index searched instead of the full matrix product.
+
+- Partitions smaller than FAISS_MIN_IVF_SIZE use an exact flat index; larger
+  ones an IVF index (inverted lists over k-means cells) whose nprobe setting
+  trades recall for latency (more cells probed = higher recall, slower).
+- Indexes are loaded lazily on the first query of a partition, from the
+  query's snapshot and outside the store lock, so training an IVF index
+  blocks neither ingestion nor queries of other partitions. Rows appended
+  meanwhile are added when the index is installed.
+- Searches only hold their partition's index lock; the store lock is never
+  taken during a FAISS search.
+- Adds and deletes are incremental (add_with_ids / remove_ids on the stable
+  row keys); the index file is rewritten every FAISS_SAVE_EVERY changes.
+  Rows appended since the last save are added on load, and an index saved
+  before unrecorded deletions is rebuilt. An IVF index is retrained when its
+  partition has grown well past the size it was trained on.
+
+Requires faiss-cpu.
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import config
+from .vector_store import NumpyVectorStore, _Partition, _PartitionView
+
+ADD_BATCH_ROWS = 65536  # Lignes transmises à FAISS par appel lors d'une construction
+RETRAIN_GROWTH_FACTOR = 4  # Réentraîner un index IVF quand la partition a quadruplé
+
+
+class _PartitionIndex:
+    """Loaded FAISS index of one partition and its bookkeeping"""
+
+    def __init__(self, index, kind: str, trained_size: int, max_key: int, row_of_key: Dict[int, int],
+                 ids: List[str]):
+        self.index = index
+        self.kind = kind
+        self.trained_size = trained_size
+        self.max_key = max_key
+        self.row_of_key = row_of_key
+        self.ids = ids  # Liste d'identifiants de la partition dont row_of_key suit la numérotation
+        self.unsaved = 0
+        self.lock = threading.Lock()  # Recherches et mises à jour de l'index (pris après le verrou du store)
+
+
+class FaissVectorStore(NumpyVectorStore):
+    """NumPy vector store searched through per-partition FAISS indexes"""
+
+    def __init__(self, name: str, embedding_function, root_path: Optional[str] = None,
+                 partition_key: str = "project_id", nprobe: Optional[int] = None,
+                 min_ivf_size: Optional[int] = None, save_every: Optional[int] = None):
+        """
+        Args:
+            nprobe: IVF cells probed per query, the recall/latency trade-off
+            min_ivf_size: Partition size from which an IVF index replaces the exact flat index
+            save_every: Additions tolerated before the index file is rewritten
+        """
+        import faiss
+        self.faiss = faiss
+        self.nprobe = max(1, nprobe or config.FAISS_NPROBE)
+        self.min_ivf_size = max(1, min_ivf_size or config.FAISS_MIN_IVF_SIZE)
+        self.save_every = max(1, save_every or config.FAISS_SAVE_EVERY)
+        self._indexes: Dict[str, _PartitionIndex] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+        super().__init__(name, embedding_function, root_path=root_path, partition_key=partition_key)
+
+    # ===== HOOKS DU STORE NUMPY =====
+
+    def _search_partition(self, view: _PartitionView, query_vector: np.ndarray, k: int,
+                          mask: Optional[np.ndarray]) -> List[Tuple[float, int]]:
+        state = self._index_for(view) if mask is None else None
+        if state is None:
+            # Filtres de métadonnées, partition compactée ou index en cours de construction : recherche exacte
+            return super()._search_partition(view, query_vector, k, mask)
+
+        with state.lock:
+            if state.ids is not view.ids:
+                # Partition compactée depuis l'instantané : l'index numérote d'autres lignes
+                rows = None
+            else:
+                if state.kind == "ivf":
+                    state.index.nprobe = self.nprobe
+                scores, keys = state.index.search(query_vector.reshape(1, -1).astype(np.float32),
+                                                  min(k, state.index.ntotal))
+                rows = [(float(score), state.row_of_key.get(int(key))) for score, key in zip(scores[0], keys[0]) if key >= 0]
+
+        if rows is None:
+            return super()._search_partition(view, query_vector, k, mask)
+        # Lignes ajoutées après l'instantané : hors de la vue
+        return [(score, row) for score, row in rows if row is not None and row < len(view)]
+
+    def _on_append(self, name: str, keys: List[int], vectors: np.ndarray):
+        state = self._indexes.get(name)
+        if state is None:
+            # Index non chargé (ou en construction) : les nouvelles lignes seront ajoutées à l'installation
+            return
+
+        partition = self._partitions[name]
+        if self._needs_rebuild(state, len(partition)):
+            self._drop_index(name)
+            return
+
+        with state.lock:
+            state.index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), np.asarray(keys, dtype=np.int64))
+            first_row = len(partition) - len(keys)
+            state.row_of_key.update({key: first_row + offset for offset, key in enumerate(keys)})
+            state.max_key = max(state.max_key, max(keys))
+            state.unsaved += len(keys)
+            if state.unsaved >= self.save_every:
+                self._save_index(name, state)
+
+    def _on_remove(self, name: str, keys: List[int]):
+        partition = self._partitions[name]
+        if not len(partition):
+            self._drop_index(name)
+            return
+
+        state = self._indexes.get(name)
+        if state is None:
+            # Index non chargé : l'index sauvegardé contient les clés supprimées et sera reconstruit au chargement
+            return
+        with state.lock:
+            state.index.remove_ids(np.asarray(keys, dtype=np.int64))
+            # Le compactage renumérote les lignes
+            state.row_of_key = {key: row for row, key in enumerate(partition.keys)}
+            state.ids = partition.ids
+            # Sauvegarde différée comme pour les ajouts
+            state.unsaved += len(keys)
+            if state.unsaved >= self.save_every:
+                self._save_index(name, state)
+
+    def _on_drop(self, name: str):
+        self._build_locks.pop(name, None)
+        state = self._indexes.pop(name, None)
+        if state is not None:
+            # Attendre une sauvegarde en cours avant la suppression du répertoire
+            with state.lock:
+                pass
+
+    def reset(self):
+        with self._lock:
+            for name in list(self._indexes):
+                self._on_drop(name)
+            super().reset()
+
+    # ===== GESTION DES INDEX =====
+
+    def _index_paths(self, name: str) -> Tuple[str, str]:
+        directory = os.path.join(self.path, name)
+        return os.path.join(directory, "index.faiss"), os.path.join(directory, "index.json")
+
+    def _index_for(self, view: _PartitionView) -> Optional[_PartitionIndex]:
+        """
+        Loaded index of a snapshot's partition, loading or building it on first use
+
+        Loading and building read the snapshot outside the store lock; one
+        thread per partition does it while the others search exactly. Returns
+        None when the partition changed under the build (compaction, drop).
+        """
+        name = os.path.basename(view.partition.path)
+        with self._lock:
+            state = self._indexes.get(name)
+            if state is not None or not len(view):
+                return state
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+
+        if not build_lock.acquire(blocking=False):
+            return None
+        try:
+            with self._lock:
+                state = self._indexes.get(name)
+                if state is not None:
+                    return state
+
+            loaded = self._load_index(name, view)
+            state = loaded or self._build_index(name, view)
+
+            with self._lock:
+                partition = self._partitions.get(name)
+                if partition is not view.partition or partition.ids is not view.ids:
+                    return None
+                # Lignes ajoutées pendant la construction
+                pending = list(range(len(view), len(partition)))
+                if pending:
+                    keys = [partition.keys[row] for row in pending]
+                    state.index.add_with_ids(np.ascontiguousarray(partition.matrix[pending]),
+                                             np.asarray(keys, dtype=np.int64))
+                    state.row_of_key.update({key: row for row, key in zip(pending, keys)})
+                    state.max_key = max(state.max_key, max(keys))
+                    state.unsaved += len(pending)
+                if self._needs_rebuild(state, len(partition)):
+                    return None
+                self._indexes[name] = state
+
+            if loaded is None or state.unsaved >= self.save_every:
+                with state.lock:
+                    if self._indexes.get(name) is state:
+                        self._save_index(name, state)
+            self.logger.info(f"Index FAISS {'chargé' if loaded else 'construit'} : {name} "
+                             f"({state.kind}, {state.index.ntotal} vecteurs)")
+            return state
+        finally:
+            build_lock.release()
+
+    def _load_index(self, name: str, view: _PartitionView) -> Optional[_PartitionIndex]:
+        """Read a persisted index and catch it up with the snapshot rows appended since it was saved"""
+        index_path, meta_path = self._index_paths(name)
+        if not (os.path.exists(index_path) and os.path.exists(meta_path)):
+            return None
+
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            index = self.faiss.read_index(index_path)
+        except Exception as e:
+            self.logger.warning(f"Index FAISS illisible pour {name}, reconstruction : {str(e)}")
+            return None
+
+        size = len(view)
+        keys = view.keys[:size]
+        pending = [row for row, key in enumerate(keys) if key > meta["max_key"]]
+        if index.ntotal + len(pending) != size or index.d != view.matrix.shape[1]:
+            # Suppressions non reportées dans l'index sauvegardé
+            return None
+
+        state = _PartitionIndex(index, meta["kind"], meta["trained_size"], meta["max_key"],
+                                {key: row for row, key in enumerate(keys)}, view.ids)
+        if self._needs_rebuild(state, size):
+            return None
+
+        if pending:
+            state.index.add_with_ids(np.ascontiguousarray(view.matrix[pending]),
+                                     np.asarray([keys[row] for row in pending], dtype=np.int64))
+            state.max_key = max(keys)
+            state.unsaved = len(pending)
+        return state
+
+    def _build_index(self, name: str, view: _PartitionView) -> _PartitionIndex:
+        """Build (and train, for IVF) an index from the snapshot's matrix"""
+        faiss = self.faiss
+        size, dimension = len(view), view.matrix.shape[1]
+        keys = np.asarray(view.keys[:size], dtype=np.int64)
+
+        if size < self.min_ivf_size:
+            kind = "flat"
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        else:
+            kind = "ivf"
+            nlist = max(1, min(int(4 * np.sqrt(size)), size // 39))
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+            sample_size = min(size, 256 * nlist)
+            sample = np.random.default_rng(0).choice(size, sample_size, replace=False) if sample_size < size else np.arange(size)
+            index.train(np.ascontiguousarray(view.matrix[np.sort(sample)]))
+
+        for start in range(0, size, ADD_BATCH_ROWS):
+            end = min(start + ADD_BATCH_ROWS, size)
+            index.add_with_ids(np.ascontiguousarray(view.matrix[start:end]), keys[start:end])
+
+        return _PartitionIndex(index, kind, size, int(keys.max()),
+                               {int(key): row for row, key in enumerate(keys)}, view.ids)
+
+    def _needs_rebuild(self, state: _PartitionIndex, size: int) -> bool:
+        if state.kind == "flat":
+            return size >= self.min_ivf_size
+        return size > RETRAIN_GROWTH_FACTOR * state.trained_size
+
+    def _save_index(self, name: str, state: _PartitionIndex):
+        """Persist an index (call with state.lock held)"""
+        index_path, meta_path = self._index_paths(name)
+        self.faiss.write_index(state.index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"kind": state.kind, "trained_size": state.trained_size, "max_key": state.max_key}, f)
+        state.unsaved = 0
+
+    def _drop_index(self, name: str):
+        state = self._indexes.pop(name, None)
+        if state is not None:
+            state.lock.acquire()
+        try:
+            for path in self._index_paths(name):
+                if os.path.exists(path):
+                    os.remove(path)
+        finally:
+            if state is not None:
+                state.lock.release()
+
+    def index_stats(self) -> Dict[str, Any]:
+        """Kind and size of every loaded partition index"""
+        with self._lock:
+            return {
+                name: {"kind": state.kind, "vectors": state.index.ntotal, "unsaved": state.unsaved}
+                for name, state in self._indexes.items()
+            }
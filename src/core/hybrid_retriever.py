@@ -0,0 +1,177 @@
+"""
+Hybrid lexical + dense retrieval for project documents
+
+Requirements documents are full of identifiers, acronyms and exact terms
+("FR-012", "SOC") that embeddings match poorly. The hybrid retriever runs a
+BM25 full-text search (SQLite FTS5) on the calling thread while the dense
+vector search runs on the retriever's worker pool, one call each, and merges
+both candidate lists with weighted reciprocal rank fusion (RRF):
+score(d) = sum_i weight_i / (rrf_k + rank_i(d)).
+"""
+
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from config import config
+
+
+def reciprocal_rank_fusion(ranked_lists: Sequence[Sequence[Hashable]],
+                           weights: Optional[Sequence[float]] = None,
+                           rrf_k: int = 60) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked lists of keys with weighted reciprocal rank fusion
+
+    Returns:
+        (key, score) pairs sorted by decreasing fused score; ties keep the
+        order of first appearance
+    """
+    weights = list(weights) if weights is not None else [1.0] * len(ranked_lists)
+    if len(weights) != len(ranked_lists):
+        raise ValueError("One weight is required per ranked list")
+
+    scores: Dict[Hashable, float] = {}
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, key in enumerate(ranked, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (rrf_k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever:
+    """Parallel BM25 + vector search over a project's chunks, fused with RRF"""
+
+    def __init__(self,
+                 persistence_service,
+                 lexical_weight: Optional[float] = None,
+                 dense_weight: Optional[float] = None,
+                 rrf_k: Optional[int] = None,
+                 candidates: Optional[int] = None):
+        """
+        Args:
+            persistence_service: PersistenceService providing search_chunks (BM25)
+            lexical_weight: RRF weight of the full-text ranking
+            dense_weight: RRF weight of the vector ranking
+            rrf_k: RRF rank offset; larger values flatten the contribution of top ranks
+            candidates: Candidates fetched from each retriever (at least top_k)
+        """
+        self.persistence_service = persistence_service
+        self.lexical_weight = config.HYBRID_LEXICAL_WEIGHT if lexical_weight is None else lexical_weight
+        self.dense_weight = config.HYBRID_DENSE_WEIGHT if dense_weight is None else dense_weight
+        self.rrf_k = rrf_k or config.HYBRID_RRF_K
+        self.candidates = candidates or config.HYBRID_CANDIDATES
+        self.logger = logging.getLogger(__name__)
+
+        # Pool durable : un pool par requête créerait un thread (et une connexion SQLite) à chaque question
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-dense")
+
+    def retrieve(self, collection, query: str, project_id: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Return the fused top_k chunks of a project
+
+        Each result carries content, metadata, id, distance, the fused score
+        and the rank in each source list. distance is the vector distance
+        returned by the dense search; it is None for a chunk found only by the
+        full-text search, whose relevance is given by score and lexical_rank.
+        """
+        n_candidates = max(top_k, self.candidates)
+
+        # Contexte copié : l'embedding de la requête garde la priorité LLM de l'appelant (chat)
+        dense_future = self._executor.submit(contextvars.copy_context().run, self._dense_search,
+                                             collection, query, project_id, n_candidates)
+        # Requête BM25 de l'ordre de la milliseconde : exécutée sur le thread appelant
+        lexical = self._lexical_search(query, project_id, n_candidates)
+        dense = dense_future.result()
+
+        # Les ids ChromaDB et SQLite diffèrent : fusion sur (document_id, chunk_index)
+        candidates: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for result in dense + lexical:
+            candidates.setdefault(result["key"], result)
+
+        fused = reciprocal_rank_fusion(
+            [[result["key"] for result in lexical], [result["key"] for result in dense]],
+            weights=[self.lexical_weight, self.dense_weight],
+            rrf_k=self.rrf_k
+        )
+
+        lexical_ranks = {result["key"]: rank for rank, result in enumerate(lexical, start=1)}
+        dense_ranks = {result["key"]: rank for rank, result in enumerate(dense, start=1)}
+
+        results = []
+        for key, score in fused[:top_k]:
+            result = candidates[key]
+            results.append({
+                "content": result["content"],
+                "metadata": result["metadata"],
+                "distance": result.get("distance"),
+                "id": result["id"],
+                "score": round(score, 6),
+                "lexical_rank": lexical_ranks.get(key),
+                "dense_rank": dense_ranks.get(key)
+            })
+
+        self.logger.debug(f"Recherche hybride : {len(lexical)} candidats BM25, {len(dense)} candidats vectoriels, "
+                          f"{len(results)} résultats fusionnés")
+        return results
+
+    def close(self):
+        """Stop the dense search worker pool"""
+        self._executor.shutdown(wait=False)
+
+    def _lexical_search(self, query: str, project_id: str, limit: int) -> List[Dict[str, Any]]:
+        """BM25 candidates from the SQLite full-text index"""
+        try:
+            chunks = self.persistence_service.search_chunks(project_id, query, limit=limit)
+        except Exception as e:
+            self.logger.warning(f"Recherche plein texte indisponible : {str(e)}")
+            return []
+
+        results = []
+        for chunk in chunks:
+            metadata = dict(chunk.get("metadata", {}))
+            metadata.update({
+                "document_id": chunk["document_id"],
+                "project_id": project_id,
+                "chunk_index": chunk["chunk_index"]
+            })
+            results.append({
+                "key": (chunk["document_id"], chunk["chunk_index"]),
+                "id": f"{chunk['document_id']}_chunk_{chunk['chunk_index']}",
+                "content": chunk["content"],
+                "metadata": metadata
+            })
+        return results
+
+    def _dense_search(self, collection, query: str, project_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Vector candidates from the collection, restricted to the project"""
+        try:
+            response = collection.query(
+                query_texts=[query],
+                n_results=limit,
+                where={"project_id": project_id}
+            )
+        except Exception as e:
+            self.logger.warning(f"Recherche vectorielle indisponible : {str(e)}")
+            return []
+
+        if not response.get("documents") or not response["documents"][0]:
+            return []
+
+        documents = response["documents"][0]
+        metadatas = response["metadatas"][0] if response.get("metadatas") else [{}] * len(documents)
+        distances = response["distances"][0] if response.get("distances") else [None] * len(documents)
+        ids = response["ids"][0] if response.get("ids") else [""] * len(documents)
+
+        results = []
+        for content, metadata, distance, chunk_id in zip(documents, metadatas, distances, ids):
+            metadata = metadata or {}
+            key = (metadata.get("document_id", chunk_id), metadata.get("chunk_index", chunk_id))
+            results.append({
+                "key": key,
+                "id": chunk_id,
+                "content": content,
+                "metadata": metadata,
+                "distance": distance
+            })
+        return results
@@ -0,0 +1,221 @@
+"""
+Parallel Document Ingestion Pipeline
+
+Staged pipeline used by the persistent RAG systems to ingest many files at once:
+
+1. Registration (caller thread): hash check and document registration in SQLite
+2. Parsing (process pool): CPU-bound PDF/DOCX/text extraction and chunking
+3. Writing (thread pool): chunk persistence, embedding and vector store writes
+
+A bounded number of documents may be between stages 2 and 3 at any time, so
+parsing never races far ahead of the embedding server (backpressure).
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import config
+
+_worker_processor = None
+
+
+def extract_document_content(file_path: str) -> str:
+    """Extraire le texte brut d'un fichier selon son extension"""
+    file_extension = file_path.lower().split('.')[-1]
+
+    if file_extension in ['txt', 'md']:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    if file_extension == 'pdf':
+        import PyPDF2
+        content = ""
+        with open(file_path, 'rb') as f:
+            pdf_reader = PyPDF2.PdfReader(f)
+            for page in pdf_reader.pages:
+                content += page.extract_text() + "\n"
+        return content
+
+    if file_extension == 'docx':
+        from docx import Document
+        doc = Document(file_path)
+        return "\n".join(paragraph.text for paragraph in doc.paragraphs)
+
+    raise ValueError(f"Type de fichier non supporté : {file_extension}")
+
+
+def parse_and_chunk_document(file_path: str) -> List[Dict[str, Any]]:
+    """Parse and chunk one document (runs inside a worker process)"""
+    global _worker_processor
+    if _worker_processor is None:
+        from .document_processor import ArcadiaDocumentProcessor
+        _worker_processor = ArcadiaDocumentProcessor()
+
+    content = extract_document_content(file_path)
+    return _worker_processor._chunk_text_with_metadata(
+        content,
+        {"source": file_path, "filename": file_path.split('/')[-1]}
+    )
+
+
+class DocumentIngestionPipeline:
+    """Ingest files through bounded parse (process) and write (thread) worker pools"""
+
+    def __init__(self,
+                 persistence_service,
+                 vector_writer: Callable[[List[Dict[str, Any]], str, str], None],
+                 parse_workers: Optional[int] = None,
+                 write_workers: Optional[int] = None,
+                 max_pending_documents: Optional[int] = None):
+        """
+        Args:
+            persistence_service: PersistenceService used for registration and chunk storage
+            vector_writer: Callable(chunks, doc_id, project_id) embedding and storing the chunks
+            parse_workers: Processes for parsing (defaults to config / CPU count)
+            write_workers: Threads for chunk persistence and vector writes
+            max_pending_documents: Documents allowed between submission and completed write
+        """
+        self.persistence_service = persistence_service
+        self.vector_writer = vector_writer
+        self.parse_workers = max(1, parse_workers or config.INGESTION_PARSE_WORKERS or os.cpu_count() or 1)
+        self.write_workers = max(1, write_workers or config.INGESTION_WRITE_WORKERS)
+        self.max_pending_documents = max(1, max_pending_documents or config.INGESTION_MAX_PENDING_DOCUMENTS)
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, file_paths: List[str], project_id: str) -> Dict[str, Any]:
+        """
+        Ingest files into a project
+
+        Returns:
+            Dictionary with processed_files, skipped_files, new_chunks, total_chunks and errors,
+            listed in input order regardless of completion order
+        """
+        results: Dict[str, Any] = {
+            "processed_files": [],
+            "skipped_files": [],
+            "new_chunks": 0,
+            "total_chunks": 0,
+            "errors": []
+        }
+
+        # Étape 1 : vérification des doublons et enregistrement (séquentiel, rapide)
+        pending: List[Tuple[str, str]] = []
+        for file_path in file_paths:
+            try:
+                is_processed, doc_id = self.persistence_service.is_document_processed(file_path, project_id)
+                if is_processed:
+                    self.logger.info(f"Document déjà traité : {file_path}")
+                    results["skipped_files"].append({
+                        "file_path": file_path,
+                        "reason": "already_processed",
+                        "document_id": doc_id
+                    })
+                else:
+                    doc_id = self.persistence_service.register_document(file_path, project_id)
+                    pending.append((file_path, doc_id))
+            except Exception as e:
+                error_msg = f"Erreur traitement {file_path} : {str(e)}"
+                self.logger.error(error_msg)
+                results["errors"].append(error_msg)
+
+        if not pending:
+            return results
+
+        self.logger.info(
+            f"Ingestion de {len(pending)} documents : {self.parse_workers} processus d'analyse, "
+            f"{self.write_workers} threads d'écriture, {self.max_pending_documents} documents en vol max"
+        )
+
+        outcomes = self._run_stages(pending, project_id)
+
+        # Assemblage déterministe dans l'ordre d'entrée
+        for (file_path, doc_id), (chunks_count, error) in zip(pending, outcomes):
+            if error:
+                results["errors"].append(error)
+                continue
+
+            results["processed_files"].append({
+                "file_path": file_path,
+                "document_id": doc_id,
+                "chunks_count": chunks_count
+            })
+            results["new_chunks"] += chunks_count
+            results["total_chunks"] += chunks_count
+
+        return results
+
+    def _run_stages(self, pending: List[Tuple[str, str]], project_id: str) -> List[Tuple[int, Optional[str]]]:
+        """Run parse and write stages with bounded in-flight documents"""
+        outcomes: List[Tuple[int, Optional[str]]] = [(0, None)] * len(pending)
+        slots = threading.BoundedSemaphore(self.max_pending_documents)
+
+        parse_pool = self._create_parse_pool(len(pending))
+
+        with parse_pool, ThreadPoolExecutor(max_workers=self.write_workers) as write_pool:
+
+            def on_parsed(index: int, parse_future: Future):
+                try:
+                    chunks = parse_future.result()
+                except Exception as e:
+                    fail(index, e)
+                    return
+
+                try:
+                    write_pool.submit(write_document, index, chunks)
+                except Exception as e:
+                    fail(index, e)
+
+            def fail(index: int, error: Exception):
+                """Record a document's error and free its in-flight slot"""
+                outcomes[index] = (0, f"Erreur traitement {pending[index][0]} : {str(error)}")
+                self.logger.error(outcomes[index][1])
+                slots.release()
+
+            def write_document(index: int, chunks: List[Dict[str, Any]]):
+                file_path, doc_id = pending[index]
+                try:
+                    # Documents tout juste enregistrés : aucun chunk existant à supprimer
+                    if not self.persistence_service.save_document_chunks(doc_id, project_id, chunks, append_only=True):
+                        outcomes[index] = (0, f"Erreur sauvegarde chunks : {file_path}")
+                        return
+
+                    self.vector_writer(chunks, doc_id, project_id)
+                    outcomes[index] = (len(chunks), None)
+                    self.logger.info(f"Document traité avec succès : {file_path} ({len(chunks)} chunks)")
+                except Exception as e:
+                    outcomes[index] = (0, f"Erreur traitement {file_path} : {str(e)}")
+                    self.logger.error(outcomes[index][1])
+                finally:
+                    slots.release()
+
+            for index, (file_path, _) in enumerate(pending):
+                # Backpressure : attendre qu'un document termine son écriture
+                slots.acquire()
+                try:
+                    parse_future = parse_pool.submit(parse_and_chunk_document, file_path)
+                except Exception as e:
+                    # Pool cassé ou arrêté : le document échoue sans retenir son emplacement
+                    fail(index, e)
+                    continue
+                parse_future.add_done_callback(lambda future, index=index: on_parsed(index, future))
+
+            # Attendre que toutes les analyses aient été transmises à l'étape d'écriture
+            for _ in range(self.max_pending_documents):
+                slots.acquire()
+
+        return outcomes
+
+    def _create_parse_pool(self, document_count: int):
+        """Create the parsing pool, falling back to threads where processes are unavailable"""
+        workers = min(self.parse_workers, document_count)
+        if workers > 1:
+            try:
+                # spawn : pas de fork d'un processus multithread (verrous SQLite, pools HTTP)
+                return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, NotImplementedError) as e:
+                self.logger.warning(f"Pool de processus indisponible, analyse en threads : {str(e)}")
+        return ThreadPoolExecutor(max_workers=workers)
@@ -9,6 +9,8 @@ from ..models.arcadia_outputs import (
     OperationalScenario, OperationalProcess, OperationalAnalysisOutput,
     ARCADIAPhaseType, create_extraction_metadata
 )
+from .task_dag import TaskDAG, DAGScheduler
+from config import config
 
 class OperationalAnalysisExtractor:
     """
@@ -71,34 +73,100 @@ class OperationalAnalysisExtractor:
         """
         self.logger.info("Starting operational analysis extraction")
         
-        start_time = datetime.now()
-        source_docs = source_documents or ["proposal_text"]
+        dag = TaskDAG()
+        final_task = self.add_extraction_tasks(dag, context_chunks, proposal_text, source_documents)
+        report = DAGScheduler(config.STRUCTURED_ANALYSIS_MAX_CONCURRENCY).run(dag)
         
-        # Step 1: Extract actors and stakeholders
-        self.logger.info("Step 1: Extracting operational actors and stakeholders")
-        actors = self._extract_operational_actors(context_chunks, proposal_text)
-        entities = self._extract_operational_entities(context_chunks, proposal_text)
+        result = report.results[final_task]
+        if result is None:
+            raise RuntimeError(f"Operational analysis extraction failed: {report.errors}")
+        result.extraction_metadata["task_timings"] = report.to_dict()
+        return result
+    
+    def add_extraction_tasks(self,
+                             dag: TaskDAG,
+                             context_chunks: List[Dict[str, Any]],
+                             proposal_text: str,
+                             source_documents: Optional[List[str]] = None,
+                             prefix: str = "operational") -> str:
+        """
+        Register the operational sub-extractions as DAG tasks
         
-        # Step 2: Extract operational capabilities
-        self.logger.info("Step 2: Extracting operational capabilities")
-        capabilities = self._extract_operational_capabilities(context_chunks, proposal_text, actors)
+        Capabilities, scenarios and processes only need the actors; activities
+        need actors and capabilities; entities need nothing. The returned task
+        assembles the OperationalAnalysisOutput once every step has finished.
         
-        # Step 3: Extract operational scenarios
-        self.logger.info("Step 3: Extracting operational scenarios")
-        scenarios = self._extract_operational_scenarios(context_chunks, proposal_text, actors)
+        Returns:
+            Name of the task producing the OperationalAnalysisOutput
+        """
+        start_time = datetime.now()
+        source_docs = source_documents or ["proposal_text"]
         
-        # Step 4: Extract operational activities and interactions
-        self.logger.info("Step 4: Extracting operational activities and interactions")
-        try:
-            activities = self._extract_operational_activities(context_chunks, proposal_text, actors, capabilities)
-            self.logger.info(f"DEBUG: Successfully extracted {len(activities) if activities else 0} activities")
-        except Exception as e:
-            self.logger.error(f"ERROR: Failed to extract activities: {str(e)}")
-            activities = []
+        actors_task = dag.add_task(
+            f"{prefix}.actors",
+            lambda deps: self._extract_operational_actors(context_chunks, proposal_text)
+        )
+        entities_task = dag.add_task(
+            f"{prefix}.entities",
+            lambda deps: self._extract_operational_entities(context_chunks, proposal_text)
+        )
+        capabilities_task = dag.add_task(
+            f"{prefix}.capabilities",
+            lambda deps: self._extract_operational_capabilities(
+                context_chunks, proposal_text, deps[actors_task] or []
+            ),
+            [actors_task]
+        )
+        scenarios_task = dag.add_task(
+            f"{prefix}.scenarios",
+            lambda deps: self._extract_operational_scenarios(
+                context_chunks, proposal_text, deps[actors_task] or []
+            ),
+            [actors_task]
+        )
+        activities_task = dag.add_task(
+            f"{prefix}.activities",
+            lambda deps: self._extract_operational_activities(
+                context_chunks, proposal_text, deps[actors_task] or [], deps[capabilities_task] or []
+            ),
+            [actors_task, capabilities_task]
+        )
+        processes_task = dag.add_task(
+            f"{prefix}.processes",
+            lambda deps: self._extract_operational_processes(
+                context_chunks, proposal_text, deps[actors_task] or []
+            ),
+            [actors_task]
+        )
         
-        # Step 5: Extract operational processes
-        self.logger.info("Step 5: Extracting operational processes")
-        processes = self._extract_operational_processes(context_chunks, proposal_text, actors)
+        return dag.add_task(
+            prefix,
+            lambda deps: self._assemble_operational_output(
+                actors=deps[actors_task] or [],
+                entities=deps[entities_task] or [],
+                capabilities=deps[capabilities_task] or [],
+                scenarios=deps[scenarios_task] or [],
+                activities=deps[activities_task] or [],
+                processes=deps[processes_task] or [],
+                context_chunks=context_chunks,
+                source_docs=source_docs,
+                start_time=start_time
+            ),
+            [actors_task, entities_task, capabilities_task, scenarios_task, activities_task, processes_task]
+        )
+    
+    def _assemble_operational_output(self,
+                                     actors: List[OperationalActor],
+                                     entities: List[OperationalEntity],
+                                     capabilities: List[OperationalCapability],
+                                     scenarios: List[OperationalScenario],
+                                     activities: List[Dict[str, Any]],
+                                     processes: List[OperationalProcess],
+                                     context_chunks: List[Dict[str, Any]],
+                                     source_docs: List[str],
+                                     start_time: datetime) -> OperationalAnalysisOutput:
+        """Build the operational analysis output from the extracted elements"""
+        self.logger.info(f"DEBUG: Successfully extracted {len(activities)} activities")
         
         # Create extraction metadata
         processing_stats = {
@@ -106,7 +174,7 @@ class OperationalAnalysisExtractor:
             "entities_extracted": len(entities), 
             "capabilities_extracted": len(capabilities),
             "scenarios_extracted": len(scenarios),
-            "activities_extracted": len(activities) if activities else 0,
+            "activities_extracted": len(activities),
             "processes_extracted": len(processes),
             "processing_time_seconds": (datetime.now() - start_time).total_seconds()
         }
@@ -124,9 +192,9 @@ class OperationalAnalysisExtractor:
         )
         
         # Add extracted activities to metadata for enhanced operational analysis
-        self.logger.info(f"DEBUG: Adding {len(activities) if activities else 0} activities to metadata")
+        self.logger.info(f"DEBUG: Adding {len(activities)} activities to metadata")
         self.logger.info(f"DEBUG: Sample activity: {activities[0] if activities else 'None'}")
-        metadata["operational_activities"] = activities if activities else []
+        metadata["operational_activities"] = activities
         
         result = OperationalAnalysisOutput(
             actors=actors,
@@ -139,7 +207,7 @@ class OperationalAnalysisExtractor:
         
         self.logger.info(f"Enhanced operational analysis extraction completed: {len(actors)} actors, "
                         f"{len(capabilities)} capabilities, {len(scenarios)} scenarios, "
-                        f"{len(activities) if activities else 0} activities with interactions, "
+                        f"{len(activities)} activities with interactions, "
                         f"{len(processes)} processes")
         
         return result
@@ -1,20 +1,22 @@
-import ollama
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Iterator, Tuple, Optional
 import json
 from src.core.document_processor import ArcadiaDocumentProcessor
 from src.core.requirements_generator import RequirementsGenerator
 from config import config, arcadia_config
 import logging
 from ..utils.enhanced_requirement_extractor import EnhancedRequirementExtractor
+from .retrieval_cache import RetrievalCache
+from .chat_streaming import ChatTurnMetrics, stream_chat_answer
+from .vector_store import create_vector_store
+from ..services.llm_gateway import get_llm_gateway
+from concurrent.futures import ThreadPoolExecutor
 import time
 
 class SAFEMBSERAGSystem:
     def __init__(self):
-        self.ollama_client = ollama.Client(host=config.OLLAMA_BASE_URL)
-        self.chroma_client = chromadb.PersistentClient(path=config.VECTORDB_PATH)
+        self.ollama_client = get_llm_gateway()
         self.collection = self._get_or_create_collection()
+        self.retrieval_cache = RetrievalCache()
         self.doc_processor = ArcadiaDocumentProcessor()
         self.req_generator = RequirementsGenerator(self.ollama_client)
         self.logger = logging.getLogger(__name__)
@@ -25,20 +27,18 @@ class SAFEMBSERAGSystem:
         self.logger.info("RAG system initialized with ChromaDB default embeddings")
     
     def _get_or_create_collection(self):
-        """Get or create ChromaDB collection for SAFE MBSE"""
-        try:
-            collection = self.chroma_client.get_collection(name=config.COLLECTION_NAME)
-        except:
-            collection = self.chroma_client.create_collection(
-                name=config.COLLECTION_NAME,
-                metadata={"description": "SAFE MBSE Requirements Generation System"}
-            )
-        return collection
+        """Get or create the vector store for SAFE MBSE (backend from config.VECTOR_STORE_BACKEND)"""
+        return create_vector_store(
+            config.COLLECTION_NAME,
+            metadata={"description": "SAFE MBSE Requirements Generation System"},
+            ollama_client=self.ollama_client
+        )
     
     def generate_requirements_from_proposal(self, 
                                           proposal_text: str, 
                                           target_phase: str = "all",
-                                          requirement_types: Optional[List[str]] = None) -> Dict:
+                                          requirement_types: Optional[List[str]] = None,
+                                          max_llm_parallelism: Optional[int] = None) -> Dict:
         """
         Generate requirements from project proposal using ARCADIA methodology
         
@@ -46,6 +46,8 @@ class SAFEMBSERAGSystem:
             proposal_text: The project proposal text
             target_phase: ARCADIA phase to focus on ("operational", "system", "logical", "physical", "all")
             requirement_types: Types of requirements to generate ["functional", "non_functional", "stakeholder"]
+            max_llm_parallelism: Maximum phase/type generations run concurrently
+                                 (defaults to config.REQUIREMENTS_MAX_LLM_PARALLELISM, 1 = sequential)
         
         Returns:
             Dictionary containing generated requirements organized by phase and type
@@ -53,6 +55,9 @@ class SAFEMBSERAGSystem:
         if requirement_types is None:
             requirement_types = ["functional", "non_functional", "stakeholder"]
         
+        if max_llm_parallelism is None:
+            max_llm_parallelism = config.REQUIREMENTS_MAX_LLM_PARALLELISM
+        
         results: Dict = {
             "metadata": {
                 "source": "project_proposal",
@@ -71,6 +76,8 @@ class SAFEMBSERAGSystem:
         # Generate requirements for each phase
         phases_to_process = [target_phase] if target_phase != "all" else list(arcadia_config.ARCADIA_PHASES.keys())
         
+        # Build the independent phase/type generation tasks in canonical order
+        tasks: List[Tuple[str, str, List[Dict]]] = []
         for phase in phases_to_process:
             if phase not in results["requirements"]:
                 results["requirements"][phase] = {}
@@ -79,22 +86,45 @@ class SAFEMBSERAGSystem:
             
             # Generate stakeholder requirements (mainly for operational phase)
             if "stakeholder" in requirement_types and phase == "operational":
-                stakeholders = self.req_generator.generate_stakeholders(phase_context, proposal_text)
-                results["stakeholders"] = stakeholders
-            
-            # Generate functional requirements (skip for operational phase - focus on stakeholder needs)
-            if "functional" in requirement_types and phase != "operational":
-                functional_reqs = self.req_generator.generate_functional_requirements(
-                    phase_context, phase, proposal_text
-                )
-                results["requirements"][phase]["functional"] = functional_reqs
+                tasks.append((phase, "stakeholder", phase_context))
             
-            # Generate non-functional requirements (skip for operational phase - focus on stakeholder needs)  
-            if "non_functional" in requirement_types and phase != "operational":
-                nf_reqs = self.req_generator.generate_non_functional_requirements(
-                    phase_context, phase, proposal_text
-                )
-                results["requirements"][phase]["non_functional"] = nf_reqs
+            # Functional and non-functional requirements skip the operational phase (focus on stakeholder needs)
+            for req_type in ["functional", "non_functional"]:
+                if req_type in requirement_types and phase != "operational":
+                    tasks.append((phase, req_type, phase_context))
+        
+        def run_task(task: Tuple[str, str, List[Dict]]):
+            phase, req_type, phase_context = task
+            if req_type == "stakeholder":
+                return self.req_generator.generate_stakeholders(phase_context, proposal_text)
+            if req_type == "functional":
+                return self.req_generator.generate_functional_requirements(phase_context, phase, proposal_text)
+            return self.req_generator.generate_non_functional_requirements(phase_context, phase, proposal_text)
+        
+        concurrent = max_llm_parallelism > 1 and len(tasks) > 1
+        if concurrent:
+            start_counters = dict(self.req_generator.requirement_counters)
+            start_time = time.time()
+            with ThreadPoolExecutor(max_workers=min(max_llm_parallelism, len(tasks))) as executor:
+                task_results = list(executor.map(run_task, tasks))
+            self.logger.info(f"Generated {len(tasks)} phase/type tasks concurrently "
+                             f"(parallelism {max_llm_parallelism}) in {time.time() - start_time:.1f}s")
+        else:
+            task_results = [run_task(task) for task in tasks]
+        
+        # Assemble results in task order so output does not depend on completion order
+        for (phase, req_type, _), task_result in zip(tasks, task_results):
+            if req_type == "stakeholder":
+                results["stakeholders"] = task_result
+            else:
+                results["requirements"][phase][req_type] = task_result
+        
+        if concurrent:
+            self.req_generator.renumber_requirements(
+                [(req_type, task_result) for (_, req_type, _), task_result in zip(tasks, task_results)
+                 if req_type != "stakeholder"],
+                start_counters
+            )
         
         # Generate statistics
         results["statistics"] = self._calculate_generation_statistics(results)
@@ -437,12 +467,13 @@ class SAFEMBSERAGSystem:
         
         return reqif_content
 
-    def add_documents_to_vectorstore(self, file_paths: List[str]) -> Dict:
+    def add_documents_to_vectorstore(self, file_paths: List[str], batch_size: Optional[int] = None) -> Dict:
         """
         Add documents to the vector store for chat functionality
         
         Args:
             file_paths: List of file paths to process and add
+            batch_size: Chunks per collection.add call (defaults to config.VECTORSTORE_BATCH_SIZE)
             
         Returns:
             Dictionary with processing results
@@ -570,29 +601,22 @@ class SAFEMBSERAGSystem:
                 
                 self.logger.info(f"   📊 Created {len(text_chunks)} text chunks")
                 
-                # Add documents to vector store (using ChromaDB's default embeddings)
+                # Add documents to vector store in batches (ChromaDB handles embedding generation)
+                chunk_ids = [
+                    f"{file_path.replace('/', '_').replace(' ', '_')}_{i}_{len(chunk['content'])}"
+                    for i, chunk in enumerate(text_chunks)
+                ]
+                add_batch_size = max(1, batch_size or config.VECTORSTORE_BATCH_SIZE)
+                total_batches = (len(text_chunks) + add_batch_size - 1) // add_batch_size
+                
                 chunks_added_for_file = 0
-                for i, chunk in enumerate(text_chunks):
-                    try:
-                        # Create unique chunk ID
-                        chunk_id = f"{file_path.replace('/', '_').replace(' ', '_')}_{i}_{len(chunk['content'])}"
-                        
-                        # Add to ChromaDB (ChromaDB will handle embedding generation automatically)
-                        self.collection.add(
-                            documents=[chunk["content"]],
-                            metadatas=[chunk["metadata"]],
-                            ids=[chunk_id]
-                        )
-                        
-                        chunks_added_for_file += 1
-                        results["chunks_added"] += 1
-                        
-                        if (i + 1) % 10 == 0:  # Log progress every 10 chunks
-                            self.logger.info(f"     - Processed {i + 1}/{len(text_chunks)} chunks")
-                        
-                    except Exception as e:
-                        self.logger.error(f"   ❌ Error processing chunk {i} from {file_path}: {str(e)}")
-                        results["errors"].append(f"Chunk {i} from {file_path}: {str(e)}")
+                for batch_num, start in enumerate(range(0, len(text_chunks), add_batch_size), 1):
+                    indices = list(range(start, min(start + add_batch_size, len(text_chunks))))
+                    added = self._add_chunk_batch(indices, text_chunks, chunk_ids, file_path, results["errors"])
+                    
+                    chunks_added_for_file += added
+                    results["chunks_added"] += added
+                    self.logger.info(f"     - Batch {batch_num}/{total_batches}: {added}/{len(indices)} chunks added")
                 
                 results["processed"] += 1
                 self.logger.info(f"✅ File completed: {file_path} - {chunks_added_for_file} chunks added successfully")
@@ -601,9 +625,46 @@ class SAFEMBSERAGSystem:
                 self.logger.error(f"❌ Error processing file {file_path}: {str(e)}")
                 results["errors"].append(f"File {file_path}: {str(e)}")
         
+        if results["chunks_added"]:
+            self.retrieval_cache.invalidate(None)
+        
         self.logger.info(f"🎉 Vectorstore processing completed: {results['processed']}/{len(file_paths)} files, {results['chunks_added']} total chunks")
         return results
 
+    def _add_chunk_batch(self,
+                         indices: List[int],
+                         chunks: List[Dict],
+                         chunk_ids: List[str],
+                         file_path: str,
+                         errors: List[str]) -> int:
+        """
+        Add a batch of chunks with a single collection.add call
+        
+        On failure the batch is split in halves and retried recursively, so a
+        bad chunk only costs its own insertion and is reported individually.
+        
+        Returns:
+            Number of chunks successfully added
+        """
+        try:
+            self.collection.add(
+                documents=[chunks[i]["content"] for i in indices],
+                metadatas=[chunks[i]["metadata"] for i in indices],
+                ids=[chunk_ids[i] for i in indices]
+            )
+            return len(indices)
+            
+        except Exception as e:
+            if len(indices) == 1:
+                self.logger.error(f"   ❌ Error processing chunk {indices[0]} from {file_path}: {str(e)}")
+                errors.append(f"Chunk {indices[0]} from {file_path}: {str(e)}")
+                return 0
+            
+            self.logger.warning(f"   ⚠️  Batch of {len(indices)} chunks failed, splitting: {str(e)}")
+            middle = len(indices) // 2
+            return (self._add_chunk_batch(indices[:middle], chunks, chunk_ids, file_path, errors) +
+                    self._add_chunk_batch(indices[middle:], chunks, chunk_ids, file_path, errors))
+
     def query_documents(self, query: str, top_k: int = 5) -> Dict:
         """
         Query the document vector store for chat functionality
@@ -618,68 +679,21 @@ class SAFEMBSERAGSystem:
         self.logger.info(f"💬 Processing query: {query[:100]}...")
         
         try:
-            # Search vector store using ChromaDB's built-in text search
-            search_results = self.collection.query(
-                query_texts=[query],
-                n_results=top_k
-            )
+            messages, context_docs = self._prepare_chat_turn(query, top_k)
             
-            # Extract context documents
-            context_docs = []
-            if search_results["documents"] and search_results["documents"][0]:
-                for i, (doc, metadata) in enumerate(zip(
-                    search_results["documents"][0],
-                    search_results["metadatas"][0]
-                )):
-                    context_docs.append(type('Document', (), {
-                        'page_content': doc,
-                        'metadata': metadata
-                    })())
+            response = self.ollama_client.chat(
+                model="llama3:instruct",
+                messages=messages
+            )
             
-            # Generate response using context
             if context_docs:
-                context_text = "\n\n".join([doc.page_content for doc in context_docs[:3]])
-                
-                prompt = f"""Based on the following context documents, please answer the user's question about ARCADIA methodology, MBSE, or the uploaded documents.
-
-Context:
-{context_text}
-
-User Question: {query}
-
-Please provide a comprehensive answer based on the context provided. If the context doesn't contain enough information to fully answer the question, acknowledge this and provide what information you can."""
-
-                response = self.ollama_client.chat(
-                    model="llama3:instruct",
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                
-                answer = response["message"]["content"]
-                
                 self.logger.info(f"✅ Generated response with {len(context_docs)} source documents")
-                
-                return {
-                    "answer": answer,
-                    "sources": context_docs,
-                    "query": query
-                }
             
-            else:
-                # No relevant documents found
-                fallback_response = self.ollama_client.chat(
-                    model="llama3:instruct",
-                    messages=[
-                        {"role": "user", "content": f"Please answer this question about ARCADIA methodology or MBSE: {query}"}
-                    ]
-                )
-                
-                return {
-                    "answer": fallback_response["message"]["content"],
-                    "sources": [],
-                    "query": query
-                }
+            return {
+                "answer": response["message"]["content"],
+                "sources": context_docs,
+                "query": query
+            }
                 
         except Exception as e:
             self.logger.error(f"❌ Error processing query: {str(e)}")
@@ -689,6 +703,65 @@ Please provide a comprehensive answer based on the context provided. If the cont
                 "query": query
             }
 
+    def query_documents_stream(self, query: str, top_k: int = 5) -> Iterator[Dict]:
+        """
+        Streaming variant of query_documents for the chat tab
+        
+        Yields a "sources" event as soon as retrieval is done, then "token"
+        events while llama3 generates, then a "done" event with the full
+        answer and the turn latency metrics (see src.core.chat_streaming).
+        """
+        self.logger.info(f"💬 Processing streamed query: {query[:100]}...")
+        metrics = ChatTurnMetrics()
+        
+        try:
+            messages, context_docs = self._prepare_chat_turn(query, top_k)
+            yield from stream_chat_answer(self.ollama_client, "llama3:instruct", messages, context_docs, metrics)
+        except Exception as e:
+            self.logger.error(f"❌ Error processing streamed query: {str(e)}")
+            yield {"type": "error", "message": f"I apologize, but I encountered an error processing your question: {str(e)}"}
+
+    def _prepare_chat_turn(self, query: str, top_k: int) -> Tuple[List[Dict], List]:
+        """Retrieve context documents and build the chat messages of a query"""
+        # Search vector store using ChromaDB's built-in text search (cached for repeated questions)
+        generation = self.retrieval_cache.generation(None)
+        search_results = self.retrieval_cache.get(None, query, top_k=top_k)
+        if search_results is None:
+            search_results = self.collection.query(
+                query_texts=[query],
+                n_results=top_k
+            )
+            self.retrieval_cache.put(None, query, search_results, generation=generation, top_k=top_k)
+        
+        # Extract context documents
+        context_docs = []
+        if search_results["documents"] and search_results["documents"][0]:
+            for i, (doc, metadata) in enumerate(zip(
+                search_results["documents"][0],
+                search_results["metadatas"][0]
+            )):
+                context_docs.append(type('Document', (), {
+                    'page_content': doc,
+                    'metadata': metadata
+                })())
+        
+        if not context_docs:
+            # No relevant documents found
+            return [{"role": "user", "content": f"Please answer this question about ARCADIA methodology or MBSE: {query}"}], []
+        
+        context_text = "\n\n".join([doc.page_content for doc in context_docs[:3]])
+        
+        prompt = f"""Based on the following context documents, please answer the user's question about ARCADIA methodology, MBSE, or the uploaded documents.
+
+Context:
+{context_text}
+
+User Question: {query}
+
+Please provide a comprehensive answer based on the context provided. If the context doesn't contain enough information to fully answer the question, acknowledge this and provide what information you can."""
+        
+        return [{"role": "user", "content": prompt}], context_docs
+
     def get_vectorstore_stats(self) -> Dict:
         """Get statistics about the current vector store"""
         try:
@@ -720,9 +793,9 @@ Please provide a comprehensive answer based on the context provided. If the cont
     def clear_vectorstore(self):
         """Clear all documents from the vector store"""
         try:
-            # Delete the collection and recreate it
-            self.chroma_client.delete_collection(name=config.COLLECTION_NAME)
-            self.collection = self._get_or_create_collection()
+            # Drop every document from the vector store
+            self.collection.reset()
+            self.retrieval_cache.invalidate(None)
             self.logger.info("✅ Vector store cleared successfully")
             return True
         except Exception as e:
@@ -1,10 +1,11 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import re
-from config import arcadia_config, requirements_templates
+from config import config, arcadia_config, requirements_templates
 import logging
 from .priority_analyzer import ARCADIAPriorityAnalyzer
 from .component_analyzer import ComponentAnalyzer
 from .enhanced_stakeholder_extractor import EnhancedStakeholderExtractor
+from ..services.llm_cache_service import LLMResponseCache
 
 class RequirementsGenerator:
     def __init__(self, ollama_client):
@@ -48,6 +49,14 @@ class RequirementsGenerator:
         
         # Cache for phase bridging context to avoid regeneration
         self._phase_bridging_cache = {}
+        
+        # Persistent LLM response cache shared by every _call_ai_model caller
+        self.response_cache: Optional[LLMResponseCache] = None
+        if config.LLM_CACHE_ENABLED:
+            self.response_cache = LLMResponseCache(
+                db_path=config.LLM_CACHE_PATH,
+                max_entries=config.LLM_CACHE_MAX_ENTRIES
+            )
     
     def _generate_phase_bridging_context(self, 
                                        context: List[Dict], 
@@ -781,6 +790,25 @@ QUALITY REQUIREMENTS:
         self.logger.info(f"Priority rebalancing for {req_type}: {priority_counts}")
         return rebalanced_requirements
 
+    def renumber_requirements(self, 
+                              requirement_lists: List[Tuple[str, List[Dict]]], 
+                              start_counters: Dict[str, int]) -> None:
+        """
+        Reassign sequential requirement IDs in the given order.
+        
+        Used after concurrent generation, where IDs are drawn from the shared
+        counters in completion order, so the final numbering follows the
+        phase/type order instead of thread scheduling.
+        """
+        counters = dict(start_counters)
+        for req_type, reqs in requirement_lists:
+            counter_key = "functional" if req_type == "functional" else "non_functional"
+            for req in reqs:
+                prefix = str(req.get("id", "")).rsplit("-", 1)[0] or ("FR" if req_type == "functional" else "NFR")
+                req["id"] = f"{prefix}-{counters[counter_key]:03d}"
+                counters[counter_key] += 1
+        self.requirement_counters.update(counters)
+
     def _calculate_priority_distribution(self, requirements: List[Dict]) -> Dict[str, int]:
         """Calculate current priority distribution"""
         distribution = {"MUST": 0, "SHOULD": 0, "COULD": 0}
@@ -789,27 +817,51 @@ QUALITY REQUIREMENTS:
             distribution[priority] = distribution.get(priority, 0) + 1
         return distribution
 
-    def _call_ai_model(self, prompt: str, model_type: str) -> str:
-        """Call appropriate AI model based on task type"""
-        from config import config
+    def _call_ai_model(self, prompt: str, model_type: str, use_cache: bool = True) -> str:
+        """Call appropriate AI model based on task type
         
+        Responses are served from the persistent LLM cache when an identical
+        (model, prompt, temperature, num_predict) request was already answered.
+        Pass use_cache=False to force a fresh generation.
+        """
         model_config = config.AI_MODELS.get(model_type, config.AI_MODELS["requirements_generation"])
+        model = model_config["model"]
+        temperature = model_config["temperature"]
+        num_predict = model_config["max_tokens"]
+        
+        cache = self.response_cache if use_cache else None
+        if cache:
+            cached_response = cache.get(model, prompt, temperature, num_predict)
+            if cached_response is not None:
+                self.logger.debug(f"LLM cache hit for {model_type} prompt")
+                return cached_response
         
         try:
             response = self.ollama_client.generate(
-                model=model_config["model"],
+                model=model,
                 prompt=prompt,
                 stream=False,
                 options={
-                    "temperature": model_config["temperature"],
-                    "num_predict": model_config["max_tokens"]
+                    "temperature": temperature,
+                    "num_predict": num_predict
                 }
             )
-            return response['response']
+            generated = response['response']
+            
+            if cache and generated:
+                cache.put(model, prompt, generated, temperature, num_predict)
+            
+            return generated
         except Exception as e:
             self.logger.error(f"Error calling AI model: {e}")
             return ""
     
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Return LLM response cache hit/miss counters"""
+        if not self.response_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.get_stats()}
+    
     def _prepare_context_text(self, context: List[Dict]) -> str:
         """Prepare context chunks for AI prompt"""
         return "\n\n".join([chunk["content"] for chunk in context[:5]])  # Limit to 5 chunks
@@ -0,0 +1,120 @@
+"""
+Retrieval result cache for chat queries
+
+Chat turns and Streamlit reruns often repeat the same question, and each one
+re-embeds the query and re-runs the vector search. Retrieval results are
+cached per project, keyed on the normalized query, the retrieval parameters
+and the project's content version, with TTL expiry and LRU eviction.
+
+Entries are invalidated automatically: the content version read from the
+persistence layer changes whenever a project's chunks are added or removed,
+and callers that modify a vector store directly call invalidate(project_id).
+Callers read generation(project_id) before searching and pass it to put(),
+so results computed before an invalidation are never stored.
+"""
+
+import re
+import copy
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from config import config
+
+
+class RetrievalCache:
+    """Thread-safe TTL + LRU cache of retrieval results, partitioned by project"""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max(1, max_entries or config.RETRIEVAL_CACHE_MAX_ENTRIES)
+        self.ttl_seconds = config.RETRIEVAL_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.logger = logging.getLogger(__name__)
+
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[Optional[str], int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Case-, whitespace- and trailing-punctuation-insensitive form of a query"""
+        return re.sub(r"\s+", " ", query.lower()).strip().rstrip("?!.;: ")
+
+    def get(self, project_id: Optional[str], query: str, version: Hashable = None, **params) -> Optional[Any]:
+        """Cached results for this query, or None on a miss"""
+        now = time.monotonic()
+
+        with self._lock:
+            key = self._key(project_id, query, version, params)
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            results = entry[1]
+
+        # Copie : l'appelant peut enrichir les résultats sans altérer le cache
+        return copy.deepcopy(results)
+
+    def generation(self, project_id: Optional[str]) -> int:
+        """Invalidation counter of a project, to read before computing results for put()"""
+        with self._lock:
+            return self._generations.get(project_id, 0)
+
+    def put(self, project_id: Optional[str], query: str, results: Any, version: Hashable = None,
+            generation: Optional[int] = None, **params):
+        """
+        Store results, evicting the least recently used entries beyond max_entries
+
+        Results whose generation (read before they were computed) is older than
+        the project's current one are discarded.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generations.get(project_id, 0):
+                return
+            key = self._key(project_id, query, version, params)
+            self._entries[key] = (time.monotonic(), copy.deepcopy(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, project_id: Optional[str] = None):
+        """Drop every entry of a project (None is the project-less knowledge base)"""
+        with self._lock:
+            self._generations[project_id] = self._generations.get(project_id, 0) + 1
+            stale = [key for key in self._entries if key[0] == project_id]
+            for key in stale:
+                del self._entries[key]
+
+        if stale:
+            self.logger.debug(f"Cache de recherche invalidé pour {project_id or 'la base globale'} : {len(stale)} entrées")
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            for project_id in {key[0] for key in self._entries}:
+                self._generations[project_id] = self._generations.get(project_id, 0) + 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and hit ratio"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def _key(self, project_id: Optional[str], query: str, version: Hashable, params: Dict[str, Any]) -> Tuple:
+        # Appelé sous verrou. Génération locale : une entrée calculée avant invalidate() ne peut plus correspondre
+        generation = self._generations.get(project_id, 0)
+        return (project_id, generation, version, self.normalize_query(query), tuple(sorted(params.items())))
@@ -1,6 +1,3 @@
-import ollama
-import chromadb
-from chromadb.config import Settings
 from typing import List, Dict, Optional, Any
 import json
 from datetime import datetime
@@ -9,6 +6,11 @@ import hashlib
 
 from .rag_system import SAFEMBSERAGSystem
 from ..services.persistence_service import PersistenceService, Project
+from .ingestion_pipeline import DocumentIngestionPipeline
+from .hybrid_retriever import HybridRetriever
+from .retrieval_cache import RetrievalCache
+from .vector_store import create_vector_store
+from ..services.llm_gateway import get_llm_gateway
 from config import config
 
 class SimplePersistentRAGSystem:
@@ -28,14 +30,8 @@ class SimplePersistentRAGSystem:
         # Initialiser le service de persistance
         self.persistence_service = PersistenceService()
         
-        # Initialiser Ollama
-        self.ollama_client = ollama.Client(host=config.OLLAMA_BASE_URL)
-        
-        # Initialiser ChromaDB (mode simple)
-        self.chroma_client = chromadb.PersistentClient(
-            path=config.VECTORDB_PATH,
-            settings=Settings(allow_reset=True)
-        )
+        # Passerelle LLM partagée (pool de connexions Ollama)
+        self.ollama_client = get_llm_gateway()
         
         # Gestion du projet
         self.current_project_id = project_id
@@ -44,6 +40,10 @@ class SimplePersistentRAGSystem:
         # Initialiser la collection
         self._setup_simple_collection()
         
+        # Recherche hybride BM25 + vectorielle
+        self.hybrid_retriever = HybridRetriever(self.persistence_service)
+        self.retrieval_cache = RetrievalCache()
+        
         # Initialiser les composants de base
         from .document_processor import ArcadiaDocumentProcessor
         from .requirements_generator import RequirementsGenerator
@@ -58,24 +58,20 @@ class SimplePersistentRAGSystem:
         self.logger.info("Système RAG persistant simple initialisé")
     
     def _setup_simple_collection(self):
-        """Configure une collection ChromaDB simple et robuste"""
+        """Configure le vectorstore simple (backend selon config.VECTOR_STORE_BACKEND)"""
         collection_name = f"{config.COLLECTION_NAME}_simple"
         
         try:
-            # Tenter de récupérer la collection existante
-            self.collection = self.chroma_client.get_collection(name=collection_name)
-            self.logger.info(f"Collection existante récupérée : {collection_name}")
-        except Exception:
-            # Créer une nouvelle collection
-            try:
-                self.collection = self.chroma_client.create_collection(
-                    name=collection_name,
-                    metadata={"description": "MBSE Simple Persistent System"}
-                )
-                self.logger.info(f"Nouvelle collection créée : {collection_name}")
-            except Exception as e:
-                self.logger.error(f"Erreur création collection : {str(e)}")
-                raise
+            self.collection = create_vector_store(
+                collection_name,
+                metadata={"description": "MBSE Simple Persistent System"},
+                ollama_client=self.ollama_client,
+                partition_by_project=True
+            )
+            self.logger.info(f"Vectorstore prêt : {collection_name} ({config.VECTOR_STORE_BACKEND})")
+        except Exception as e:
+            self.logger.error(f"Erreur création collection : {str(e)}")
+            raise
     
     # ===== GESTION DES PROJETS =====
     
@@ -102,6 +98,10 @@ class SimplePersistentRAGSystem:
         """Récupérer tous les projets"""
         return self.persistence_service.get_all_projects()
     
+    def list_projects(self) -> List[Project]:
+        """Lister les projets sans proposal_text (affichage de la barre latérale)"""
+        return self.persistence_service.list_projects()
+    
     def get_current_project(self) -> Optional[Project]:
         """Récupérer le projet actuel"""
         return self.current_project
@@ -128,90 +128,18 @@ class SimplePersistentRAGSystem:
         
         start_time = datetime.now()
         
-        for file_path in file_paths:
-            try:
-                self.logger.info(f"Traitement du fichier : {file_path}")
-                
-                # Vérifier si le document a déjà été traité
-                is_processed, doc_id = self.persistence_service.is_document_processed(file_path, project_id)
-                
-                if is_processed:
-                    self.logger.info(f"Document déjà traité : {file_path}")
-                    results["skipped_files"].append({
-                        "file_path": file_path,
-                        "reason": "already_processed",
-                        "document_id": doc_id
-                    })
-                else:
-                    # Traiter le nouveau document
-                    doc_id = self.persistence_service.register_document(file_path, project_id)
-                    
-                    # Extraire le contenu
-                    chunks = self._process_document_content(file_path)
-                    
-                    # Sauvegarder les chunks
-                    success = self.persistence_service.save_document_chunks(doc_id, project_id, chunks)
-                    
-                    if success:
-                        # Ajouter à ChromaDB
-                        self._add_chunks_to_vectorstore_simple(chunks, doc_id, project_id)
-                        
-                        results["processed_files"].append({
-                            "file_path": file_path,
-                            "document_id": doc_id,
-                            "chunks_count": len(chunks)
-                        })
-                        
-                        results["new_chunks"] += len(chunks)
-                        results["total_chunks"] += len(chunks)
-                        
-                        self.logger.info(f"Document traité avec succès : {len(chunks)} chunks")
-                    else:
-                        results["errors"].append(f"Erreur sauvegarde chunks : {file_path}")
-                        
-            except Exception as e:
-                error_msg = f"Erreur traitement {file_path} : {str(e)}"
-                self.logger.error(error_msg)
-                results["errors"].append(error_msg)
+        # Pipeline parallèle : analyse en processus, embedding et écriture en threads
+        pipeline = DocumentIngestionPipeline(self.persistence_service, self._add_chunks_to_vectorstore_simple)
+        pipeline_results = pipeline.run(file_paths, project_id)
+        
+        for key in ["processed_files", "skipped_files", "errors"]:
+            results[key].extend(pipeline_results[key])
+        results["new_chunks"] += pipeline_results["new_chunks"]
+        results["total_chunks"] += pipeline_results["total_chunks"]
         
         results["processing_time"] = (datetime.now() - start_time).total_seconds()
         return results
     
-    def _process_document_content(self, file_path: str) -> List[Dict[str, Any]]:
-        """Traiter le contenu d'un document"""
-        try:
-            content = ""
-            file_extension = file_path.lower().split('.')[-1]
-            
-            if file_extension in ['txt', 'md']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            elif file_extension == 'pdf':
-                try:
-                    import PyPDF2
-                    with open(file_path, 'rb') as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
-                        content = ""
-                        for page in pdf_reader.pages:
-                            content += page.extract_text() + "\n"
-                except ImportError:
-                    self.logger.error("PyPDF2 non installé pour traiter les PDF")
-                    raise
-            else:
-                raise ValueError(f"Type de fichier non supporté : {file_extension}")
-            
-            # Chunking
-            chunks = self.doc_processor._chunk_text_with_metadata(
-                content, 
-                {"source": file_path, "filename": file_path.split('/')[-1]}
-            )
-            
-            return chunks
-            
-        except Exception as e:
-            self.logger.error(f"Erreur traitement document {file_path} : {str(e)}")
-            raise
-    
     def _add_chunks_to_vectorstore_simple(self, chunks: List[Dict[str, Any]], doc_id: str, project_id: str):
         """Ajouter les chunks à ChromaDB (mode simple)"""
         try:
@@ -241,6 +169,10 @@ class SimplePersistentRAGSystem:
         except Exception as e:
             self.logger.error(f"Erreur ajout ChromaDB : {str(e)}")
             raise
+        finally:
+            # La version du contenu a changé avant l'écriture des vecteurs :
+            # les recherches faites entre-temps ne doivent pas rester en cache
+            self.retrieval_cache.invalidate(project_id)
     
     # ===== GÉNÉRATION DE REQUIREMENTS =====
     
@@ -349,28 +281,22 @@ class SimplePersistentRAGSystem:
             raise ValueError("Aucun projet spécifié ou chargé")
         
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=top_k,
-                where={"project_id": project_id}
-            )
+            # Cache invalidé dès que le contenu du projet change
+            generation = self.retrieval_cache.generation(project_id)
+            content_version = self.persistence_service.get_project_content_version(project_id)
+            results = self.retrieval_cache.get(project_id, query, content_version, top_k=top_k)
+            if results is None:
+                results = self.hybrid_retriever.retrieve(self.collection, query, project_id, top_k)
+                self.retrieval_cache.put(project_id, query, results, content_version,
+                                         generation=generation, top_k=top_k)
             
             formatted_results = {
                 "query": query,
                 "project_id": project_id,
-                "total_results": len(results["documents"][0]) if results["documents"] else 0,
-                "results": []
+                "total_results": len(results),
+                "results": results
             }
             
-            if results["documents"]:
-                for i in range(len(results["documents"][0])):
-                    formatted_results["results"].append({
-                        "content": results["documents"][0][i],
-                        "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                        "distance": results["distances"][0][i] if results["distances"] else 0,
-                        "id": results["ids"][0][i] if results["ids"] else ""
-                    })
-            
             return formatted_results
             
         except Exception as e:
@@ -448,11 +374,9 @@ class SimplePersistentRAGSystem:
             raise ValueError("Aucun projet spécifié ou chargé")
         
         try:
-            results = self.collection.get(where={"project_id": project_id})
-            
-            if results["ids"]:
-                self.collection.delete(ids=results["ids"])
-                self.logger.info(f"Supprimé {len(results['ids'])} vecteurs pour le projet {project_id}")
+            self.collection.drop_partition(project_id)
+            self.retrieval_cache.invalidate(project_id)
+            self.logger.info(f"Partition vectorielle supprimée pour le projet {project_id}")
             
         except Exception as e:
             self.logger.error(f"Erreur nettoyage : {str(e)}")
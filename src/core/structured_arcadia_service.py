@@ -1,19 +1,26 @@
 from typing import List, Dict, Any, Optional
 import logging
+import hashlib
+import json
 from datetime import datetime
 import uuid
 
+import numpy as np
+
 from ..models.arcadia_outputs import (
     ARCADIAStructuredOutput, OperationalAnalysisOutput, SystemAnalysisOutput,
     LogicalArchitectureOutput, PhysicalArchitectureOutput, 
     CrossPhaseAnalysisOutput, TraceabilityLink, GapAnalysisItem,
     ArchitectureConsistencyCheck, QualityMetric, ARCADIAPhaseType,
-    create_extraction_metadata
+    create_extraction_metadata, dataclass_to_dict, dataclass_from_dict
 )
 from .operational_analysis_extractor import OperationalAnalysisExtractor
 from .system_analysis_extractor import SystemAnalysisExtractor
 from .logical_architecture_extractor import LogicalArchitectureExtractor
 from .physical_architecture_extractor import PhysicalArchitectureExtractor
+from .task_dag import TaskDAG, DAGScheduler
+from .traceability_matcher import TraceabilityMatcher
+from config import config
 
 class StructuredARCADIAService:
     """
@@ -30,9 +37,31 @@ class StructuredARCADIAService:
     architecture consistency checks, and quality metrics.
     """
     
-    def __init__(self, ollama_client):
+    # Phase name -> ARCADIAStructuredOutput field and output type
+    PHASE_RESULT_FIELDS = {
+        "operational": "operational_analysis",
+        "system": "system_analysis",
+        "logical": "logical_architecture",
+        "physical": "physical_architecture"
+    }
+    PHASE_OUTPUT_TYPES = {
+        "operational": OperationalAnalysisOutput,
+        "system": SystemAnalysisOutput,
+        "logical": LogicalArchitectureOutput,
+        "physical": PhysicalArchitectureOutput
+    }
+    
+    def __init__(self, ollama_client, checkpoint_store=None, embedding_function=None):
+        """
+        Args:
+            ollama_client: Ollama client used by the phase extractors
+            checkpoint_store: Optional PersistenceService receiving per-phase checkpoints
+            embedding_function: Optional text embedding callable used to refine traceability matching
+        """
         self.logger = logging.getLogger(__name__)
         self.ollama_client = ollama_client
+        self.checkpoint_store = checkpoint_store
+        self.embedding_function = embedding_function
         
         # Initialize phase extractors
         self.operational_extractor = OperationalAnalysisExtractor(ollama_client)
@@ -47,7 +76,8 @@ class StructuredARCADIAService:
                                         proposal_text: str,
                                         target_phases: Optional[List[str]] = None,
                                         source_documents: Optional[List[str]] = None,
-                                        enable_cross_phase_analysis: bool = True) -> ARCADIAStructuredOutput:
+                                        enable_cross_phase_analysis: bool = True,
+                                        analysis_id: Optional[str] = None) -> ARCADIAStructuredOutput:
         """
         Extract complete structured ARCADIA analysis across all requested phases
         
@@ -57,20 +87,27 @@ class StructuredARCADIAService:
             target_phases: List of phases to extract ["operational", "system", "logical", "physical"]
             source_documents: List of source document paths
             enable_cross_phase_analysis: Whether to perform cross-phase analysis
+            analysis_id: Identifier of a previous run to resume; phases checkpointed
+                for the same inputs are restored instead of re-extracted
             
         Returns:
-            Complete structured ARCADIA output
+            Complete structured ARCADIA output. Its checkpoints are deleted once every
+            target phase completed; otherwise generation_metadata["resumable"] is True
+            and the run can be resumed with generation_metadata["analysis_id"].
         """
         self.logger.info("Starting complete ARCADIA structured analysis")
         
         start_time = datetime.now()
-        analysis_id = str(uuid.uuid4())
+        analysis_id = analysis_id or str(uuid.uuid4())
         
         # Default to all phases if not specified
         if target_phases is None:
             target_phases = ["operational", "system", "logical", "physical"]
         
         source_docs = source_documents or ["proposal_text"]
+        input_fingerprint = self.compute_input_fingerprint(context_chunks, proposal_text, source_docs)
+        self._expire_checkpoints()
+        checkpoints = self._load_checkpoints(analysis_id, input_fingerprint)
         
         # Initialize result structure
         result = ARCADIAStructuredOutput()
@@ -78,94 +115,230 @@ class StructuredARCADIAService:
         # Set generation metadata
         result.generation_metadata = {
             "analysis_id": analysis_id,
+            "input_fingerprint": input_fingerprint,
             "start_time": start_time.isoformat(),
             "target_phases": target_phases,
             "source_documents": source_docs,
+            "resumed_phases": [phase for phase in target_phases if phase in checkpoints],
             "service_version": "1.0.0"
         }
         
+        # Build the extraction DAG: each phase starts as soon as the outputs it
+        # consumes are available (system analysis only needs operational actors)
+        dag = TaskDAG()
+        operational_task = None
+        actors_task = None
+        phase_tasks: List[str] = []
+        
+        def add_phase_task(phase: str, extract, dependencies: List[str]) -> str:
+            """Register a phase, restoring its checkpoint or checkpointing its fresh output"""
+            if phase in checkpoints:
+                self.logger.info(f"Phase {phase} restored from checkpoint of analysis {analysis_id}")
+                restored = checkpoints[phase]
+                extract = lambda deps: restored
+                dependencies = []
+            
+            def run_phase(deps):
+                output = extract(deps)
+                if output is not None:
+                    setattr(result, self.PHASE_RESULT_FIELDS[phase], output)
+                    if phase not in checkpoints:
+                        self._save_checkpoint(analysis_id, phase, input_fingerprint, output)
+                return output
+            
+            task = dag.add_task(phase, run_phase, dependencies)
+            phase_tasks.append(task)
+            return task
+        
         # Phase 1: Operational Analysis
-        operational_output = None
         if "operational" in target_phases:
             self.logger.info("Phase 1: Extracting Operational Analysis")
-            try:
-                operational_output = self.operational_extractor.extract_operational_analysis(
-                    context_chunks, proposal_text, source_docs
+            operational_steps = None
+            if "operational" not in checkpoints:
+                operational_steps = self.operational_extractor.add_extraction_tasks(
+                    dag, context_chunks, proposal_text, source_docs, prefix="operational.steps"
                 )
-                result.operational_analysis = operational_output
+                actors_task = "operational.steps.actors"
+            
+            def extract_operational(deps):
+                operational_output = deps[operational_steps]
+                if operational_output is None:
+                    self.logger.error("Error in operational analysis: extraction did not produce an output")
+                    return None
                 self.logger.info(f"Operational analysis completed: {len(operational_output.actors)} actors, "
                                f"{len(operational_output.capabilities)} capabilities")
-            except Exception as e:
-                self.logger.error(f"Error in operational analysis: {str(e)}")
+                return operational_output
+            
+            operational_task = add_phase_task("operational", extract_operational, [operational_steps])
+            actors_task = actors_task or operational_task
         
         # Phase 2: System Analysis
-        system_output = None
+        system_task = None
         if "system" in target_phases:
-            self.logger.info("Phase 2: Extracting System Analysis")
-            try:
-                operational_actors = operational_output.actors if operational_output else []
-                system_output = self.system_extractor.extract_system_analysis(
-                    context_chunks, proposal_text, operational_actors, source_docs
-                )
-                result.system_analysis = system_output
-                self.logger.info(f"System analysis completed: {len(system_output.actors)} actors, "
-                              f"{len(system_output.functions)} functions")
-            except Exception as e:
-                self.logger.error(f"Error in system analysis: {str(e)}")
+            def extract_system(deps):
+                self.logger.info("Phase 2: Extracting System Analysis")
+                try:
+                    operational_actors = deps.get(actors_task) or []
+                    if isinstance(operational_actors, OperationalAnalysisOutput):
+                        operational_actors = operational_actors.actors
+                    system_output = self.system_extractor.extract_system_analysis(
+                        context_chunks, proposal_text, operational_actors, source_docs
+                    )
+                    self.logger.info(f"System analysis completed: {len(system_output.actors)} actors, "
+                                  f"{len(system_output.functions)} functions")
+                    return system_output
+                except Exception as e:
+                    self.logger.error(f"Error in system analysis: {str(e)}")
+                    return None
+            
+            system_task = add_phase_task("system", extract_system, [actors_task] if actors_task else [])
         
         # Phase 3: Logical Architecture
-        logical_output = None
+        logical_task = None
         if "logical" in target_phases:
-            self.logger.info("Phase 3: Extracting Logical Architecture")
-            try:
-                logical_output = self.logical_extractor.extract_logical_architecture(
-                    context_chunks, proposal_text, operational_output, system_output, source_docs
-                )
-                result.logical_architecture = logical_output
-                self.logger.info(f"Logical architecture completed: {len(logical_output.components)} components, "
-                               f"{len(logical_output.functions)} functions, {len(logical_output.interfaces)} interfaces")
-            except Exception as e:
-                self.logger.error(f"Error in logical architecture: {str(e)}")
+            def extract_logical(deps):
+                self.logger.info("Phase 3: Extracting Logical Architecture")
+                try:
+                    logical_output = self.logical_extractor.extract_logical_architecture(
+                        context_chunks, proposal_text, deps.get(operational_task), deps.get(system_task), source_docs
+                    )
+                    self.logger.info(f"Logical architecture completed: {len(logical_output.components)} components, "
+                                   f"{len(logical_output.functions)} functions, {len(logical_output.interfaces)} interfaces")
+                    return logical_output
+                except Exception as e:
+                    self.logger.error(f"Error in logical architecture: {str(e)}")
+                    return None
+            
+            logical_task = add_phase_task(
+                "logical", extract_logical, [task for task in (operational_task, system_task) if task]
+            )
         
         # Phase 4: Physical Architecture
-        physical_output = None
         if "physical" in target_phases:
-            self.logger.info("Phase 4: Extracting Physical Architecture")
-            try:
-                physical_output = self.physical_extractor.extract_physical_architecture(
-                    context_chunks, proposal_text, operational_output, system_output, logical_output, source_docs
-                )
-                result.physical_architecture = physical_output
-                self.logger.info(f"Physical architecture completed: {len(physical_output.components)} components, "
-                               f"{len(physical_output.constraints)} constraints")
-            except Exception as e:
-                self.logger.error(f"Error in physical architecture: {str(e)}")
+            def extract_physical(deps):
+                self.logger.info("Phase 4: Extracting Physical Architecture")
+                try:
+                    physical_output = self.physical_extractor.extract_physical_architecture(
+                        context_chunks, proposal_text, deps.get(operational_task), deps.get(system_task),
+                        deps.get(logical_task), source_docs
+                    )
+                    self.logger.info(f"Physical architecture completed: {len(physical_output.components)} components, "
+                                   f"{len(physical_output.constraints)} constraints")
+                    return physical_output
+                except Exception as e:
+                    self.logger.error(f"Error in physical architecture: {str(e)}")
+                    return None
+            
+            add_phase_task(
+                "physical", extract_physical, [task for task in (operational_task, system_task, logical_task) if task]
+            )
         
         # Cross-Phase Analysis
         if enable_cross_phase_analysis:
-            self.logger.info("Performing cross-phase analysis")
-            try:
-                cross_phase_analysis = self._perform_cross_phase_analysis(
-                    result, context_chunks, proposal_text
-                )
-                result.cross_phase_analysis = cross_phase_analysis
-                self.logger.info(f"Cross-phase analysis completed: {len(cross_phase_analysis.traceability_links)} links, "
-                              f"{len(cross_phase_analysis.gap_analysis)} gaps")
-            except Exception as e:
-                self.logger.error(f"Error in cross-phase analysis: {str(e)}")
+            def run_cross_phase(deps):
+                self.logger.info("Performing cross-phase analysis")
+                try:
+                    cross_phase_analysis = self._perform_cross_phase_analysis(
+                        result, context_chunks, proposal_text
+                    )
+                    result.cross_phase_analysis = cross_phase_analysis
+                    self.logger.info(f"Cross-phase analysis completed: {len(cross_phase_analysis.traceability_links)} links, "
+                                  f"{len(cross_phase_analysis.gap_analysis)} gaps")
+                    return cross_phase_analysis
+                except Exception as e:
+                    self.logger.error(f"Error in cross-phase analysis: {str(e)}")
+                    return None
+            
+            dag.add_task("cross_phase", run_cross_phase, phase_tasks)
+        
+        report = DAGScheduler(config.STRUCTURED_ANALYSIS_MAX_CONCURRENCY).run(dag)
         
         # Finalize metadata
         end_time = datetime.now()
+        phases_completed = [phase for phase in target_phases
+                            if getattr(result, self.PHASE_RESULT_FIELDS.get(phase, ""), None) is not None]
+        resumable = len(phases_completed) < len(target_phases)
         result.generation_metadata.update({
             "end_time": end_time.isoformat(),
             "processing_time_seconds": (end_time - start_time).total_seconds(),
-            "phases_completed": [phase for phase in target_phases if getattr(result, f"{phase}_analysis", None) is not None]
+            "phases_completed": phases_completed,
+            "resumable": resumable,
+            "task_dag": report.to_dict()
         })
         
+        # Analyse complète : ses points de reprise ne serviront plus
+        if not resumable and self.checkpoint_store is not None:
+            self.checkpoint_store.delete_analysis_checkpoints(analysis_id)
+        
         self.logger.info(f"Complete ARCADIA analysis finished in {(end_time - start_time).total_seconds():.1f} seconds")
         
         return result
     
+    def resume_arcadia_analysis(self,
+                                analysis_id: str,
+                                context_chunks: List[Dict[str, Any]],
+                                proposal_text: str,
+                                target_phases: Optional[List[str]] = None,
+                                source_documents: Optional[List[str]] = None,
+                                enable_cross_phase_analysis: bool = True) -> ARCADIAStructuredOutput:
+        """
+        Resume an interrupted analysis
+        
+        Phases checkpointed under analysis_id for identical inputs are restored;
+        only the missing phases are extracted. Checkpoints recorded for different
+        inputs are ignored, so the result always matches the given inputs.
+        """
+        if self.checkpoint_store is None:
+            self.logger.warning("No checkpoint store configured, running a full analysis")
+        
+        return self.extract_complete_arcadia_analysis(
+            context_chunks, proposal_text, target_phases, source_documents,
+            enable_cross_phase_analysis, analysis_id=analysis_id
+        )
+    
+    @staticmethod
+    def compute_input_fingerprint(context_chunks: List[Dict[str, Any]],
+                                  proposal_text: str,
+                                  source_documents: List[str]) -> str:
+        """Fingerprint of the analysis inputs, used to validate checkpoints"""
+        hasher = hashlib.sha256()
+        hasher.update(proposal_text.encode("utf-8"))
+        for chunk in context_chunks:
+            hasher.update(b"\x00")
+            hasher.update(str(chunk.get("content", "")).encode("utf-8"))
+        hasher.update(json.dumps(source_documents).encode("utf-8"))
+        return hasher.hexdigest()
+    
+    def _load_checkpoints(self, analysis_id: str, input_fingerprint: str) -> Dict[str, Any]:
+        """Load and deserialize the phase outputs checkpointed for these inputs"""
+        if self.checkpoint_store is None:
+            return {}
+        
+        restored = {}
+        for phase, output_data in self.checkpoint_store.get_analysis_checkpoints(analysis_id, input_fingerprint).items():
+            output_type = self.PHASE_OUTPUT_TYPES.get(phase)
+            if output_type is None:
+                continue
+            try:
+                restored[phase] = dataclass_from_dict(output_type, output_data)
+            except Exception as e:
+                self.logger.warning(f"Ignoring unreadable checkpoint for phase {phase}: {str(e)}")
+        return restored
+    
+    def _expire_checkpoints(self):
+        """Drop the checkpoints of analyses abandoned for too long"""
+        if self.checkpoint_store is None:
+            return
+        self.checkpoint_store.delete_expired_analysis_checkpoints(config.ANALYSIS_CHECKPOINT_MAX_AGE_HOURS)
+    
+    def _save_checkpoint(self, analysis_id: str, phase: str, input_fingerprint: str, output: Any):
+        """Persist a completed phase output"""
+        if self.checkpoint_store is None:
+            return
+        self.checkpoint_store.save_analysis_checkpoint(
+            analysis_id, phase, input_fingerprint, dataclass_to_dict(output)
+        )
+    
     def _perform_cross_phase_analysis(self,
                                     partial_result: ARCADIAStructuredOutput,
                                     context_chunks: List[Dict[str, Any]],
@@ -209,220 +382,122 @@ class StructuredARCADIAService:
         """Generate comprehensive bidirectional traceability links using enhanced semantic matching"""
         links: List[TraceabilityLink] = []
         
+        # Elements are tokenized once and reused across all phase pairs
+        matcher = TraceabilityMatcher(self._extract_key_terms, self.embedding_function)
+        
+        # (label, sources, targets, similarity type, minimum score, source phase, target phase, relationship)
+        phase_pairs = []
+        
         # 1. Operational -> System Traceability
         if result.operational_analysis and result.system_analysis:
-            self.logger.info("Generating Operational -> System traceability links")
-            
-            # Link operational capabilities to system capabilities
-            for op_cap in result.operational_analysis.capabilities:
-                best_cap_match = None
-                best_cap_score = 0.5  # Minimum threshold
-                
-                for sys_cap in result.system_analysis.capabilities:
-                    similarity = self._calculate_semantic_similarity(op_cap, sys_cap, "comprehensive")
-                    if similarity > best_cap_score:
-                        best_cap_score = similarity
-                        best_cap_match = sys_cap
-                
-                if best_cap_match:
-                    link = TraceabilityLink(
-                        id=f"TRACE-{len(links)+1:03d}",
-                        source_element=op_cap.id,
-                        target_element=best_cap_match.id,
-                        source_phase=ARCADIAPhaseType.OPERATIONAL,
-                        target_phase=ARCADIAPhaseType.SYSTEM,
-                        relationship_type="realizes",
-                        confidence_score=best_cap_score,
-                        validation_status="unverified"
-                    )
-                    links.append(link)
-            
-            # Link operational actors to system actors
-            for op_actor in result.operational_analysis.actors:
-                best_actor_match = None
-                best_actor_score = 0.6  # Higher threshold for actors
-                
-                for sys_actor in result.system_analysis.actors:
-                    similarity = self._calculate_semantic_similarity(op_actor, sys_actor, "contextual")
-                    if similarity > best_actor_score:
-                        best_actor_score = similarity
-                        best_actor_match = sys_actor
-                
-                if best_actor_match:
-                    link = TraceabilityLink(
-                        id=f"TRACE-{len(links)+1:03d}",
-                        source_element=op_actor.id,
-                        target_element=best_actor_match.id,
-                        source_phase=ARCADIAPhaseType.OPERATIONAL,
-                        target_phase=ARCADIAPhaseType.SYSTEM,
-                        relationship_type="implements",
-                        confidence_score=best_actor_score,
-                        validation_status="unverified"
-                    )
-                    links.append(link)
+            phase_pairs += [
+                ("Operational -> System", result.operational_analysis.capabilities, result.system_analysis.capabilities,
+                 "comprehensive", 0.5, ARCADIAPhaseType.OPERATIONAL, ARCADIAPhaseType.SYSTEM, "realizes"),
+                ("Operational -> System", result.operational_analysis.actors, result.system_analysis.actors,
+                 "contextual", 0.6, ARCADIAPhaseType.OPERATIONAL, ARCADIAPhaseType.SYSTEM, "implements")
+            ]
         
         # 2. System -> Logical Traceability
         if result.system_analysis and result.logical_architecture:
-            self.logger.info("Generating System -> Logical traceability links")
-            
-            # Link system functions to logical functions
-            for sys_func in result.system_analysis.functions:
-                best_func_match = None
-                best_func_score = 0.5
-                
-                for log_func in result.logical_architecture.functions:
-                    similarity = self._calculate_semantic_similarity(sys_func, log_func, "functional")
-                    if similarity > best_func_score:
-                        best_func_score = similarity
-                        best_func_match = log_func
-                
-                if best_func_match:
-                    link = TraceabilityLink(
-                        id=f"TRACE-{len(links)+1:03d}",
-                        source_element=sys_func.id,
-                        target_element=best_func_match.id,
-                        source_phase=ARCADIAPhaseType.SYSTEM,
-                        target_phase=ARCADIAPhaseType.LOGICAL,
-                        relationship_type="decomposes_to",
-                        confidence_score=best_func_score,
-                        validation_status="unverified"
-                    )
-                    links.append(link)
-            
-            # Link system capabilities to logical components
-            for sys_cap in result.system_analysis.capabilities:
-                best_comp_match = None
-                best_comp_score = 0.5
-                
-                for log_comp in result.logical_architecture.components:
-                    similarity = self._calculate_semantic_similarity(sys_cap, log_comp, "comprehensive")
-                    if similarity > best_comp_score:
-                        best_comp_score = similarity
-                        best_comp_match = log_comp
-                
-                if best_comp_match:
-                    link = TraceabilityLink(
-                        id=f"TRACE-{len(links)+1:03d}",
-                        source_element=sys_cap.id,
-                        target_element=best_comp_match.id,
-                        source_phase=ARCADIAPhaseType.SYSTEM,
-                        target_phase=ARCADIAPhaseType.LOGICAL,
-                        relationship_type="allocated_to",
-                        confidence_score=best_comp_score,
-                        validation_status="unverified"
-                    )
-                    links.append(link)
+            phase_pairs += [
+                ("System -> Logical", result.system_analysis.functions, result.logical_architecture.functions,
+                 "functional", 0.5, ARCADIAPhaseType.SYSTEM, ARCADIAPhaseType.LOGICAL, "decomposes_to"),
+                ("System -> Logical", result.system_analysis.capabilities, result.logical_architecture.components,
+                 "comprehensive", 0.5, ARCADIAPhaseType.SYSTEM, ARCADIAPhaseType.LOGICAL, "allocated_to")
+            ]
         
         # 3. Logical -> Physical Traceability
         if result.logical_architecture and result.physical_architecture:
-            self.logger.info("Generating Logical -> Physical traceability links")
-            
-            # Link logical components to physical components
-            for log_comp in result.logical_architecture.components:
-                best_phys_comp_match = None
-                best_phys_comp_score = 0.5
-                
-                for phys_comp in result.physical_architecture.components:
-                    similarity = self._calculate_semantic_similarity(log_comp, phys_comp, "comprehensive")
-                    if similarity > best_phys_comp_score:
-                        best_phys_comp_score = similarity
-                        best_phys_comp_match = phys_comp
-                
-                if best_phys_comp_match:
-                    link = TraceabilityLink(
-                        id=f"TRACE-{len(links)+1:03d}",
-                        source_element=log_comp.id,
-                        target_element=best_phys_comp_match.id,
-                        source_phase=ARCADIAPhaseType.LOGICAL,
-                        target_phase=ARCADIAPhaseType.PHYSICAL,
-                        relationship_type="implemented_by",
-                        confidence_score=best_phys_comp_score,
-                        validation_status="unverified"
-                    )
-                    links.append(link)
+            phase_pairs += [
+                ("Logical -> Physical", result.logical_architecture.components, result.physical_architecture.components,
+                 "comprehensive", 0.5, ARCADIAPhaseType.LOGICAL, ARCADIAPhaseType.PHYSICAL, "implemented_by"),
+                ("Logical -> Physical", result.logical_architecture.functions, result.physical_architecture.functions,
+                 "functional", 0.5, ARCADIAPhaseType.LOGICAL, ARCADIAPhaseType.PHYSICAL, "realized_by")
+            ]
+        
+        for label, sources, targets, similarity_type, threshold, source_phase, target_phase, relationship in phase_pairs:
+            self.logger.info(f"Generating {label} traceability links ({len(sources)} x {len(targets)} elements)")
             
-            # Link logical functions to physical functions
-            for log_func in result.logical_architecture.functions:
-                best_phys_func_match = None
-                best_phys_func_score = 0.5
-                
-                for phys_func in result.physical_architecture.functions:
-                    similarity = self._calculate_semantic_similarity(log_func, phys_func, "functional")
-                    if similarity > best_phys_func_score:
-                        best_phys_func_score = similarity
-                        best_phys_func_match = phys_func
-                
-                if best_phys_func_match:
-                    link = TraceabilityLink(
-                        id=f"TRACE-{len(links)+1:03d}",
-                        source_element=log_func.id,
-                        target_element=best_phys_func_match.id,
-                        source_phase=ARCADIAPhaseType.LOGICAL,
-                        target_phase=ARCADIAPhaseType.PHYSICAL,
-                        relationship_type="realized_by",
-                        confidence_score=best_phys_func_score,
-                        validation_status="unverified"
-                    )
-                    links.append(link)
+            for source, best_match, score in matcher.best_matches(sources, targets, similarity_type, threshold):
+                link = TraceabilityLink(
+                    id=f"TRACE-{len(links)+1:03d}",
+                    source_element=source.id,
+                    target_element=best_match.id,
+                    source_phase=source_phase,
+                    target_phase=target_phase,
+                    relationship_type=relationship,
+                    confidence_score=score,
+                    validation_status="unverified"
+                )
+                links.append(link)
         
         # 4. Cross-Phase Interface Traceability
-        self._generate_interface_traceability_links(result, links)
+        self._generate_interface_traceability_links(result, links, matcher)
         
         # 5. End-to-End Traceability (Operational -> Physical)
         if result.operational_analysis and result.physical_architecture:
             self.logger.info("Generating End-to-End traceability links")
-            self._generate_end_to_end_traceability_links(result, links)
+            self._generate_end_to_end_traceability_links(result, links, matcher)
         
         self.logger.info(f"Generated {len(links)} total traceability links across all phases")
         return links
     
-    def _generate_interface_traceability_links(self, result: ARCADIAStructuredOutput, links: List[TraceabilityLink]):
+    def _generate_interface_traceability_links(self, result: ARCADIAStructuredOutput, links: List[TraceabilityLink],
+                                               matcher: TraceabilityMatcher):
         """Generate traceability links for interfaces across phases"""
         # Link logical interfaces to physical interfaces (if available)
         if result.logical_architecture and result.physical_architecture:
-            for log_intf in result.logical_architecture.interfaces:
-                for phys_comp in result.physical_architecture.components:
-                    # Check if physical component interfaces match logical interfaces
-                    for phys_intf in phys_comp.interfaces:
-                        intf_name = phys_intf.get('name', '') if isinstance(phys_intf, dict) else str(phys_intf)
-                        similarity = self._calculate_name_similarity(log_intf.name, intf_name)
-                        
-                        if similarity > 0.7:
-                            link = TraceabilityLink(
-                                id=f"TRACE-{len(links)+1:03d}",
-                                source_element=log_intf.id,
-                                target_element=f"{phys_comp.id}:{intf_name}",
-                                source_phase=ARCADIAPhaseType.LOGICAL,
-                                target_phase=ARCADIAPhaseType.PHYSICAL,
-                                relationship_type="implemented_through",
-                                confidence_score=similarity,
-                                validation_status="unverified"
-                            )
-                            links.append(link)
+            logical_interfaces = result.logical_architecture.interfaces
+            # (physical component, interface name) for every interface of every physical component
+            physical_interfaces = [
+                (phys_comp, phys_intf.get('name', '') if isinstance(phys_intf, dict) else str(phys_intf))
+                for phys_comp in result.physical_architecture.components
+                for phys_intf in phys_comp.interfaces
+            ]
+            if not logical_interfaces or not physical_interfaces:
+                return
+            
+            similarities = matcher.text_similarity([log_intf.name for log_intf in logical_interfaces],
+                                                   [intf_name for _, intf_name in physical_interfaces])
+            for row, column in zip(*np.nonzero(similarities > 0.7)):
+                log_intf = logical_interfaces[row]
+                phys_comp, intf_name = physical_interfaces[column]
+                link = TraceabilityLink(
+                    id=f"TRACE-{len(links)+1:03d}",
+                    source_element=log_intf.id,
+                    target_element=f"{phys_comp.id}:{intf_name}",
+                    source_phase=ARCADIAPhaseType.LOGICAL,
+                    target_phase=ARCADIAPhaseType.PHYSICAL,
+                    relationship_type="implemented_through",
+                    confidence_score=float(similarities[row, column]),
+                    validation_status="unverified"
+                )
+                links.append(link)
     
-    def _generate_end_to_end_traceability_links(self, result: ARCADIAStructuredOutput, links: List[TraceabilityLink]):
+    def _generate_end_to_end_traceability_links(self, result: ARCADIAStructuredOutput, links: List[TraceabilityLink],
+                                                matcher: TraceabilityMatcher):
         """Generate end-to-end traceability links across all phases"""
         # Link operational capabilities directly to physical components (through intermediate links)
         if result.operational_analysis and result.physical_architecture:
-            for op_cap in result.operational_analysis.capabilities[:3]:  # Limit for performance
-                for phys_comp in result.physical_architecture.components:
-                    # Use description-based matching for end-to-end links
-                    similarity = self._calculate_description_similarity(
-                        op_cap.mission_statement, phys_comp.description
-                    )
-                    
-                    if similarity > 0.6:
-                        link = TraceabilityLink(
-                            id=f"TRACE-{len(links)+1:03d}",
-                            source_element=op_cap.id,
-                            target_element=phys_comp.id,
-                            source_phase=ARCADIAPhaseType.OPERATIONAL,
-                            target_phase=ARCADIAPhaseType.PHYSICAL,
-                            relationship_type="enables",
-                            confidence_score=similarity,
-                            validation_status="requires_validation"  # End-to-end links need validation
-                        )
-                        links.append(link)
+            op_caps = result.operational_analysis.capabilities[:3]  # Limit for performance
+            phys_comps = result.physical_architecture.components
+            if not op_caps or not phys_comps:
+                return
+            
+            # Use description-based matching for end-to-end links
+            similarities = matcher.description_similarity(op_caps, phys_comps, 'mission_statement', 'description')
+            for row, column in zip(*np.nonzero(similarities > 0.6)):
+                link = TraceabilityLink(
+                    id=f"TRACE-{len(links)+1:03d}",
+                    source_element=op_caps[row].id,
+                    target_element=phys_comps[column].id,
+                    source_phase=ARCADIAPhaseType.OPERATIONAL,
+                    target_phase=ARCADIAPhaseType.PHYSICAL,
+                    relationship_type="enables",
+                    confidence_score=float(similarities[row, column]),
+                    validation_status="requires_validation"  # End-to-end links need validation
+                )
+                links.append(link)
     
     def _perform_gap_analysis(self, result: ARCADIAStructuredOutput, 
                             context_chunks: List[Dict[str, Any]]) -> List[GapAnalysisItem]:
@@ -602,266 +677,6 @@ class StructuredARCADIAService:
         
         return impact_analysis
     
-    # Enhanced Semantic Matching Utility Methods
-    def _calculate_semantic_similarity(self, element1: Any, element2: Any, 
-                                     similarity_type: str = "comprehensive") -> float:
-        """
-        Calculate semantic similarity between two ARCADIA elements using multiple criteria
-        
-        Args:
-            element1, element2: ARCADIA elements to compare
-            similarity_type: Type of similarity calculation
-                - "name_only": Basic name similarity
-                - "comprehensive": Multi-criteria semantic matching
-                - "contextual": Context-aware similarity including descriptions
-                - "functional": Function/capability-based similarity
-        
-        Returns:
-            Similarity score between 0.0 and 1.0
-        """
-        if similarity_type == "name_only":
-            return self._calculate_name_similarity(element1.name, element2.name)
-        
-        elif similarity_type == "comprehensive":
-            # Multi-criteria scoring
-            name_score = self._calculate_name_similarity(element1.name, element2.name) * 0.4
-            description_score = self._calculate_description_similarity(
-                getattr(element1, 'description', ''), 
-                getattr(element2, 'description', '')
-            ) * 0.3
-            context_score = self._calculate_contextual_similarity(element1, element2) * 0.3
-            
-            return name_score + description_score + context_score
-        
-        elif similarity_type == "contextual":
-            # Include context and relationship information
-            name_score = self._calculate_name_similarity(element1.name, element2.name) * 0.3
-            description_score = self._calculate_description_similarity(
-                getattr(element1, 'description', ''), 
-                getattr(element2, 'description', '')
-            ) * 0.4
-            relationship_score = self._calculate_relationship_similarity(element1, element2) * 0.3
-            
-            return name_score + description_score + relationship_score
-        
-        elif similarity_type == "functional":
-            # Function and capability-based matching
-            return self._calculate_functional_similarity(element1, element2)
-        
-        else:
-            return self._calculate_name_similarity(element1.name, element2.name)
-    
-    def _calculate_name_similarity(self, name1: str, name2: str) -> float:
-        """Enhanced name similarity calculation with multiple techniques"""
-        if not name1 or not name2:
-            return 0.0
-            
-        name1_lower = name1.lower().strip()
-        name2_lower = name2.lower().strip()
-        
-        # Exact match
-        if name1_lower == name2_lower:
-            return 1.0
-        
-        # Substring matching (bidirectional)
-        if name1_lower in name2_lower or name2_lower in name1_lower:
-            shorter = min(len(name1_lower), len(name2_lower))
-            longer = max(len(name1_lower), len(name2_lower))
-            return 0.7 + (shorter / longer) * 0.2  # 0.7-0.9 range
-        
-        # Word-based similarity with synonyms
-        words1 = set(name1_lower.split())
-        words2 = set(name2_lower.split())
-        
-        # Remove common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        words1 = words1 - stop_words
-        words2 = words2 - stop_words
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        # Direct word matching
-        common_words = words1.intersection(words2)
-        if common_words:
-            jaccard_similarity = len(common_words) / len(words1.union(words2))
-            return min(jaccard_similarity * 1.2, 1.0)  # Boost direct matches
-        
-        # Synonym and related term matching
-        synonym_score = self._calculate_synonym_similarity(words1, words2)
-        if synonym_score > 0:
-            return synonym_score
-        
-        # Character-level similarity (Levenshtein-inspired)
-        char_similarity = self._calculate_character_similarity(name1_lower, name2_lower)
-        return char_similarity * 0.6  # Lower weight for character similarity
-    
-    def _calculate_description_similarity(self, desc1: str, desc2: str) -> float:
-        """Calculate similarity between element descriptions"""
-        if not desc1 or not desc2:
-            return 0.0
-        
-        desc1_lower = desc1.lower()
-        desc2_lower = desc2.lower()
-        
-        # Extract key terms (nouns, verbs, domain-specific words)
-        key_terms1 = self._extract_key_terms(desc1_lower)
-        key_terms2 = self._extract_key_terms(desc2_lower)
-        
-        if not key_terms1 or not key_terms2:
-            return 0.0
-        
-        # Calculate term overlap
-        common_terms = key_terms1.intersection(key_terms2)
-        if common_terms:
-            jaccard_similarity = len(common_terms) / len(key_terms1.union(key_terms2))
-            return jaccard_similarity
-        
-        # Check for semantic similarity in descriptions
-        return self._calculate_semantic_term_similarity(key_terms1, key_terms2)
-    
-    def _calculate_contextual_similarity(self, element1: Any, element2: Any) -> float:
-        """Calculate similarity based on element context and relationships"""
-        # Type-based similarity
-        type1 = type(element1).__name__
-        type2 = type(element2).__name__
-        
-        if type1 != type2:
-            return 0.0  # Different types can't be contextually similar
-        
-        # Attribute-based similarity
-        similarity_score = 0.0
-        attribute_count = 0
-        
-        # Check common attributes based on element type
-        if hasattr(element1, 'responsibilities') and hasattr(element2, 'responsibilities'):
-            resp1 = set(getattr(element1, 'responsibilities', []))
-            resp2 = set(getattr(element2, 'responsibilities', []))
-            if resp1 or resp2:
-                resp_similarity = len(resp1.intersection(resp2)) / max(len(resp1.union(resp2)), 1)
-                similarity_score += resp_similarity
-                attribute_count += 1
-        
-        if hasattr(element1, 'capabilities') and hasattr(element2, 'capabilities'):
-            cap1 = set(getattr(element1, 'capabilities', []))
-            cap2 = set(getattr(element2, 'capabilities', []))
-            if cap1 or cap2:
-                cap_similarity = len(cap1.intersection(cap2)) / max(len(cap1.union(cap2)), 1)
-                similarity_score += cap_similarity
-                attribute_count += 1
-        
-        if hasattr(element1, 'involved_actors') and hasattr(element2, 'allocated_actors'):
-            actors1 = set(getattr(element1, 'involved_actors', []))
-            actors2 = set(getattr(element2, 'allocated_actors', []))
-            if actors1 or actors2:
-                actor_similarity = len(actors1.intersection(actors2)) / max(len(actors1.union(actors2)), 1)
-                similarity_score += actor_similarity
-                attribute_count += 1
-        
-        return similarity_score / max(attribute_count, 1)
-    
-    def _calculate_relationship_similarity(self, element1: Any, element2: Any) -> float:
-        """Calculate similarity based on element relationships"""
-        # Check parent-child relationships
-        parent1 = getattr(element1, 'parent_component', None) or getattr(element1, 'parent_function', None)
-        parent2 = getattr(element2, 'parent_component', None) or getattr(element2, 'parent_function', None)
-        
-        if parent1 and parent2:
-            parent_similarity = self._calculate_name_similarity(parent1, parent2)
-            if parent_similarity > 0.6:
-                return 0.8  # Strong relationship indicator
-        
-        # Check sub-elements
-        subs1 = getattr(element1, 'sub_components', []) or getattr(element1, 'sub_functions', [])
-        subs2 = getattr(element2, 'sub_components', []) or getattr(element2, 'sub_functions', [])
-        
-        if subs1 and subs2:
-            sub_overlap = len(set(subs1).intersection(set(subs2)))
-            if sub_overlap > 0:
-                return min(sub_overlap / max(len(subs1), len(subs2)), 0.7)
-        
-        return 0.0
-    
-    def _calculate_functional_similarity(self, element1: Any, element2: Any) -> float:
-        """Calculate similarity based on functional characteristics"""
-        # For functions, check input/output compatibility
-        if hasattr(element1, 'input_interfaces') and hasattr(element2, 'input_interfaces'):
-            inputs1 = getattr(element1, 'input_interfaces', [])
-            inputs2 = getattr(element2, 'input_interfaces', [])
-            outputs1 = getattr(element1, 'output_interfaces', [])
-            outputs2 = getattr(element2, 'output_interfaces', [])
-            
-            input_similarity = self._calculate_interface_similarity(inputs1, inputs2)
-            output_similarity = self._calculate_interface_similarity(outputs1, outputs2)
-            
-            return (input_similarity + output_similarity) / 2
-        
-        # For capabilities, check mission alignment
-        if hasattr(element1, 'mission_statement') and hasattr(element2, 'description'):
-            mission1 = getattr(element1, 'mission_statement', '')
-            desc2 = getattr(element2, 'description', '')
-            return self._calculate_description_similarity(mission1, desc2)
-        
-        return 0.0
-    
-    def _calculate_synonym_similarity(self, words1: set, words2: set) -> float:
-        """Calculate similarity based on synonyms and related terms"""
-        # Domain-specific synonym mappings for ARCADIA
-        synonym_groups = [
-            {'monitor', 'observe', 'watch', 'track', 'surveillance'},
-            {'process', 'handle', 'manage', 'execute', 'perform'},
-            {'user', 'operator', 'actor', 'stakeholder', 'participant'},
-            {'system', 'platform', 'infrastructure', 'framework'},
-            {'security', 'protection', 'safety', 'defense'},
-            {'data', 'information', 'content', 'payload'},
-            {'interface', 'connection', 'link', 'communication'},
-            {'control', 'command', 'manage', 'govern', 'regulate'},
-            {'analyze', 'evaluate', 'assess', 'examine', 'review'},
-            {'network', 'communication', 'connectivity', 'transmission'}
-        ]
-        
-        synonym_score = 0.0
-        total_comparisons = 0
-        
-        for word1 in words1:
-            for word2 in words2:
-                total_comparisons += 1
-                # Check if words are in the same synonym group
-                for group in synonym_groups:
-                    if word1 in group and word2 in group:
-                        synonym_score += 0.8  # High similarity for synonyms
-                        break
-                else:
-                    # Check for partial matches or root words
-                    if len(word1) > 3 and len(word2) > 3:
-                        if word1[:3] == word2[:3] or word1[-3:] == word2[-3:]:
-                            synonym_score += 0.4  # Moderate similarity for root matches
-        
-        return synonym_score / max(total_comparisons, 1)
-    
-    def _calculate_character_similarity(self, str1: str, str2: str) -> float:
-        """Calculate character-level similarity (simplified Levenshtein)"""
-        if not str1 or not str2:
-            return 0.0
-        
-        if str1 == str2:
-            return 1.0
-        
-        # Simple character overlap calculation
-        chars1 = set(str1)
-        chars2 = set(str2)
-        common_chars = chars1.intersection(chars2)
-        
-        if not common_chars:
-            return 0.0
-        
-        char_similarity = len(common_chars) / len(chars1.union(chars2))
-        
-        # Boost for similar lengths
-        length_factor = min(len(str1), len(str2)) / max(len(str1), len(str2))
-        
-        return char_similarity * length_factor
-    
     def _extract_key_terms(self, text: str) -> set:
         """Extract key terms from text (nouns, domain terms, etc.)"""
         # Domain-specific keywords for ARCADIA
@@ -895,78 +710,20 @@ class StructuredARCADIAService:
         
         return weighted_terms or key_terms  # Fallback to all terms if no weighted terms
     
-    def _calculate_semantic_term_similarity(self, terms1: set, terms2: set) -> float:
-        """Calculate semantic similarity between term sets"""
-        if not terms1 or not terms2:
-            return 0.0
-        
-        # Check for semantic relationships
-        total_score = 0.0
-        total_comparisons = 0
-        
-        for term1 in terms1:
-            for term2 in terms2:
-                total_comparisons += 1
-                
-                # Character similarity for similar terms
-                char_sim = self._calculate_character_similarity(term1, term2)
-                if char_sim > 0.6:
-                    total_score += char_sim * 0.7
-                
-                # Check for common roots or stems
-                if len(term1) > 4 and len(term2) > 4:
-                    if term1[:4] == term2[:4] or term1[-4:] == term2[-4:]:
-                        total_score += 0.5
-        
-        return total_score / max(total_comparisons, 1)
-    
-    def _calculate_interface_similarity(self, interfaces1: List[Dict], interfaces2: List[Dict]) -> float:
-        """Calculate similarity between interface specifications"""
-        if not interfaces1 or not interfaces2:
-            return 0.0
-        
-        total_score = 0.0
-        comparisons = 0
-        
-        for intf1 in interfaces1:
-            for intf2 in interfaces2:
-                comparisons += 1
-                
-                # Compare interface types
-                type1 = intf1.get('type', '') if isinstance(intf1, dict) else str(intf1)
-                type2 = intf2.get('type', '') if isinstance(intf2, dict) else str(intf2)
-                
-                if type1 == type2:
-                    total_score += 1.0
-                elif self._calculate_name_similarity(type1, type2) > 0.6:
-                    total_score += 0.7
-        
-        return total_score / max(comparisons, 1)
-    
     def _calculate_actor_coverage(self, op_actors: List, sys_actors: List) -> float:
         """Calculate coverage of operational actors by system actors"""
-        if not op_actors:
-            return 1.0
-        
-        covered_count = 0
-        for op_actor in op_actors:
-            for sys_actor in sys_actors:
-                if self._calculate_name_similarity(op_actor.name, sys_actor.name) > 0.6:
-                    covered_count += 1
-                    break
-        
-        return covered_count / len(op_actors)
+        return self._calculate_name_coverage(op_actors, sys_actors)
     
     def _calculate_capability_coverage(self, op_capabilities: List, sys_capabilities: List) -> float:
         """Calculate coverage of operational capabilities by system capabilities"""
-        if not op_capabilities:
+        return self._calculate_name_coverage(op_capabilities, sys_capabilities)
+    
+    def _calculate_name_coverage(self, sources: List, targets: List) -> float:
+        """Share of sources with a target of similar name (name similarity above 0.6)"""
+        if not sources:
             return 1.0
+        if not targets:
+            return 0.0
         
-        covered_count = 0
-        for op_cap in op_capabilities:
-            for sys_cap in sys_capabilities:
-                if self._calculate_name_similarity(op_cap.name, sys_cap.name) > 0.6:
-                    covered_count += 1
-                    break
-        
-        return covered_count / len(op_capabilities) 
\ No newline at end of file
+        similarities = TraceabilityMatcher(self._extract_key_terms).name_similarity(sources, targets)
+        return float((similarities > 0.6).any(axis=1).mean()) 
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Dependency-aware task DAG scheduler
+
+Models a multi-step analysis as a directed acyclic graph of named tasks with
+explicit dependencies and runs it on a bounded thread pool: every task starts
+as soon as all of its dependencies have finished. The run report records
+per-node timings and the critical path, i.e. the longest chain of dependent
+tasks that bounds the achievable wall-clock time.
+"""
+
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class TaskNode:
+    """A named unit of work; func receives the results of its dependencies by name"""
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    dependencies: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TaskTiming:
+    """Execution timing of one task, relative to the start of the run"""
+    name: str
+    start_offset: float
+    end_offset: float
+    status: str = "completed"
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end_offset - self.start_offset
+
+
+@dataclass
+class DAGRunReport:
+    """Results and timing report of a DAG run"""
+    results: Dict[str, Any]
+    timings: Dict[str, TaskTiming]
+    wall_time_seconds: float
+    critical_path: List[str]
+    critical_path_seconds: float
+    max_concurrency: int
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        return {name: timing.error for name, timing in self.timings.items() if timing.error}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable summary (without task results)"""
+        return {
+            "wall_time_seconds": round(self.wall_time_seconds, 3),
+            "critical_path": self.critical_path,
+            "critical_path_seconds": round(self.critical_path_seconds, 3),
+            "max_concurrency": self.max_concurrency,
+            "nodes": {
+                name: {
+                    "start_offset": round(timing.start_offset, 3),
+                    "duration_seconds": round(timing.duration, 3),
+                    "status": timing.status,
+                    "error": timing.error
+                }
+                for name, timing in self.timings.items()
+            }
+        }
+
+
+class TaskDAG:
+    """Directed acyclic graph of tasks"""
+
+    def __init__(self):
+        self.nodes: Dict[str, TaskNode] = {}
+
+    def add_task(self, name: str, func: Callable[[Dict[str, Any]], Any],
+                 dependencies: Optional[List[str]] = None) -> str:
+        """Register a task; returns its name so callers can chain dependencies"""
+        if name in self.nodes:
+            raise ValueError(f"Duplicate task name: {name}")
+        self.nodes[name] = TaskNode(name=name, func=func, dependencies=list(dependencies or []))
+        return name
+
+    def topological_order(self) -> List[str]:
+        """Return task names in dependency order, validating the graph"""
+        for node in self.nodes.values():
+            missing = [dep for dep in node.dependencies if dep not in self.nodes]
+            if missing:
+                raise ValueError(f"Task '{node.name}' depends on unknown tasks: {missing}")
+
+        in_degree = {name: len(node.dependencies) for name, node in self.nodes.items()}
+        ready = [name for name, degree in in_degree.items() if degree == 0]
+        order: List[str] = []
+
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for other in self.nodes.values():
+                if name in other.dependencies:
+                    in_degree[other.name] -= 1
+                    if in_degree[other.name] == 0:
+                        ready.append(other.name)
+
+        if len(order) != len(self.nodes):
+            cyclic = sorted(set(self.nodes) - set(order))
+            raise ValueError(f"Task graph contains a cycle involving: {cyclic}")
+
+        return order
+
+
+class DAGScheduler:
+    """Run a TaskDAG with at most max_concurrency tasks in flight"""
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max(1, max_concurrency)
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, dag: TaskDAG) -> DAGRunReport:
+        """
+        Execute every task once its dependencies are done
+
+        A task that raises is recorded as failed with a None result; its
+        dependents still run and receive None, so tasks are expected to
+        degrade gracefully on missing inputs.
+        """
+        order = dag.topological_order()
+        results: Dict[str, Any] = {}
+        timings: Dict[str, TaskTiming] = {}
+        remaining = list(order)
+        running: Dict[Future, str] = {}
+        run_start = time.perf_counter()
+
+        def execute(node: TaskNode):
+            start = time.perf_counter() - run_start
+            dependency_results = {dep: results.get(dep) for dep in node.dependencies}
+            try:
+                result = node.func(dependency_results)
+                return result, TaskTiming(node.name, start, time.perf_counter() - run_start)
+            except Exception as e:
+                self.logger.error(f"Task '{node.name}' failed: {str(e)}")
+                return None, TaskTiming(node.name, start, time.perf_counter() - run_start,
+                                        status="failed", error=str(e))
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while remaining or running:
+                # Submit every task whose dependencies have all completed
+                for name in list(remaining):
+                    if len(running) >= self.max_concurrency:
+                        break
+                    if all(dep in timings for dep in dag.nodes[name].dependencies):
+                        remaining.remove(name)
+                        running[executor.submit(execute, dag.nodes[name])] = name
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name], timings[name] = future.result()
+
+        wall_time = time.perf_counter() - run_start
+        critical_path, critical_seconds = self._critical_path(dag, order, timings)
+
+        self.logger.info(f"DAG run finished: {len(order)} tasks in {wall_time:.2f}s, "
+                         f"critical path {critical_seconds:.2f}s ({' -> '.join(critical_path)})")
+
+        return DAGRunReport(
+            results=results,
+            timings={name: timings[name] for name in order},
+            wall_time_seconds=wall_time,
+            critical_path=critical_path,
+            critical_path_seconds=critical_seconds,
+            max_concurrency=self.max_concurrency
+        )
+
+    def _critical_path(self, dag: TaskDAG, order: List[str],
+                       timings: Dict[str, TaskTiming]) -> Tuple[List[str], float]:
+        """Longest chain of dependent tasks by measured duration"""
+        longest: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+
+        for name in order:
+            best_dep = max(dag.nodes[name].dependencies, key=lambda dep: longest[dep], default=None)
+            longest[name] = timings[name].duration + (longest[best_dep] if best_dep else 0.0)
+            previous[name] = best_dep
+
+        if not longest:
+            return [], 0.0
+
+        end = max(longest, key=lambda name: longest[name])
+        path = []
+        node: Optional[str] = end
+        while node:
+            path.append(node)
+            node = previous[node]
+
+        return list(reversed(path)), longest[end]
@@ -0,0 +1,620 @@
+"""
+Vectorized Traceability Matching for Cross-Phase Analysis
+
+Scores every (source, target) element pair of two ARCADIA phases at once.
+Each element is tokenized a single time into term sets (name words,
+characters, description key terms, interface types, related identifiers);
+pairwise overlaps are then computed as matrix products over the vocabulary
+shared by both sides, and the best target of every source is selected on the
+whole score matrix.
+
+The scores reproduce the rules and weights of the former per-pair scorer of
+StructuredARCADIAService ("comprehensive", "contextual", "functional"): each
+rule of its cascades (exact match, substring, word overlap, synonyms, roots,
+character overlap) is computed as a matrix and the first applicable rule is
+selected per pair with np.where. Averages over word or term pairs are
+computed as X1 @ S @ X2.T with S the term-pair score matrix.
+
+For large phase pairs a blocking stage (CandidateBlockingIndex) first keeps,
+for each source, only the targets sharing discriminative key terms, so link
+generation grows roughly linearly with model size instead of quadratically.
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from config import config
+
+# Stop words ignored when comparing element names
+NAME_STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
+
+# Domain-specific synonym mappings for ARCADIA
+ARCADIA_SYNONYM_GROUPS = [
+    {'monitor', 'observe', 'watch', 'track', 'surveillance'},
+    {'process', 'handle', 'manage', 'execute', 'perform'},
+    {'user', 'operator', 'actor', 'stakeholder', 'participant'},
+    {'system', 'platform', 'infrastructure', 'framework'},
+    {'security', 'protection', 'safety', 'defense'},
+    {'data', 'information', 'content', 'payload'},
+    {'interface', 'connection', 'link', 'communication'},
+    {'control', 'command', 'manage', 'govern', 'regulate'},
+    {'analyze', 'evaluate', 'assess', 'examine', 'review'},
+    {'network', 'communication', 'connectivity', 'transmission'}
+]
+
+# Word -> synonym group indices (a word may belong to several groups)
+_WORD_CONCEPTS: Dict[str, Set[int]] = {}
+_NO_CONCEPTS: frozenset = frozenset()
+for _group_index, _group in enumerate(ARCADIA_SYNONYM_GROUPS):
+    for _word in _group:
+        _WORD_CONCEPTS.setdefault(_word, set()).add(_group_index)
+
+
+class CandidateBlockingIndex:
+    """
+    Inverted index from blocking keys to target elements
+
+    Keys are name words, synonym concepts and description key terms. A source
+    only gets as candidates the targets sharing at least one key, ranked by the
+    IDF-weighted number of shared keys and capped at max_candidates. Keys
+    posted by more than max_term_postings targets are skipped: they match
+    nearly everything and would make candidate generation quadratic again.
+    """
+
+    def __init__(self, target_keys: List[Set[Hashable]], max_candidates: int, max_term_postings: int):
+        self.max_candidates = max(1, max_candidates)
+        self.postings: Dict[Hashable, List[int]] = {}
+        for index, keys in enumerate(target_keys):
+            for key in keys:
+                self.postings.setdefault(key, []).append(index)
+
+        target_count = max(len(target_keys), 1)
+        self.weights = {
+            key: float(np.log(1 + target_count / len(indices)))
+            for key, indices in self.postings.items()
+            if len(indices) <= max_term_postings
+        }
+
+    def candidates(self, source_keys: Set[Hashable]) -> List[int]:
+        """Indices of the most plausible targets for a source"""
+        scores: Dict[int, float] = {}
+        for key in source_keys:
+            weight = self.weights.get(key)
+            if weight is None:
+                continue
+            for index in self.postings[key]:
+                scores[index] = scores.get(index, 0.0) + weight
+
+        if len(scores) <= self.max_candidates:
+            return sorted(scores)
+        best = sorted(scores, key=lambda index: (-scores[index], index))[:self.max_candidates]
+        return sorted(best)
+
+
+class TraceabilityMatcher:
+    """Pairwise similarity matrices and best-match selection between element lists"""
+
+    BLOCKED_ROWS_PER_BLOCK = 32
+
+    def __init__(self,
+                 key_term_extractor: Callable[[str], Set[str]],
+                 embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 block_size: int = 512,
+                 blocking_min_pairs: Optional[int] = None,
+                 max_candidates: Optional[int] = None,
+                 max_term_postings: Optional[int] = None):
+        """
+        Args:
+            key_term_extractor: Description key-term extraction (StructuredARCADIAService._extract_key_terms)
+            embedding_function: Optional text embedding callable; when given, embedding cosine
+                similarity complements the key-term overlap of descriptions
+            block_size: Source rows scored per matrix block during best-match selection
+            blocking_min_pairs: Pair count above which candidate blocking is used
+            max_candidates: Targets scored per source when blocking (recall/speed knob)
+            max_term_postings: Keys shared by more targets than this are ignored for blocking
+        """
+        self.key_term_extractor = key_term_extractor
+        self.embedding_function = embedding_function
+        self.block_size = max(1, block_size)
+        self.blocking_min_pairs = (config.TRACEABILITY_BLOCKING_MIN_PAIRS
+                                   if blocking_min_pairs is None else blocking_min_pairs)
+        self.max_candidates = max_candidates or config.TRACEABILITY_MAX_CANDIDATES
+        self.max_term_postings = max_term_postings or config.TRACEABILITY_MAX_TERM_POSTINGS
+        self.logger = logging.getLogger(__name__)
+        self._feature_cache: Dict[Tuple[str, int], Any] = {}
+        self._text_profiles: Dict[str, Tuple[bool, str, Set[str], Set[str]]] = {}
+        self._term_ids: Dict[Hashable, int] = {}
+        self._terms: List[Hashable] = []
+        self._char_sets: Dict[str, Set[str]] = {}
+        self._encodings: Dict[int, Tuple[Any, np.ndarray, np.ndarray]] = {}
+
+    # ------------------------------------------------------------------
+    # Best-match selection
+    # ------------------------------------------------------------------
+
+    def best_matches(self, sources: Sequence[Any], targets: Sequence[Any],
+                     similarity_type: str, threshold: float) -> List[Tuple[Any, Any, float]]:
+        """
+        Return (source, best target, score) for every source whose best score exceeds threshold
+
+        Ties resolve to the first target, as in the sequential per-pair search.
+        """
+        matches: List[Tuple[Any, Any, float]] = []
+        if not sources or not targets:
+            return matches
+
+        blocking_index = None
+        if len(sources) * len(targets) > self.blocking_min_pairs:
+            blocking_index = CandidateBlockingIndex(
+                self._features(targets, "blocking", self._blocking_keys),
+                self.max_candidates, self.max_term_postings
+            )
+
+        # Blocked rows are scored in small blocks so the union of their candidates stays small
+        rows_per_block = self.block_size if blocking_index is None else self.BLOCKED_ROWS_PER_BLOCK
+        for start in range(0, len(sources), rows_per_block):
+            block = sources[start:start + rows_per_block]
+
+            if blocking_index is None:
+                block_targets = targets
+                scores = self.similarity_matrix(block, targets, similarity_type)
+            else:
+                block_targets, scores = self._blocked_scores(block, targets, similarity_type, blocking_index)
+                if not block_targets:
+                    continue
+
+            best_indices = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(block)), best_indices]
+
+            for row in np.nonzero(best_scores > threshold)[0]:
+                matches.append((block[row], block_targets[best_indices[row]], float(best_scores[row])))
+
+        return matches
+
+    def _blocked_scores(self, block: Sequence[Any], targets: Sequence[Any], similarity_type: str,
+                        blocking_index: CandidateBlockingIndex) -> Tuple[List[Any], np.ndarray]:
+        """Score a block of sources against the union of their candidates only"""
+        candidate_lists = [blocking_index.candidates(keys)
+                           for keys in self._features(block, "blocking", self._blocking_keys)]
+        columns = sorted(set().union(*candidate_lists))
+        if not columns:
+            return [], np.zeros((len(block), 0), dtype=np.float64)
+
+        column_of = {target_index: column for column, target_index in enumerate(columns)}
+        block_targets = [targets[target_index] for target_index in columns]
+        scores = self.similarity_matrix(block, block_targets, similarity_type)
+
+        # Non-candidate pairs can never be selected
+        candidate_mask = np.zeros(scores.shape, dtype=bool)
+        for row, candidates in enumerate(candidate_lists):
+            candidate_mask[row, [column_of[target_index] for target_index in candidates]] = True
+        return block_targets, np.where(candidate_mask, scores, -1.0)
+
+    # ------------------------------------------------------------------
+    # Similarity matrices
+    # ------------------------------------------------------------------
+
+    def similarity_matrix(self, sources: Sequence[Any], targets: Sequence[Any],
+                          similarity_type: str = "comprehensive") -> np.ndarray:
+        """Similarity score matrix (len(sources) x len(targets)) with values in [0, 1]"""
+        if similarity_type == "comprehensive":
+            return (self.name_similarity(sources, targets) * 0.4
+                    + self.description_similarity(sources, targets) * 0.3
+                    + self.contextual_similarity(sources, targets) * 0.3)
+
+        if similarity_type == "contextual":
+            return (self.name_similarity(sources, targets) * 0.3
+                    + self.description_similarity(sources, targets) * 0.4
+                    + self.relationship_similarity(sources, targets) * 0.3)
+
+        if similarity_type == "functional":
+            return self.functional_similarity(sources, targets)
+
+        return self.name_similarity(sources, targets)
+
+    def name_similarity(self, sources: Sequence[Any], targets: Sequence[Any]) -> np.ndarray:
+        """Exact match, substring, word overlap, synonyms and character similarity of names"""
+        return self.text_similarity(
+            [getattr(element, 'name', '') or '' for element in sources],
+            [getattr(element, 'name', '') or '' for element in targets]
+        )
+
+    def description_similarity(self, sources: Sequence[Any], targets: Sequence[Any],
+                               source_field: str = 'description',
+                               target_field: str = 'description') -> np.ndarray:
+        """
+        Key-term Jaccard of descriptions, or the mean term-pair similarity
+        (character overlap, shared roots) when they share no key term;
+        complemented by embedding cosine when available
+        """
+        source_terms = self._features(sources, f"terms:{source_field}",
+                                      lambda element: self._key_terms(getattr(element, source_field, '')))
+        target_terms = self._features(targets, f"terms:{target_field}",
+                                      lambda element: self._key_terms(getattr(element, target_field, '')))
+        intersections, left_sizes, right_sizes = self._intersections(source_terms, target_terms)
+        unions = left_sizes[:, None] + right_sizes[None, :] - intersections
+        scores = np.where(intersections > 0,
+                          np.divide(intersections, np.maximum(unions, 1)),
+                          self._pair_average(source_terms, target_terms, self._term_pair_scores)).astype(np.float64)
+
+        if self.embedding_function is not None:
+            scores = np.maximum(scores, self._embedding_similarity(sources, targets, source_field, target_field))
+
+        return scores
+
+    def contextual_similarity(self, sources: Sequence[Any], targets: Sequence[Any]) -> np.ndarray:
+        """Overlap of responsibilities, capabilities and involved/allocated actors (same element types only)"""
+        scores = np.zeros((len(sources), len(targets)), dtype=np.float64)
+        if not sources or not targets:
+            return scores
+
+        source_types = np.array([type(element).__name__ for element in sources], dtype=object)
+        target_types = np.array([type(element).__name__ for element in targets], dtype=object)
+        same_type = source_types[:, None] == target_types[None, :]
+        if not same_type.any():
+            return scores
+
+        attribute_pairs = [
+            ('responsibilities', 'responsibilities'),
+            ('capabilities', 'capabilities'),
+            ('involved_actors', 'allocated_actors')
+        ]
+
+        total = np.zeros_like(scores)
+        counted = np.zeros_like(scores)
+        for source_attr, target_attr in attribute_pairs:
+            if not (hasattr(sources[0], source_attr) and hasattr(targets[0], target_attr)):
+                continue
+            left = self._features(sources, f"set:{source_attr}", lambda element: set(getattr(element, source_attr, []) or []))
+            right = self._features(targets, f"set:{target_attr}", lambda element: set(getattr(element, target_attr, []) or []))
+            intersections, left_sizes, right_sizes = self._intersections(left, right)
+            unions = left_sizes[:, None] + right_sizes[None, :] - intersections
+            total += np.divide(intersections, np.maximum(unions, 1))
+            counted += (unions > 0)
+
+        scores = np.divide(total, np.maximum(counted, 1))
+        return np.where(same_type, scores, 0.0).astype(np.float64)
+
+    def relationship_similarity(self, sources: Sequence[Any], targets: Sequence[Any]) -> np.ndarray:
+        """Similar parents (0.8) or shared sub-elements (up to 0.7)"""
+        source_parents = [self._parent(element) for element in sources]
+        target_parents = [self._parent(element) for element in targets]
+        parent_match = (self.text_similarity(source_parents, target_parents) > 0.6)
+
+        left = self._features(sources, "subs", self._sub_elements)
+        right = self._features(targets, "subs", self._sub_elements)
+        intersections, _, _ = self._intersections(left, right)
+        # Rapporté à la longueur des listes (doublons compris), comme le calcul par paire
+        left_counts = np.array([len(self._sub_element_list(element)) for element in sources], dtype=np.float64)
+        right_counts = np.array([len(self._sub_element_list(element)) for element in targets], dtype=np.float64)
+        largest = np.maximum(left_counts[:, None], right_counts[None, :])
+        sub_scores = np.minimum(np.divide(intersections, np.maximum(largest, 1)), 0.7)
+
+        return np.where(parent_match, 0.8, sub_scores).astype(np.float64)
+
+    def functional_similarity(self, sources: Sequence[Any], targets: Sequence[Any]) -> np.ndarray:
+        """Interface type compatibility for functions, mission alignment for capabilities"""
+        if not sources or not targets:
+            return np.zeros((len(sources), len(targets)), dtype=np.float64)
+
+        if hasattr(sources[0], 'input_interfaces') and hasattr(targets[0], 'input_interfaces'):
+            input_scores = self._interface_similarity(sources, targets, 'input_interfaces')
+            output_scores = self._interface_similarity(sources, targets, 'output_interfaces')
+            return (input_scores + output_scores) / 2
+
+        if hasattr(sources[0], 'mission_statement') and hasattr(targets[0], 'description'):
+            return self.description_similarity(sources, targets, 'mission_statement', 'description')
+
+        return np.zeros((len(sources), len(targets)), dtype=np.float64)
+
+    # ------------------------------------------------------------------
+    # Building blocks
+    # ------------------------------------------------------------------
+
+    def text_similarity(self, left_texts: List[str], right_texts: List[str]) -> np.ndarray:
+        """
+        Name similarity of every text pair, first applicable rule:
+
+        exact match 1.0; substring 0.7-0.9 by length ratio; no word left
+        after stop words 0.0; shared words min(1.2 x Jaccard, 1.0); mean
+        synonym / root score of the word pairs; character overlap x length
+        ratio x 0.6
+        """
+        left = [self._text_profile(text) for text in left_texts]
+        right = [self._text_profile(text) for text in right_texts]
+        if not left or not right:
+            return np.zeros((len(left), len(right)), dtype=np.float64)
+
+        left_norm = [profile[1] for profile in left]
+        right_norm = [profile[1] for profile in right]
+        left_lengths = np.array([len(text) for text in left_norm], dtype=np.float64)
+        right_lengths = np.array([len(text) for text in right_norm], dtype=np.float64)
+        length_ratio = np.divide(np.minimum(left_lengths[:, None], right_lengths[None, :]),
+                                 np.maximum(np.maximum(left_lengths[:, None], right_lengths[None, :]), 1))
+
+        char_intersections, left_char_sizes, right_char_sizes = self._intersections(
+            [profile[3] for profile in left], [profile[3] for profile in right])
+        char_unions = left_char_sizes[:, None] + right_char_sizes[None, :] - char_intersections
+        char_scores = np.divide(char_intersections, np.maximum(char_unions, 1)) * length_ratio * 0.6
+
+        left_words = [profile[2] for profile in left]
+        right_words = [profile[2] for profile in right]
+        word_intersections, left_word_sizes, right_word_sizes = self._intersections(left_words, right_words)
+        word_unions = left_word_sizes[:, None] + right_word_sizes[None, :] - word_intersections
+        word_scores = np.minimum(np.divide(word_intersections, np.maximum(word_unions, 1)) * 1.2, 1.0)
+        has_words = (left_word_sizes[:, None] > 0) & (right_word_sizes[None, :] > 0)
+
+        synonym_scores = self._pair_average(left_words, right_words, self._word_pair_scores)
+
+        scores = np.where(synonym_scores > 0, synonym_scores, char_scores)
+        scores = np.where(word_intersections > 0, word_scores, scores)
+        scores = np.where(has_words, scores, 0.0)
+
+        substring = self._substring_mask(left_norm, right_norm, char_intersections, left_char_sizes, right_char_sizes)
+        scores = np.where(substring, 0.7 + length_ratio * 0.2, scores)
+        scores = np.where(np.array(left_norm, dtype=object)[:, None] == np.array(right_norm, dtype=object)[None, :],
+                          1.0, scores)
+
+        non_empty = np.array([profile[0] for profile in left])[:, None] & np.array([profile[0] for profile in right])[None, :]
+        return np.where(non_empty, scores, 0.0).astype(np.float64)
+
+    @staticmethod
+    def _substring_mask(left: List[str], right: List[str], char_intersections: np.ndarray,
+                        left_char_sizes: np.ndarray, right_char_sizes: np.ndarray) -> np.ndarray:
+        """Pairs where one text contains the other (checked only where one character set contains the other)"""
+        mask = np.zeros(char_intersections.shape, dtype=bool)
+        possible = ((char_intersections == left_char_sizes[:, None])
+                    | (char_intersections == right_char_sizes[None, :]))
+        for row, column in zip(*np.nonzero(possible)):
+            mask[row, column] = left[row] in right[column] or right[column] in left[row]
+        return mask
+
+    def _word_pair_scores(self, left_words: List[str], right_words: List[str]) -> np.ndarray:
+        """0.8 for name words of a common synonym group, else 0.4 for a shared 3-letter root"""
+        left_concepts = [_WORD_CONCEPTS.get(word, _NO_CONCEPTS) for word in left_words]
+        right_concepts = [_WORD_CONCEPTS.get(word, _NO_CONCEPTS) for word in right_words]
+        synonyms = self._overlap_matrix(left_concepts, right_concepts) > 0
+        roots = self._root_matches(left_words, right_words, 3)
+        return np.where(synonyms, 0.8, np.where(roots, 0.4, 0.0)).astype(np.float64)
+
+    def _term_pair_scores(self, left_terms: List[str], right_terms: List[str]) -> np.ndarray:
+        """Description term pairs: 0.7 x character similarity above 0.6, plus 0.5 for a shared 4-letter root"""
+        left_lengths = np.array([len(term) for term in left_terms], dtype=np.float64)
+        right_lengths = np.array([len(term) for term in right_terms], dtype=np.float64)
+        length_ratio = np.divide(np.minimum(left_lengths[:, None], right_lengths[None, :]),
+                                 np.maximum(np.maximum(left_lengths[:, None], right_lengths[None, :]), 1))
+        char_similarity = self._jaccard([self._characters(term) for term in left_terms],
+                                        [self._characters(term) for term in right_terms]) * length_ratio
+
+        scores = np.where(char_similarity > 0.6, char_similarity * 0.7, 0.0)
+        return (scores + np.where(self._root_matches(left_terms, right_terms, 4), 0.5, 0.0)).astype(np.float64)
+
+    @staticmethod
+    def _root_matches(left: List[str], right: List[str], size: int) -> np.ndarray:
+        """Word pairs longer than size letters sharing their first or last size letters"""
+        ids: Dict[str, int] = {}
+
+        def affix_ids(words: List[str], affix: Callable[[str], str], too_short: int) -> np.ndarray:
+            return np.array([ids.setdefault(affix(word), len(ids)) if len(word) > size else too_short
+                             for word in words], dtype=np.int64)
+
+        # Mots trop courts : -1 à gauche, -2 à droite, jamais égaux
+        prefixes = (affix_ids(left, lambda word: word[:size], -1), affix_ids(right, lambda word: word[:size], -2))
+        suffixes = (affix_ids(left, lambda word: word[-size:], -1), affix_ids(right, lambda word: word[-size:], -2))
+        return ((prefixes[0][:, None] == prefixes[1][None, :])
+                | (suffixes[0][:, None] == suffixes[1][None, :]))
+
+    def _interface_similarity(self, sources: Sequence[Any], targets: Sequence[Any], attribute: str) -> np.ndarray:
+        """Mean over interface pairs of 1.0 for identical types, 0.7 for similar type names"""
+        left = self._features(sources, f"interfaces:{attribute}",
+                              lambda element: self._interface_types(getattr(element, attribute, []) or []))
+        right = self._features(targets, f"interfaces:{attribute}",
+                               lambda element: self._interface_types(getattr(element, attribute, []) or []))
+        return self._pair_average(left, right, self._interface_type_scores)
+
+    def _interface_type_scores(self, left_types: List[str], right_types: List[str]) -> np.ndarray:
+        identical = np.array(left_types, dtype=object)[:, None] == np.array(right_types, dtype=object)[None, :]
+        similar = self.text_similarity(left_types, right_types) > 0.6
+        return np.where(identical, 1.0, np.where(similar, 0.7, 0.0)).astype(np.float64)
+
+    def _embedding_similarity(self, sources: Sequence[Any], targets: Sequence[Any],
+                              source_field: str, target_field: str) -> np.ndarray:
+        """Cosine similarity of element text embeddings (zeros if embedding fails)"""
+        try:
+            left = self._features(sources, f"embedding:{source_field}",
+                                  lambda element: self._embed(element, source_field), batch=True)
+            right = self._features(targets, f"embedding:{target_field}",
+                                   lambda element: self._embed(element, target_field), batch=True)
+            left_matrix = np.asarray(left, dtype=np.float64)
+            right_matrix = np.asarray(right, dtype=np.float64)
+            left_matrix /= np.maximum(np.linalg.norm(left_matrix, axis=1, keepdims=True), 1e-12)
+            right_matrix /= np.maximum(np.linalg.norm(right_matrix, axis=1, keepdims=True), 1e-12)
+            return np.clip(left_matrix @ right_matrix.T, 0.0, 1.0)
+        except Exception as e:
+            self.logger.warning(f"Embedding similarity unavailable, using term overlap only: {str(e)}")
+            return np.zeros((len(sources), len(targets)), dtype=np.float64)
+
+    def _features(self, elements: Sequence[Any], feature: str, extractor: Callable[[Any], Any],
+                  batch: bool = False) -> List[Any]:
+        """Extract a feature once per element (memoized across phase pairs)"""
+        missing = [element for element in elements if (feature, id(element)) not in self._feature_cache]
+
+        if missing and batch:
+            # Embeddings are computed for all missing elements in one call
+            vectors = self.embedding_function([self._element_text(element, feature.split(':', 1)[1])
+                                               for element in missing])
+            for element, vector in zip(missing, vectors):
+                self._feature_cache[(feature, id(element))] = vector
+        else:
+            for element in missing:
+                self._feature_cache[(feature, id(element))] = extractor(element)
+
+        return [self._feature_cache[(feature, id(element))] for element in elements]
+
+    def _jaccard(self, left: List[Set[Hashable]], right: List[Set[Hashable]]) -> np.ndarray:
+        """Pairwise Jaccard similarity of two lists of sets"""
+        intersections, left_sizes, right_sizes = self._intersections(left, right)
+        unions = left_sizes[:, None] + right_sizes[None, :] - intersections
+        return np.divide(intersections, np.maximum(unions, 1)).astype(np.float64)
+
+    def _pair_average(self, left: List[Any], right: List[Any],
+                      pair_scores: Callable[[List[Any], List[Any]], np.ndarray]) -> np.ndarray:
+        """
+        Mean of a term-pair score over all term pairs of every (left, right) pair of term sets
+
+        Counters weight each term by its count. pair_scores scores the two
+        vocabularies against each other once; the sums over term pairs are
+        then X_left @ S @ X_right.T.
+        """
+        left_rows, left_ids, left_weights = self._encode_all(left)
+        right_rows, right_ids, right_weights = self._encode_all(right)
+        if left_ids.size == 0 or right_ids.size == 0:
+            return np.zeros((len(left), len(right)), dtype=np.float64)
+
+        left_vocabulary = np.unique(left_ids)
+        right_vocabulary = np.unique(right_ids)
+        term_scores = pair_scores([self._terms[term_id] for term_id in left_vocabulary],
+                                  [self._terms[term_id] for term_id in right_vocabulary])
+
+        left_matrix = self._term_matrix(len(left), left_vocabulary, left_rows, left_ids, left_weights)
+        right_matrix = self._term_matrix(len(right), right_vocabulary, right_rows, right_ids, right_weights)
+        totals = (left_matrix @ term_scores) @ right_matrix.T
+        pair_counts = left_matrix.sum(axis=1)[:, None] * right_matrix.sum(axis=1)[None, :]
+        return np.divide(totals, np.maximum(pair_counts, 1)).astype(np.float64)
+
+    def _intersections(self, left: List[Set[Hashable]], right: List[Set[Hashable]]
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pairwise intersection sizes (matrix product over the shared vocabulary) and set sizes"""
+        left_sizes = np.array([len(terms) for terms in left], dtype=np.float64)
+        right_sizes = np.array([len(terms) for terms in right], dtype=np.float64)
+
+        return self._overlap_matrix(left, right), left_sizes, right_sizes
+
+    def _overlap_matrix(self, left: List[Any], right: List[Any]) -> np.ndarray:
+        """
+        Pairwise overlap of term sets (or term Counters, weighted by counts)
+
+        Term matrices are built over the vocabulary shared by both sides only:
+        terms present on one side never contribute to an overlap.
+        """
+        left_rows, left_ids, left_weights = self._encode_all(left)
+        right_rows, right_ids, right_weights = self._encode_all(right)
+
+        shared = np.intersect1d(left_ids, right_ids)
+        if shared.size == 0:
+            return np.zeros((len(left), len(right)), dtype=np.float64)
+
+        left_matrix = self._term_matrix(len(left), shared, left_rows, left_ids, left_weights)
+        right_matrix = self._term_matrix(len(right), shared, right_rows, right_ids, right_weights)
+        return left_matrix @ right_matrix.T
+
+    def _encode_all(self, term_sets: List[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Flatten term sets into parallel (row, term id, weight) arrays"""
+        encoded = [self._encode(terms) for terms in term_sets]
+        lengths = [len(ids) for ids, _ in encoded]
+        rows = np.repeat(np.arange(len(term_sets)), lengths)
+        if not encoded or not sum(lengths):
+            return rows, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        return (rows,
+                np.concatenate([ids for ids, _ in encoded]),
+                np.concatenate([weights for _, weights in encoded]))
+
+    def _encode(self, terms: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Term ids and weights of a term set (memoized; the entry keeps the set alive)"""
+        cached = self._encodings.get(id(terms))
+        if cached is not None and cached[0] is terms:
+            return cached[1], cached[2]
+
+        ids = np.array([self._term_id(term) for term in terms], dtype=np.int64)
+        if isinstance(terms, Counter):
+            weights = np.array([terms[term] for term in terms], dtype=np.float64)
+        else:
+            weights = np.ones(len(ids), dtype=np.float64)
+        self._encodings[id(terms)] = (terms, ids, weights)
+        return ids, weights
+
+    def _term_id(self, term: Hashable) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self._terms)
+            self._terms.append(term)
+        return term_id
+
+    @staticmethod
+    def _term_matrix(row_count: int, shared: np.ndarray, rows: np.ndarray,
+                     ids: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Dense term matrix restricted to the shared vocabulary"""
+        keep = np.isin(ids, shared)
+        matrix = np.zeros((row_count, shared.size), dtype=np.float64)
+        matrix[rows[keep], np.searchsorted(shared, ids[keep])] = weights[keep]
+        return matrix
+
+    # ------------------------------------------------------------------
+    # Tokenization
+    # ------------------------------------------------------------------
+
+    def _text_profile(self, text: str) -> Tuple[bool, str, Set[str], Set[str]]:
+        """Non-empty flag, normalized text, name words and characters (memoized per text)"""
+        profile = self._text_profiles.get(text)
+        if profile is None:
+            normalized = (text or '').lower().strip()
+            profile = (bool(text), normalized, self._name_words(normalized), self._characters(normalized))
+            self._text_profiles[text] = profile
+        return profile
+
+    def _characters(self, text: str) -> Set[str]:
+        characters = self._char_sets.get(text)
+        if characters is None:
+            characters = self._char_sets[text] = set(text)
+        return characters
+
+    @staticmethod
+    def _name_words(text: str) -> Set[str]:
+        return set(text.split()) - NAME_STOP_WORDS
+
+    def _blocking_keys(self, element: Any) -> Set[Hashable]:
+        """Name words, synonym concepts and description key terms of an element"""
+        name_words = self._name_words((getattr(element, 'name', '') or '').lower().strip())
+        keys: Set[Hashable] = set(name_words)
+        keys.update(("concept", concept) for concept in self._concepts(name_words))
+        for text_field in ('description', 'mission_statement'):
+            for term in self._key_terms(getattr(element, text_field, '')):
+                keys.add(term)
+                keys.update(("concept", concept) for concept in _WORD_CONCEPTS.get(term, ()))
+        return keys
+
+    @staticmethod
+    def _concepts(words: Set[str]) -> Set[int]:
+        concepts: Set[int] = set()
+        for word in words:
+            concepts.update(_WORD_CONCEPTS.get(word, ()))
+        return concepts
+
+    def _key_terms(self, text: Any) -> Set[str]:
+        return self.key_term_extractor(text.lower()) if isinstance(text, str) and text else set()
+
+    @staticmethod
+    def _parent(element: Any) -> str:
+        return getattr(element, 'parent_component', None) or getattr(element, 'parent_function', None) or ''
+
+    @staticmethod
+    def _sub_element_list(element: Any) -> List[str]:
+        return list(getattr(element, 'sub_components', []) or getattr(element, 'sub_functions', []) or [])
+
+    def _sub_elements(self, element: Any) -> Set[str]:
+        return set(self._sub_element_list(element))
+
+    @staticmethod
+    def _interface_types(interfaces: List[Any]) -> Counter:
+        return Counter(interface.get('type', '') if isinstance(interface, dict) else str(interface)
+                       for interface in interfaces)
+
+    @staticmethod
+    def _element_text(element: Any, text_field: str) -> str:
+        return f"{getattr(element, 'name', '')}: {getattr(element, text_field, '') or ''}"
+
+    def _embed(self, element: Any, text_field: str) -> List[float]:
+        return self.embedding_function([self._element_text(element, text_field)])[0]
@@ -11,9 +11,6 @@ This module consolidates all RAG functionality from:
 Provides a single, configurable entry point for all RAG operations.
 """
 
-import ollama
-import chromadb
-from chromadb.config import Settings
 from typing import List, Dict, Tuple, Optional, Any, Union
 import json
 import logging
@@ -29,6 +26,8 @@ from .arcadia_context_enricher import ARCADIAContextEnricher
 from .requirements_validation_pipeline import RequirementsValidationPipeline, ValidationReport
 from .requirements_improvement_service import RequirementsImprovementService
 from .structured_arcadia_service import StructuredARCADIAService
+from .vector_store import create_vector_store
+from ..services.llm_gateway import get_llm_gateway
 from ..templates.arcadia_phase_templates import ARCADIAPhaseTemplates
 from ..services.persistence_service import PersistenceService
 from ..utils.enhanced_requirement_extractor import EnhancedRequirementExtractor
@@ -113,9 +112,8 @@ class UnifiedRAGSystem:
         self.config = configuration or RAGConfiguration()
         self.logger = logging.getLogger(__name__)
         
-        # Initialize Ollama and ChromaDB
-        self.ollama_client = ollama.Client(host=config.OLLAMA_BASE_URL)
-        self.chroma_client = chromadb.PersistentClient(path=config.VECTORDB_PATH)
+        # Shared LLM gateway and the vector store
+        self.ollama_client = get_llm_gateway()
         self.collection = self._get_or_create_collection()
         
         # Initialize core components
@@ -160,21 +158,20 @@ class UnifiedRAGSystem:
         if self.config.enable_persistence:
             try:
                 self.persistence_service = PersistenceService()
+                if hasattr(self, 'structured_service'):
+                    self.structured_service.checkpoint_store = self.persistence_service
                 self.logger.info("Persistence service initialized")
             except Exception as e:
                 self.logger.warning(f"Could not initialize persistence: {e}")
                 self.config.enable_persistence = False
     
     def _get_or_create_collection(self):
-        """Get or create ChromaDB collection"""
-        try:
-            collection = self.chroma_client.get_collection(name=config.COLLECTION_NAME)
-        except:
-            collection = self.chroma_client.create_collection(
-                name=config.COLLECTION_NAME,
-                metadata={"description": "Unified SAFE MBSE RAG System"}
-            )
-        return collection
+        """Get or create the vector store (backend from config.VECTOR_STORE_BACKEND)"""
+        return create_vector_store(
+            config.COLLECTION_NAME,
+            metadata={"description": "Unified SAFE MBSE RAG System"},
+            ollama_client=self.ollama_client
+        )
     
     def generate_requirements_from_proposal(self, 
                                           proposal_text: str, 
@@ -0,0 +1,740 @@
+"""
+Pluggable vector stores for the RAG systems
+
+Every RAG system talks to its vector store through the VectorStore
+interface, the subset of the ChromaDB collection API the systems use (add,
+query, get, delete, count) plus reset. The backend is selected with
+config.VECTOR_STORE_BACKEND:
+
+- "chroma": a ChromaDB collection, opened through one shared PersistentClient
+  per path instead of one client per system; project-scoped systems use one
+  collection per project (PartitionedChromaVectorStore)
+- "numpy": an in-process store keeping, per project, a memory-mapped float32
+  matrix of normalized embeddings plus a JSON-lines metadata sidecar; queries
+  are exact cosine top-k by a single matrix-vector product
+- "faiss": the numpy layout searched through per-project FAISS indexes
+  (approximate for large partitions, see faiss_vector_store)
+"""
+
+import os
+import re
+import json
+import uuid
+import hashlib
+import shutil
+import threading
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import config
+
+DEFAULT_PARTITION = "_default"
+
+_chroma_clients: Dict[str, Any] = {}
+_chroma_clients_lock = threading.Lock()
+
+
+def embed_queries(embedding_function, texts: List[str]) -> List[List[float]]:
+    """Query embeddings, through embed_query() when the function separates queries from documents"""
+    embed_query = getattr(embedding_function, "embed_query", None)
+    return embed_query(texts) if embed_query is not None else embedding_function(texts)
+
+
+def get_chroma_client(path: Optional[str] = None):
+    """Shared ChromaDB PersistentClient for a path (one per process)"""
+    path = path or config.VECTORDB_PATH
+    with _chroma_clients_lock:
+        if path not in _chroma_clients:
+            import chromadb
+            from chromadb.config import Settings
+            _chroma_clients[path] = chromadb.PersistentClient(path=path, settings=Settings(allow_reset=True))
+        return _chroma_clients[path]
+
+
+class VectorStore(ABC):
+    """Collection-like vector store interface shared by all RAG systems"""
+
+    name: str
+
+    @abstractmethod
+    def add(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str],
+            embeddings: Optional[List[List[float]]] = None):
+        """Add documents (embedded by the store unless embeddings are given)"""
+
+    @abstractmethod
+    def query(self, query_texts: Optional[List[str]] = None, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              query_embeddings: Optional[List[List[float]]] = None) -> Dict[str, List[List[Any]]]:
+        """Nearest documents per query, as ChromaDB-style ids/documents/metadatas/distances lists"""
+
+    @abstractmethod
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> Dict[str, List[Any]]:
+        """Stored ids/documents/metadatas matching ids and/or a metadata filter"""
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Delete documents by id and/or metadata filter"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored documents"""
+
+    @abstractmethod
+    def reset(self):
+        """Remove every document"""
+
+    def drop_partition(self, project_id: str):
+        """Remove every document of a project (O(1) on partitioned stores)"""
+        self.delete(where={"project_id": project_id})
+
+
+class ChromaVectorStore(VectorStore):
+    """VectorStore backed by a ChromaDB collection"""
+
+    def __init__(self, collection, client=None):
+        self.collection = collection
+        self.client = client or get_chroma_client()
+        self.name = collection.name
+
+    @classmethod
+    def open(cls, name: str, embedding_function=None, metadata: Optional[Dict[str, Any]] = None,
+             client=None) -> "ChromaVectorStore":
+        """Get or create a collection on the shared client"""
+        client = client or get_chroma_client()
+        kwargs = {"embedding_function": embedding_function} if embedding_function else {}
+        try:
+            collection = client.get_collection(name=name, **kwargs)
+        except Exception:
+            collection = client.create_collection(name=name, metadata=metadata, **kwargs)
+        return cls(collection, client)
+
+    def add(self, documents, metadatas, ids, embeddings=None):
+        kwargs = {"embeddings": embeddings} if embeddings is not None else {}
+        self.collection.add(documents=documents, metadatas=metadatas, ids=ids, **kwargs)
+
+    def query(self, query_texts=None, n_results=10, where=None, query_embeddings=None):
+        kwargs: Dict[str, Any] = {"n_results": n_results}
+        if query_embeddings is not None:
+            kwargs["query_embeddings"] = query_embeddings
+        else:
+            kwargs["query_texts"] = query_texts
+        if where:
+            kwargs["where"] = where
+        return self.collection.query(**kwargs)
+
+    def get(self, ids=None, where=None):
+        kwargs: Dict[str, Any] = {}
+        if ids is not None:
+            kwargs["ids"] = ids
+        if where:
+            kwargs["where"] = where
+        return self.collection.get(**kwargs)
+
+    def delete(self, ids=None, where=None):
+        kwargs: Dict[str, Any] = {}
+        if ids is not None:
+            kwargs["ids"] = ids
+        if where:
+            kwargs["where"] = where
+        self.collection.delete(**kwargs)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def reset(self):
+        metadata = self.collection.metadata
+        embedding_function = getattr(self.collection, "_embedding_function", None)
+        self.client.delete_collection(name=self.name)
+        kwargs = {"embedding_function": embedding_function} if embedding_function else {}
+        self.collection = self.client.create_collection(name=self.name, metadata=metadata, **kwargs)
+
+
+class PartitionedChromaVectorStore(VectorStore):
+    """One ChromaDB collection per project, routed on the project_id metadata"""
+
+    def __init__(self, name: str, embedding_function=None, metadata: Optional[Dict[str, Any]] = None,
+                 client=None, partition_key: str = "project_id"):
+        self.name = name
+        self.embedding_function = embedding_function
+        self.metadata = metadata or {}
+        self.client = client or get_chroma_client()
+        self.partition_key = partition_key
+        self._collections: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def partition_collection_name(self, value: Any) -> str:
+        """Collection name of a partition (ChromaDB names are limited to 63 characters)"""
+        partition = NumpyVectorStore.partition_name(value)
+        collection_name = f"{self.name}__{partition}"
+        if len(collection_name) > 63:
+            digest = hashlib.sha1(partition.encode()).hexdigest()[:16]
+            collection_name = f"{self.name[:45]}__{digest}"
+        return collection_name
+
+    def add(self, documents, metadatas, ids, embeddings=None):
+        groups: Dict[str, List[int]] = {}
+        for index, metadata in enumerate(metadatas):
+            groups.setdefault(self.partition_collection_name((metadata or {}).get(self.partition_key)), []).append(index)
+
+        for collection_name, indexes in groups.items():
+            value = (metadatas[indexes[0]] or {}).get(self.partition_key)
+            kwargs = {"embeddings": [embeddings[i] for i in indexes]} if embeddings is not None else {}
+            self._collection(collection_name, value, create=True).add(
+                documents=[documents[i] for i in indexes],
+                metadatas=[metadatas[i] for i in indexes],
+                ids=[ids[i] for i in indexes],
+                **kwargs
+            )
+
+    def query(self, query_texts=None, n_results=10, where=None, query_embeddings=None):
+        if query_embeddings is None and self.embedding_function is not None:
+            # Un seul embedding de la requête, même pour plusieurs partitions
+            query_embeddings = embed_queries(self.embedding_function, list(query_texts or []))
+        query_count = len(query_embeddings) if query_embeddings is not None else len(query_texts or [])
+        merged: List[List[Tuple[float, str, str, Dict[str, Any]]]] = [[] for _ in range(query_count)]
+
+        for collection, remaining in self._route(where):
+            kwargs: Dict[str, Any] = {"n_results": min(n_results, collection.count())}
+            if not kwargs["n_results"]:
+                continue
+            if query_embeddings is not None:
+                kwargs["query_embeddings"] = query_embeddings
+            else:
+                kwargs["query_texts"] = query_texts
+            if remaining:
+                kwargs["where"] = remaining
+            response = collection.query(**kwargs)
+            for position in range(query_count):
+                merged[position].extend(zip(
+                    response["distances"][position],
+                    response["ids"][position],
+                    response["documents"][position],
+                    response["metadatas"][position]
+                ))
+
+        result: Dict[str, List[List[Any]]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for candidates in merged:
+            candidates = sorted(candidates, key=lambda candidate: candidate[0])[:n_results]
+            result["distances"].append([candidate[0] for candidate in candidates])
+            result["ids"].append([candidate[1] for candidate in candidates])
+            result["documents"].append([candidate[2] for candidate in candidates])
+            result["metadatas"].append([candidate[3] for candidate in candidates])
+        return result
+
+    def get(self, ids=None, where=None):
+        result: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": []}
+        for collection, remaining in self._route(where):
+            kwargs: Dict[str, Any] = {}
+            if ids is not None:
+                kwargs["ids"] = ids
+            if remaining:
+                kwargs["where"] = remaining
+            response = collection.get(**kwargs)
+            for key in result:
+                result[key].extend(response.get(key) or [])
+        return result
+
+    def delete(self, ids=None, where=None):
+        if ids is None and where and set(where) == {self.partition_key}:
+            self.drop_partition(where[self.partition_key])
+            return
+
+        for collection, remaining in self._route(where):
+            kwargs: Dict[str, Any] = {}
+            if ids is not None:
+                kwargs["ids"] = ids
+            if remaining:
+                kwargs["where"] = remaining
+            collection.delete(**kwargs)
+
+    def drop_partition(self, project_id: str):
+        collection_name = self.partition_collection_name(project_id)
+        with self._lock:
+            self._collections.pop(collection_name, None)
+        try:
+            self.client.delete_collection(name=collection_name)
+        except Exception:
+            pass  # Partition inexistante
+
+    def count(self) -> int:
+        return sum(collection.count() for collection, _ in self._route(None))
+
+    def reset(self):
+        for collection_name in self._partition_collection_names():
+            self.client.delete_collection(name=collection_name)
+        with self._lock:
+            self._collections.clear()
+
+    def _partition_collection_names(self) -> List[str]:
+        names = [getattr(collection, "name", collection) for collection in self.client.list_collections()]
+        return [name for name in names if name.startswith(f"{self.name}__")]
+
+    def _collection(self, collection_name: str, value: Any = None, create: bool = False):
+        with self._lock:
+            if collection_name in self._collections:
+                return self._collections[collection_name]
+
+            kwargs = {"embedding_function": self.embedding_function} if self.embedding_function else {}
+            try:
+                collection = self.client.get_collection(name=collection_name, **kwargs)
+            except Exception:
+                if not create:
+                    return None
+                metadata = dict(self.metadata, **{self.partition_key: str(value)}) if value is not None else self.metadata
+                collection = self.client.create_collection(name=collection_name, metadata=metadata or None, **kwargs)
+            self._collections[collection_name] = collection
+            return collection
+
+    def _route(self, where: Optional[Dict[str, Any]]) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Collections to search for a filter, with the filter left to apply inside them"""
+        if where and self.partition_key in where and not isinstance(where[self.partition_key], dict):
+            remaining = {key: value for key, value in where.items() if key != self.partition_key}
+            collection = self._collection(self.partition_collection_name(where[self.partition_key]))
+            return [(collection, remaining)] if collection is not None else []
+
+        collections = [self._collection(name) for name in self._partition_collection_names()]
+        return [(collection, where or {}) for collection in collections if collection is not None]
+
+
+class _PartitionView:
+    """
+    Rows of a partition at one point in time, searched without holding the store lock
+
+    Writers never mutate these objects in a way that invalidates the
+    snapshot: appends only add rows past its end and compaction installs new
+    lists and a new matrix.
+    """
+
+    __slots__ = ("partition", "matrix", "ids", "documents", "metadatas", "keys")
+
+    def __init__(self, partition: "_Partition", matrix: Optional[np.ndarray], ids: List[str],
+                 documents: List[str], metadatas: List[Dict[str, Any]], keys: List[int]):
+        self.partition = partition
+        self.matrix = matrix
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.keys = keys
+
+    def __len__(self) -> int:
+        return 0 if self.matrix is None else self.matrix.shape[0]
+
+
+class _Partition:
+    """
+    One project's vectors: memory-mapped float32 matrix + JSON-lines records
+
+    The records header names the vectors file. Compaction writes a new
+    vectors file and a temporary records file, then atomically replaces the
+    records: a crash leaves either the old or the new partition, never a mix.
+    """
+
+    LEGACY_VECTORS_FILE = "vectors.f32"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.vectors_path = os.path.join(path, self.LEGACY_VECTORS_FILE)
+        self.records_path = os.path.join(path, "records.jsonl")
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.keys: List[int] = []  # Identifiants entiers stables (survivent au compactage)
+        self.row_of: Dict[str, int] = {}
+        self.next_key = 0
+        self.dimension: Optional[int] = None
+        self.matrix: Optional[np.ndarray] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def snapshot(self) -> _PartitionView:
+        """Consistent view of the current rows (call under the store lock)"""
+        return _PartitionView(self, self.matrix, self.ids, self.documents, self.metadatas, self.keys)
+
+    def _load(self):
+        header = None
+        records: List[Dict[str, Any]] = []
+        record_ends: List[int] = []  # Position de fin de chaque enregistrement dans le fichier
+        if os.path.exists(self.records_path):
+            with open(self.records_path, "rb") as f:
+                header_line = f.readline()
+                if header_line.endswith(b"\n"):
+                    header = json.loads(header_line)
+                    end = len(header_line)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # Ligne tronquée par une écriture interrompue
+                        end += len(line)
+                        if line.strip():
+                            records.append(json.loads(line))
+                            record_ends.append(end)
+
+        if header is None:
+            # Première écriture interrompue avant l'en-tête : partition vide
+            for path in (self.records_path, self.vectors_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        else:
+            self.dimension = header["dimension"]
+            self.vectors_path = os.path.join(self.path, header.get("vectors", self.LEGACY_VECTORS_FILE))
+
+            # Une écriture interrompue peut laisser plus d'enregistrements que de vecteurs
+            vector_rows = (os.path.getsize(self.vectors_path) // (4 * self.dimension)
+                           if os.path.exists(self.vectors_path) else 0)
+            records = records[:vector_rows]
+
+            # ... ou plus de vecteurs que d'enregistrements : les deux fichiers sont ramenés
+            # au nombre de lignes complètes, sinon les ajouts suivants seraient décalés
+            self._truncate(self.records_path, record_ends[len(records) - 1] if records else len(header_line))
+            if os.path.exists(self.vectors_path):
+                self._truncate(self.vectors_path, len(records) * 4 * self.dimension)
+
+            self.ids = [record["id"] for record in records]
+            self.documents = [record["document"] for record in records]
+            self.metadatas = [record["metadata"] for record in records]
+            self.keys = [record.get("key", row) for row, record in enumerate(records)]
+            self.row_of = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+            self.next_key = max(self.keys) + 1 if self.keys else 0
+            self._map()
+
+        self._remove_stale_files()
+
+    @staticmethod
+    def _truncate(path: str, size: int):
+        if os.path.getsize(path) > size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _remove_stale_files(self):
+        """Delete the files of a compaction interrupted before or after its commit point"""
+        if not os.path.isdir(self.path):
+            return
+        current = os.path.basename(self.vectors_path)
+        for entry in os.listdir(self.path):
+            stale_vectors = entry.startswith("vectors") and entry.endswith(".f32") and entry != current
+            if stale_vectors or entry == "records.jsonl.tmp":
+                os.remove(os.path.join(self.path, entry))
+
+    def _map(self):
+        if self.ids:
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                    shape=(len(self.ids), self.dimension))
+        else:
+            self.matrix = None
+
+    def append(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], vectors: np.ndarray,
+               keys: Optional[List[int]] = None) -> List[int]:
+        """Append rows; returns their stable keys"""
+        if keys is None:
+            keys = list(range(self.next_key, self.next_key + len(ids)))
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match partition dimension {self.dimension}")
+
+        os.makedirs(self.path, exist_ok=True)
+        new_file = not os.path.exists(self.records_path) or os.path.getsize(self.records_path) == 0
+
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.records_path, "a", encoding="utf-8") as f:
+            if new_file:
+                f.write(self._header() + "\n")
+            for chunk_id, document, metadata, key in zip(ids, documents, metadatas, keys):
+                f.write(self._record(chunk_id, key, document, metadata) + "\n")
+
+        for chunk_id, document, metadata, key in zip(ids, documents, metadatas, keys):
+            self.row_of[chunk_id] = len(self.ids)
+            self.ids.append(chunk_id)
+            self.documents.append(document)
+            self.metadatas.append(metadata)
+            self.keys.append(key)
+        self.next_key = max(self.next_key, max(keys) + 1) if keys else self.next_key
+        self._map()
+        return keys
+
+    def remove_rows(self, rows: List[int]) -> List[int]:
+        """Compact the partition without the given rows; returns their keys"""
+        drop = set(rows)
+        removed_keys = [self.keys[row] for row in sorted(drop)]
+        keep = [row for row in range(len(self.ids)) if row not in drop]
+        vectors = np.array(self.matrix[keep]) if keep else np.zeros((0, self.dimension or 0), dtype=np.float32)
+        ids = [self.ids[row] for row in keep]
+        documents = [self.documents[row] for row in keep]
+        metadatas = [self.metadatas[row] for row in keep]
+        keys = [self.keys[row] for row in keep]
+
+        old_vectors_path = self.vectors_path
+        if ids:
+            # Nouveau fichier de vecteurs, puis enregistrements remplacés d'un bloc (point de validation)
+            self.vectors_path = os.path.join(self.path, f"vectors-{uuid.uuid4().hex[:12]}.f32")
+            with open(self.vectors_path, "wb") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            temporary_records = self.records_path + ".tmp"
+            with open(temporary_records, "w", encoding="utf-8") as f:
+                f.write(self._header() + "\n")
+                for chunk_id, document, metadata, key in zip(ids, documents, metadatas, keys):
+                    f.write(self._record(chunk_id, key, document, metadata) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_records, self.records_path)
+        else:
+            self.vectors_path = os.path.join(self.path, self.LEGACY_VECTORS_FILE)
+            if os.path.exists(self.records_path):
+                os.remove(self.records_path)
+
+        if old_vectors_path != self.vectors_path and os.path.exists(old_vectors_path):
+            os.remove(old_vectors_path)
+        if not ids and os.path.exists(self.vectors_path):
+            os.remove(self.vectors_path)
+
+        # Nouvelles listes : les instantanés des requêtes en cours restent valides
+        self.ids, self.documents, self.metadatas, self.keys = ids, documents, metadatas, keys
+        self.row_of = {chunk_id: row for row, chunk_id in enumerate(ids)}
+        self._map()
+        return removed_keys
+
+    def _header(self) -> str:
+        return json.dumps({"dimension": self.dimension, "vectors": os.path.basename(self.vectors_path)})
+
+    @staticmethod
+    def _record(chunk_id: str, key: int, document: str, metadata: Dict[str, Any]) -> str:
+        return json.dumps({"id": chunk_id, "key": key, "document": document, "metadata": metadata})
+
+
+class NumpyVectorStore(VectorStore):
+    """In-process exact vector store with one memory-mapped matrix per project"""
+
+    def __init__(self, name: str, embedding_function: Callable[[List[str]], List[List[float]]],
+                 root_path: Optional[str] = None, partition_key: str = "project_id"):
+        """
+        Args:
+            name: Store name (one directory under root_path)
+            embedding_function: Callable(texts) -> embeddings used for documents and queries
+            root_path: Directory holding the stores (defaults to config.NUMPY_VECTORSTORE_PATH)
+            partition_key: Metadata key selecting the partition of a document
+        """
+        self.name = name
+        self.embedding_function = embedding_function
+        self.partition_key = partition_key
+        self.path = os.path.join(root_path or config.NUMPY_VECTORSTORE_PATH, name)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._partitions: Dict[str, _Partition] = {}
+        os.makedirs(self.path, exist_ok=True)
+        for entry in sorted(os.listdir(self.path)):
+            if os.path.isdir(os.path.join(self.path, entry)):
+                self._partitions[entry] = _Partition(os.path.join(self.path, entry))
+
+    @staticmethod
+    def partition_name(value: Any) -> str:
+        """Directory-safe partition name for a partition key value"""
+        if value is None or value == "":
+            return DEFAULT_PARTITION
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", str(value))
+
+    def add(self, documents, metadatas, ids, embeddings=None):
+        metadatas = metadatas or [{} for _ in documents]
+        if embeddings is None:
+            embeddings = self.embedding_function(list(documents))
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+
+        with self._lock:
+            groups: Dict[str, List[int]] = {}
+            for index, (chunk_id, metadata) in enumerate(zip(ids, metadatas)):
+                name = self.partition_name((metadata or {}).get(self.partition_key))
+                partition = self._partition(name)
+                if chunk_id in partition.row_of:
+                    self.logger.warning(f"Identifiant déjà présent ignoré : {chunk_id}")
+                    continue
+                groups.setdefault(name, []).append(index)
+
+            for name, indexes in groups.items():
+                keys = self._partitions[name].append(
+                    [ids[i] for i in indexes],
+                    [documents[i] for i in indexes],
+                    [dict(metadatas[i] or {}) for i in indexes],
+                    vectors[indexes]
+                )
+                self._on_append(name, keys, vectors[indexes])
+
+    def query(self, query_texts=None, n_results=10, where=None, query_embeddings=None):
+        if query_embeddings is None:
+            query_embeddings = embed_queries(self.embedding_function, list(query_texts or []))
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+        response: Dict[str, List[List[Any]]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        # Instantané cohérent sous verrou ; la recherche se fait ensuite sans bloquer les écritures
+        with self._lock:
+            selected = [(partition.snapshot(), self._row_mask(partition, where))
+                        for partition in self._select_partitions(where)]
+
+        for query_vector in queries:
+            candidates = []
+            for view, mask in selected:
+                if view.matrix is None or view.matrix.shape[1] != query_vector.shape[0]:
+                    continue
+                candidates.extend(
+                    (score, view, row)
+                    for score, row in self._search_partition(view, query_vector, n_results, mask)
+                )
+
+            candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            candidates = candidates[:n_results]
+            response["ids"].append([view.ids[row] for _, view, row in candidates])
+            response["documents"].append([view.documents[row] for _, view, row in candidates])
+            response["metadatas"].append([dict(view.metadatas[row]) for _, view, row in candidates])
+            # Distance cosinus : 1 - similarité
+            response["distances"].append([1.0 - score for score, _, _ in candidates])
+
+        return response
+
+    def get(self, ids=None, where=None):
+        wanted = set(ids) if ids is not None else None
+        result: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": []}
+
+        with self._lock:
+            for partition in self._select_partitions(where):
+                mask = self._row_mask(partition, where)
+                for row, chunk_id in enumerate(partition.ids):
+                    if (wanted is None or chunk_id in wanted) and (mask is None or mask[row]):
+                        result["ids"].append(chunk_id)
+                        result["documents"].append(partition.documents[row])
+                        result["metadatas"].append(dict(partition.metadatas[row]))
+        return result
+
+    def delete(self, ids=None, where=None):
+        if ids is None and where and set(where) == {self.partition_key}:
+            self.drop_partition(where[self.partition_key])
+            return
+
+        wanted = set(ids) if ids is not None else None
+        with self._lock:
+            for partition in self._select_partitions(where):
+                mask = self._row_mask(partition, where)
+                rows = [
+                    row for row, chunk_id in enumerate(partition.ids)
+                    if (wanted is None or chunk_id in wanted) and (mask is None or mask[row])
+                ]
+                if rows:
+                    removed_keys = partition.remove_rows(rows)
+                    self._on_remove(os.path.basename(partition.path), removed_keys)
+
+    def drop_partition(self, project_id: str):
+        name = self.partition_name(project_id)
+        with self._lock:
+            self._partitions.pop(name, None)
+            self._on_drop(name)
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(len(partition) for partition in self._partitions.values())
+
+    def reset(self):
+        with self._lock:
+            self._partitions.clear()
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+
+    def _search_partition(self, view: _PartitionView, query_vector: np.ndarray, k: int,
+                          mask: Optional[np.ndarray]) -> List[Tuple[float, int]]:
+        """Exact top-k (score, row) pairs of a partition snapshot"""
+        scores = view.matrix @ query_vector
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        return [(float(scores[row]), int(row)) for row in top if scores[row] > -np.inf]
+
+    def _on_append(self, name: str, keys: List[int], vectors: np.ndarray):
+        """Hook for index-backed subclasses: rows were appended to a partition"""
+
+    def _on_remove(self, name: str, keys: List[int]):
+        """Hook for index-backed subclasses: rows were removed from a partition"""
+
+    def _on_drop(self, name: str):
+        """Hook for index-backed subclasses: a whole partition is being dropped"""
+
+    def _partition(self, name: str) -> _Partition:
+        if name not in self._partitions:
+            self._partitions[name] = _Partition(os.path.join(self.path, name))
+        return self._partitions[name]
+
+    def _select_partitions(self, where: Optional[Dict[str, Any]]) -> List[_Partition]:
+        """Partitions that can match the filter (a single one for a project filter)"""
+        if where and self.partition_key in where and not isinstance(where[self.partition_key], dict):
+            partition = self._partitions.get(self.partition_name(where[self.partition_key]))
+            return [partition] if partition else []
+        return list(self._partitions.values())
+
+    def _row_mask(self, partition: _Partition, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Boolean mask of rows matching the remaining equality filters"""
+        conditions = {key: value for key, value in (where or {}).items() if key != self.partition_key}
+        if not conditions:
+            return None
+        unsupported = [key for key, value in conditions.items() if key.startswith("$") or isinstance(value, dict)]
+        if unsupported:
+            raise ValueError(f"Unsupported filter operators for the NumPy vector store: {unsupported}")
+        return np.array([
+            all(metadata.get(key) == value for key, value in conditions.items())
+            for metadata in partition.metadatas
+        ], dtype=bool)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def create_vector_store(name: str,
+                        embedding_function=None,
+                        metadata: Optional[Dict[str, Any]] = None,
+                        ollama_client=None,
+                        backend: Optional[str] = None,
+                        partition_by_project: bool = False) -> VectorStore:
+    """
+    Open the configured vector store backend
+
+    Args:
+        name: Collection / store name
+        embedding_function: Embedding callable; the chroma backend falls back to
+            ChromaDB's default embeddings, the numpy and faiss backends to Nomic
+            embeddings through ollama_client
+        metadata: Collection metadata (chroma backend)
+        ollama_client: Client used for the default Nomic embeddings (numpy and faiss backends)
+        backend: "chroma", "numpy" or "faiss" (defaults to config.VECTOR_STORE_BACKEND)
+        partition_by_project: Use one ChromaDB collection per project (the numpy
+            and faiss backends always partition by project)
+    """
+    backend = (backend or config.VECTOR_STORE_BACKEND).lower()
+
+    if backend in ("numpy", "faiss"):
+        if embedding_function is None:
+            if ollama_client is None:
+                raise ValueError(f"The {backend} vector store needs an embedding function or an Ollama client")
+            from .embedding_service import NomicEmbeddingFunction
+            embedding_function = NomicEmbeddingFunction(ollama_client)
+        if backend == "faiss":
+            from .faiss_vector_store import FaissVectorStore
+            return FaissVectorStore(name, embedding_function)
+        return NumpyVectorStore(name, embedding_function)
+
+    if backend == "chroma":
+        if partition_by_project:
+            return PartitionedChromaVectorStore(name, embedding_function=embedding_function, metadata=metadata)
+        return ChromaVectorStore.open(name, embedding_function=embedding_function, metadata=metadata)
+
+    raise ValueError(f"Unknown vector store backend: {backend}")
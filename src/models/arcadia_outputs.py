@@ -1,5 +1,5 @@
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any, Set
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import List, Dict, Optional, Any, Set, Union, get_args, get_origin, get_type_hints
 from enum import Enum
 import json
 from datetime import datetime
@@ -411,25 +411,7 @@ class ARCADIAStructuredOutput:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        def convert_dataclass(obj):
-            if hasattr(obj, '__dataclass_fields__'):
-                result = {}
-                for field_name, field_def in obj.__dataclass_fields__.items():
-                    value = getattr(obj, field_name)
-                    if isinstance(value, list):
-                        result[field_name] = [convert_dataclass(item) for item in value]
-                    elif isinstance(value, dict):
-                        result[field_name] = {k: convert_dataclass(v) for k, v in value.items()}
-                    elif hasattr(value, '__dataclass_fields__'):
-                        result[field_name] = convert_dataclass(value)
-                    elif isinstance(value, Enum):
-                        result[field_name] = value.value
-                    else:
-                        result[field_name] = value
-                return result
-            return obj
-        
-        return convert_dataclass(self)
+        return dataclass_to_dict(self)
     
     def to_json(self, indent: int = 2) -> str:
         """Convert to JSON string"""
@@ -438,14 +420,64 @@ class ARCADIAStructuredOutput:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ARCADIAStructuredOutput':
         """Create from dictionary"""
-        # This would need proper deserialization logic
-        # For now, return a basic instance
-        return cls(generation_metadata=data.get('generation_metadata', {}))
+        return dataclass_from_dict(cls, data)
 
 # ==============================================================================
 # 7. HELPER FUNCTIONS
 # ==============================================================================
 
+def dataclass_to_dict(obj: Any) -> Any:
+    """Recursively convert an ARCADIA output dataclass to JSON-serializable data"""
+    if hasattr(obj, '__dataclass_fields__'):
+        result = {}
+        for field_name in obj.__dataclass_fields__:
+            value = getattr(obj, field_name)
+            if isinstance(value, list):
+                result[field_name] = [dataclass_to_dict(item) for item in value]
+            elif isinstance(value, dict):
+                result[field_name] = {k: dataclass_to_dict(v) for k, v in value.items()}
+            elif hasattr(value, '__dataclass_fields__'):
+                result[field_name] = dataclass_to_dict(value)
+            elif isinstance(value, Enum):
+                result[field_name] = value.value
+            else:
+                result[field_name] = value
+        return result
+    return obj
+
+def dataclass_from_dict(cls: Any, data: Dict[str, Any]) -> Any:
+    """Rebuild an ARCADIA output dataclass (and nested dataclasses/enums) from dataclass_to_dict data"""
+    type_hints = get_type_hints(cls)
+    kwargs = {}
+    for dataclass_field in fields(cls):
+        if dataclass_field.name in data:
+            kwargs[dataclass_field.name] = _convert_value(type_hints[dataclass_field.name], data[dataclass_field.name])
+    return cls(**kwargs)
+
+def _convert_value(field_type: Any, value: Any) -> Any:
+    """Convert a deserialized JSON value back to the annotated field type"""
+    if value is None:
+        return None
+    
+    origin = get_origin(field_type)
+    if origin is Union:
+        candidates = [arg for arg in get_args(field_type) if arg is not type(None)]
+        return _convert_value(candidates[0], value) if len(candidates) == 1 else value
+    if origin is list:
+        item_type = (get_args(field_type) or (Any,))[0]
+        return [_convert_value(item_type, item) for item in value]
+    if origin is dict:
+        value_type = (get_args(field_type) or (Any, Any))[1]
+        return {key: _convert_value(value_type, item) for key, item in value.items()}
+    if isinstance(field_type, type):
+        if is_dataclass(field_type) and isinstance(value, dict):
+            return dataclass_from_dict(field_type, value)
+        if issubclass(field_type, Enum):
+            return field_type(value)
+        if issubclass(field_type, datetime) and isinstance(value, str):
+            return datetime.fromisoformat(value)
+    return value
+
 def create_extraction_metadata(
     source_documents: List[str],
     extraction_timestamp: datetime,
@@ -0,0 +1,204 @@
+"""
+Adaptive (AIMD) concurrency limit for LLM requests
+
+The Ollama server saturates at a number of concurrent generations that
+depends on the GPU, the model and the prompt sizes; past it latency balloons
+and requests time out. Instead of a hand-tuned fixed limit, each model's
+limit follows an additive-increase / multiplicative-decrease rule:
+
+- increase: while the limit is fully used and the p95 latency of recent
+  requests stays within LLM_GATEWAY_LATENCY_TOLERANCE times its baseline, the
+  limit grows by 1/limit per completed request (about +1 per round of
+  requests), probing for spare capacity;
+- decrease: on a timeout or overload response (429/503/504), or when the p95
+  latency exceeds the tolerance (requests queueing on the server), the limit
+  is multiplied by LLM_GATEWAY_BACKOFF_RATIO. Outcomes of requests started
+  before the last decrease are ignored, so one burst of failures counts as a
+  single signal.
+
+Requests waiting for a slot are served by priority (lower value first), so
+an interactive chat call overtakes queued batch generation calls. Waiting
+ages a request: its priority improves by one level every aging_seconds, which
+keeps batch jobs from starving behind a steady flow of chat questions.
+
+Latency samples are normalized per generated token when the response reports
+it, so long and short generations are comparable. The baseline is the lowest
+p95 seen, drifting slowly upwards so a permanently slower workload re-bases.
+
+The limiter runs on the gateway's event loop and is not thread-safe.
+"""
+
+import time
+import asyncio
+import itertools
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+MIN_SAMPLES = 5  # Échantillons nécessaires avant toute décision fondée sur la latence
+BASELINE_DRIFT = 0.01  # Remontée de la référence vers le p95 courant à chaque succès
+
+
+class AdaptiveConcurrencyLimiter:
+    """Concurrency slots of one model with an AIMD-controlled limit"""
+
+    def __init__(self,
+                 initial_limit: int,
+                 min_limit: int = 1,
+                 max_limit: int = 32,
+                 adaptive: bool = True,
+                 latency_tolerance: float = 2.0,
+                 backoff_ratio: float = 0.7,
+                 window: int = 50,
+                 aging_seconds: float = 30.0):
+        """
+        Args:
+            initial_limit: Starting limit (the fixed limit when adaptive is False)
+            min_limit / max_limit: Bounds of the adaptive limit
+            latency_tolerance: p95 / baseline ratio above which the limit is reduced
+            backoff_ratio: Multiplicative decrease factor
+            window: Recent latency samples used for the p95
+            aging_seconds: Wait after which a queued request gains one priority level
+        """
+        self.adaptive = adaptive
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.aging_seconds = aging_seconds
+
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self.increases = 0
+        self.decreases = 0
+
+        # (priorité, instant de mise en attente, ordre d'arrivée, future, étiquette)
+        self._waiters: List[Tuple[int, float, int, asyncio.Future, Hashable]] = []
+        self._arrivals = itertools.count()
+        self._samples: Deque[float] = deque(maxlen=max(MIN_SAMPLES, window))
+        self._last_decrease = float("-inf")
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for entry in self._waiters if not entry[3].done())
+
+    def queued_by_priority(self) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for priority, _, _, waiter, _ in self._waiters:
+            if not waiter.done():
+                counts[priority] = counts.get(priority, 0) + 1
+        return counts
+
+    async def acquire(self, priority: int = 0, tag: Hashable = None):
+        """
+        Wait for a slot; lower priority values are served first
+
+        Args:
+            priority: Priority of the request
+            tag: Identifies the queued request for promote()
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((priority, time.monotonic(), next(self._arrivals), waiter, tag))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Place attribuée juste avant l'annulation : la rendre
+                self.release()
+            else:
+                self._waiters = [entry for entry in self._waiters if entry[3] is not waiter]
+            raise
+
+    def promote(self, tag: Hashable, priority: int):
+        """Raise the queued requests carrying tag to at least priority"""
+        if tag is None:
+            return
+        self._waiters = [
+            (min(entry[0], priority), *entry[1:]) if entry[4] == tag else entry
+            for entry in self._waiters
+        ]
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def on_success(self, latency: float, tokens: Optional[int] = None, started: Optional[float] = None):
+        """
+        Record a completed request (called while it still holds its slot)
+
+        Args:
+            latency: Request duration in seconds
+            tokens: Generated tokens, to normalize the latency
+            started: time.monotonic() at which the request got its slot
+        """
+        if not self.adaptive or self._is_stale(started):
+            return
+
+        self._samples.append(latency / tokens if tokens else latency)
+        if len(self._samples) < MIN_SAMPLES:
+            return
+
+        p95 = self._p95()
+        if self.baseline is None or p95 < self.baseline:
+            self.baseline = p95
+        else:
+            self.baseline += (p95 - self.baseline) * BASELINE_DRIFT
+
+        if p95 > self.latency_tolerance * self.baseline:
+            self._decrease()
+        elif self.in_flight >= int(self.limit) and self.limit < self.max_limit:
+            # Limite atteinte et latence saine : sonder une place de plus
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.increases += 1
+            self._wake()
+
+    def on_overload(self, started: Optional[float] = None):
+        """Record a timeout or an overload response"""
+        if self.adaptive and not self._is_stale(started):
+            self._decrease()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limit, usage and latency statistics"""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "queued_by_priority": self.queued_by_priority(),
+            "p95_latency": round(self._p95(), 4) if self._samples else None,
+            "baseline_latency": round(self.baseline, 4) if self.baseline is not None else None,
+            "increases": self.increases,
+            "decreases": self.decreases
+        }
+
+    def _is_stale(self, started: Optional[float]) -> bool:
+        # Requête lancée sous l'ancienne limite : son issue a déjà été prise en compte
+        return started is not None and started < self._last_decrease
+
+    def _decrease(self):
+        self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        self._last_decrease = time.monotonic()
+        self._samples.clear()  # Les latences mesurées avec l'ancienne limite ne comptent plus
+        self.decreases += 1
+
+    def _wake(self):
+        self._waiters = [entry for entry in self._waiters if not entry[3].done()]
+        while self._waiters and self.in_flight < int(self.limit):
+            now = time.monotonic()
+            entry = min(self._waiters, key=lambda item: (self._effective_priority(item, now), item[2]))
+            self._waiters.remove(entry)
+            self.in_flight += 1
+            entry[3].set_result(None)
+
+    def _effective_priority(self, entry: Tuple[int, float, int, asyncio.Future, Hashable], now: float) -> float:
+        priority, enqueued_at = entry[0], entry[1]
+        if self.aging_seconds <= 0:
+            return priority
+        return priority - (now - enqueued_at) / self.aging_seconds
+
+    def _p95(self) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
@@ -0,0 +1,152 @@
+"""
+LLM Response Cache for SAFE MBSE RAG System
+
+Persistent, content-addressed cache for LLM generations. Entries are keyed on
+(model, prompt hash, temperature, num_predict) and stored in SQLite so that
+regenerating the same proposal after a UI refresh does not re-query Ollama.
+The cache is bounded in size and evicts the least recently used entries.
+"""
+
+import sqlite3
+import hashlib
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class LLMResponseCache:
+    """Size-bounded LRU cache of LLM responses backed by SQLite"""
+
+    def __init__(self, db_path: str = "./data/llm_cache.db", max_entries: int = 5000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._ensure_db_structure()
+
+    def _ensure_db_structure(self):
+        """Create the cache table if it does not exist"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    temperature REAL,
+                    num_predict INTEGER,
+                    response TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_accessed REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses(last_accessed)")
+            conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: Optional[float], num_predict: Optional[int]) -> str:
+        """Build the content-addressed cache key for a generation request"""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw_key = f"{model}|{prompt_hash}|{temperature}|{num_predict}"
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str, temperature: Optional[float] = None,
+            num_predict: Optional[int] = None) -> Optional[str]:
+        """Return the cached response for this request, or None on a miss"""
+        cache_key = self.make_key(model, prompt, temperature, num_predict)
+
+        try:
+            with self._lock, sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT response FROM llm_responses WHERE cache_key = ?", (cache_key,))
+                row = cursor.fetchone()
+
+                if row is None:
+                    self._misses += 1
+                    return None
+
+                cursor.execute("""
+                    UPDATE llm_responses
+                    SET last_accessed = ?, hit_count = hit_count + 1
+                    WHERE cache_key = ?
+                """, (time.time(), cache_key))
+                conn.commit()
+                self._hits += 1
+                return row[0]
+
+        except Exception as e:
+            self.logger.warning(f"LLM cache lookup failed: {e}")
+            self._misses += 1
+            return None
+
+    def put(self, model: str, prompt: str, response: str, temperature: Optional[float] = None,
+            num_predict: Optional[int] = None) -> bool:
+        """Store a response and evict least recently used entries beyond max_entries"""
+        if not response:
+            return False
+
+        cache_key = self.make_key(model, prompt, temperature, num_predict)
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+        try:
+            with self._lock, sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO llm_responses
+                    (cache_key, model, prompt_hash, temperature, num_predict, response, last_accessed)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (cache_key, model, prompt_hash, temperature, num_predict, response, time.time()))
+
+                cursor.execute("SELECT COUNT(*) FROM llm_responses")
+                overflow = cursor.fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    cursor.execute("""
+                        DELETE FROM llm_responses WHERE cache_key IN (
+                            SELECT cache_key FROM llm_responses
+                            ORDER BY last_accessed ASC
+                            LIMIT ?
+                        )
+                    """, (overflow,))
+                    self._evictions += overflow
+
+                conn.commit()
+                return True
+
+        except Exception as e:
+            self.logger.warning(f"LLM cache write failed: {e}")
+            return False
+
+    def clear(self):
+        """Remove every cached response and reset the counters"""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM llm_responses")
+            conn.commit()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current cache size"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                entries = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        except Exception:
+            entries = 0
+
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries
+        }
@@ -0,0 +1,510 @@
+"""
+Shared LLM gateway for every Ollama call
+
+Every RAG system used to build its own blocking ollama.Client, so each one
+opened its own connections and parallel generation needed one thread per
+in-flight request. The gateway is the single process-wide entry point:
+
+- one ollama.AsyncClient with a keep-alive connection pool, driven by an
+  event loop on a dedicated thread;
+- an asyncio API (agenerate, achat, achat_stream, aembed) usable from any
+  event loop, and sync wrappers with the ollama.Client signatures (generate,
+  chat, embed, embeddings) so existing components can use the gateway
+  wherever they received a client;
+- per-model concurrency limits, adapted at runtime with AIMD (see
+  adaptive_concurrency.py) so throughput stays near the server's optimum
+  without hand tuning; LLM_GATEWAY_MODEL_CONCURRENCY sets starting limits;
+- connect/read timeouts, and retries with jittered exponential backoff on
+  transient failures (connection errors, timeouts, 429 and 5xx responses);
+- priorities: interactive calls (chat) are served before queued batch
+  calls (generation, extraction) of the same model, at call granularity,
+  with aging so batch jobs are not starved. Callers tag their calls with
+  llm_priority() or the priority= argument; untagged calls use
+  LLM_GATEWAY_DEFAULT_PRIORITY;
+- single-flight coalescing: concurrent identical non-streamed requests
+  (same method, model, prompt/messages and options), e.g. the same
+  stakeholder prompt sent by two Streamlit sessions, share one upstream
+  generation and every caller receives its result. A caller joining with a
+  higher priority promotes the shared request, so a chat call never waits
+  behind the batch queue it joined. A caller cancelling only stops waiting;
+  the generation is cancelled once no caller waits for it.
+  Completed results are not kept; that is the job of the LLM response cache.
+"""
+
+import copy
+import json
+import asyncio
+import hashlib
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from config import config
+from .adaptive_concurrency import AdaptiveConcurrencyLimiter
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+OVERLOAD_STATUS_CODES = {408, 429, 503, 504}
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+_STREAM_END = object()
+
+_request_priority: ContextVar[Optional[str]] = ContextVar("llm_request_priority", default=None)
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """
+    Tag the LLM calls made in this context with a priority
+
+        with llm_priority("interactive"):
+            rag_system.query_documents(question)
+
+    The tag follows the current thread / asyncio task; work handed to other
+    threads (ThreadPoolExecutor) keeps the default priority unless it runs in
+    a copy of the context (contextvars.copy_context().run).
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {priority} (expected one of {sorted(PRIORITIES)})")
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether a failed call may succeed when retried (transport errors, overload)"""
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and status_code > 0:
+        return status_code in RETRYABLE_STATUS_CODES
+
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether a failure signals an overloaded server (timeout, 429/503/504)"""
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and status_code > 0:
+        return status_code in OVERLOAD_STATUS_CODES
+
+    try:
+        import httpx
+        if isinstance(error, httpx.TimeoutException):
+            return True
+    except ImportError:
+        pass
+    return isinstance(error, TimeoutError)
+
+
+def _output_tokens(response: Any) -> Optional[int]:
+    """Generated token count reported by an Ollama response, if any"""
+    try:
+        tokens = response.get("eval_count")
+    except Exception:
+        return None
+    return tokens if isinstance(tokens, int) and tokens > 0 else None
+
+
+class _Flight:
+    """An upstream request shared by the callers waiting for it"""
+
+    __slots__ = ("key", "priority", "task", "waiters")
+
+    def __init__(self, key: str, priority: int):
+        self.key = key
+        self.priority = priority  # Plus haute priorité parmi les appelants
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+
+
+class LLMGateway:
+    """Pooled, concurrency-limited and retrying access to the Ollama server"""
+
+    def __init__(self,
+                 host: Optional[str] = None,
+                 timeout_seconds: Optional[float] = None,
+                 connect_timeout_seconds: Optional[float] = None,
+                 max_connections: Optional[int] = None,
+                 keepalive_seconds: Optional[float] = None,
+                 default_concurrency: Optional[int] = None,
+                 model_concurrency: Optional[Dict[str, int]] = None,
+                 max_retries: Optional[int] = None,
+                 retry_base_delay: Optional[float] = None,
+                 single_flight: Optional[bool] = None,
+                 adaptive_concurrency: Optional[bool] = None,
+                 max_concurrency: Optional[int] = None,
+                 default_priority: Optional[str] = None,
+                 client=None):
+        """
+        Args:
+            host: Ollama server URL (defaults to config.OLLAMA_BASE_URL)
+            timeout_seconds: Read timeout of a request (a whole non-streamed generation)
+            connect_timeout_seconds: Timeout for opening a connection
+            max_connections: Size of the keep-alive connection pool
+            keepalive_seconds: Idle time after which a pooled connection is closed
+            default_concurrency: Starting limit of requests in flight per model
+            model_concurrency: Per-model overrides of default_concurrency
+            adaptive_concurrency: Adapt the limits with AIMD (fixed limits when False)
+            max_concurrency: Upper bound of an adaptive limit
+            default_priority: Priority of untagged calls ("interactive" or "batch")
+            max_retries: Attempts per request on transient failures
+            retry_base_delay: Backoff base; attempt n waits up to base * 2**(n-1) seconds
+            single_flight: Coalesce concurrent identical non-streamed requests
+            client: ollama.AsyncClient-compatible client (built from the pool settings if omitted)
+        """
+        self.host = host or config.OLLAMA_BASE_URL
+        self.timeout_seconds = timeout_seconds or config.LLM_GATEWAY_TIMEOUT_SECONDS
+        self.connect_timeout_seconds = connect_timeout_seconds or config.LLM_GATEWAY_CONNECT_TIMEOUT_SECONDS
+        self.max_connections = max(1, max_connections or config.LLM_GATEWAY_MAX_CONNECTIONS)
+        self.keepalive_seconds = keepalive_seconds or config.LLM_GATEWAY_KEEPALIVE_SECONDS
+        self.default_concurrency = max(1, default_concurrency or config.LLM_GATEWAY_DEFAULT_CONCURRENCY)
+        self.model_concurrency = dict(config.LLM_GATEWAY_MODEL_CONCURRENCY if model_concurrency is None else model_concurrency)
+        self.max_retries = max(1, max_retries or config.LLM_GATEWAY_MAX_RETRIES)
+        self.retry_base_delay = config.LLM_GATEWAY_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        self.single_flight = config.LLM_GATEWAY_SINGLE_FLIGHT if single_flight is None else single_flight
+        self.adaptive_concurrency = config.LLM_GATEWAY_ADAPTIVE_CONCURRENCY if adaptive_concurrency is None else adaptive_concurrency
+        self.max_concurrency = max(1, max_concurrency or config.LLM_GATEWAY_MAX_CONCURRENCY)
+        self.default_priority = default_priority or config.LLM_GATEWAY_DEFAULT_PRIORITY
+        self.logger = logging.getLogger(__name__)
+
+        self._client = client
+        self._limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+        self._stats: Dict[str, int] = {"requests": 0, "upstream_requests": 0, "coalesced": 0, "retries": 0, "failures": 0}
+        self._coalesced_by_model: Dict[str, int] = {}
+        self._flights: Dict[str, _Flight] = {}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+
+    # ===== API ASYNCHRONE =====
+
+    async def agenerate(self, model: str, prompt: str, priority: Optional[str] = None, **kwargs) -> Any:
+        """Non-streamed completion (ollama generate)"""
+        return await self._submit(self._call("generate", model, self._priority(priority), prompt=prompt, stream=False, **kwargs))
+
+    async def achat(self, model: str, messages: List[Dict[str, Any]], priority: Optional[str] = None, **kwargs) -> Any:
+        """Non-streamed chat completion"""
+        return await self._submit(self._call("chat", model, self._priority(priority), messages=messages, stream=False, **kwargs))
+
+    async def achat_stream(self, model: str, messages: List[Dict[str, Any]], priority: Optional[str] = None,
+                           **kwargs) -> AsyncIterator[Any]:
+        """Streamed chat completion, yielding the Ollama chunks"""
+        async for chunk in self._astream("chat", model, self._priority(priority), messages=messages, **kwargs):
+            yield chunk
+
+    async def agenerate_stream(self, model: str, prompt: str, priority: Optional[str] = None, **kwargs) -> AsyncIterator[Any]:
+        """Streamed completion, yielding the Ollama chunks"""
+        async for chunk in self._astream("generate", model, self._priority(priority), prompt=prompt, **kwargs):
+            yield chunk
+
+    async def aembed(self, model: str, input: List[str], priority: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Embeddings of several texts in one request: {"embeddings": [...]}"""
+        return await self._submit(self._embed(model, list(input), self._priority(priority), **kwargs))
+
+    # ===== API SYNCHRONE (signatures ollama.Client, plus priority=) =====
+
+    def generate(self, model: str = "", prompt: str = "", stream: bool = False, priority: Optional[str] = None, **kwargs) -> Any:
+        if stream:
+            return self._stream_sync("generate", model, self._priority(priority), prompt=prompt, **kwargs)
+        return self._run(self._call("generate", model, self._priority(priority), prompt=prompt, stream=False, **kwargs))
+
+    def chat(self, model: str = "", messages: Optional[List[Dict[str, Any]]] = None, stream: bool = False,
+             priority: Optional[str] = None, **kwargs) -> Any:
+        if stream:
+            return self._stream_sync("chat", model, self._priority(priority), messages=messages or [], **kwargs)
+        return self._run(self._call("chat", model, self._priority(priority), messages=messages or [], stream=False, **kwargs))
+
+    def embed(self, model: str = "", input: Any = "", priority: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        texts = [input] if isinstance(input, str) else list(input)
+        return self._run(self._embed(model, texts, self._priority(priority), **kwargs))
+
+    def embeddings(self, model: str = "", prompt: str = "", priority: Optional[str] = None, **kwargs) -> Any:
+        return self._run(self._call("embeddings", model, self._priority(priority), prompt=prompt, **kwargs))
+
+    # ===== SUIVI =====
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Request counters and per-model concurrency
+
+        "requests" counts calls made to the gateway, "upstream_requests" the
+        ones actually sent to Ollama; "coalesced" calls shared another
+        caller's in-flight generation. "concurrency" holds, per model, the
+        current limit, the requests in flight and queued, and the p95 latency.
+        """
+        if threading.current_thread() is self._thread or not self._loop.is_running():
+            return self._collect_stats()
+        # Les limiteurs vivent sur la boucle de la passerelle : les lire depuis celle-ci
+        return asyncio.run_coroutine_threadsafe(self._stats_on_loop(), self._loop).result()
+
+    async def _stats_on_loop(self) -> Dict[str, Any]:
+        return self._collect_stats()
+
+    def _collect_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "coalesced_by_model": dict(self._coalesced_by_model),
+            "concurrency": {model: limiter.snapshot() for model, limiter in list(self._limiters.items())}
+        }
+
+    def concurrency_limit(self, model: str) -> int:
+        """Current concurrency limit of a model"""
+        limiter = self._limiters.get(model)
+        if limiter is not None:
+            return int(limiter.limit)
+        return max(1, self.model_concurrency.get(model, self.default_concurrency))
+
+    def close(self):
+        """Close the pooled connections and stop the gateway loop"""
+        if self._client is not None and hasattr(self._client, "_client"):
+            try:
+                self._run(self._client._client.aclose())
+            except Exception as e:
+                self.logger.warning(f"Fermeture du pool de connexions Ollama : {str(e)}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    # ===== EXÉCUTION SUR LA BOUCLE DE LA PASSERELLE =====
+
+    def _priority(self, priority: Optional[str]) -> int:
+        """Numeric priority of a call: explicit argument, llm_priority() context, then the default"""
+        name = priority or _request_priority.get() or self.default_priority
+        if name not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority: {name} (expected one of {sorted(PRIORITIES)})")
+        return PRIORITIES[name]
+
+    def _run(self, coroutine):
+        """Run a coroutine on the gateway loop and wait for its result (sync callers)"""
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("Sync LLMGateway methods cannot be called from the gateway loop; use the async API")
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _submit(self, coroutine):
+        """Await a coroutine on the gateway loop from any event loop"""
+        if asyncio.get_running_loop() is self._loop:
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self._loop))
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            import ollama
+            self._client = ollama.AsyncClient(
+                host=self.host,
+                timeout=httpx.Timeout(self.timeout_seconds, connect=self.connect_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_seconds
+                )
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def _slot(self, model: str, priority: int, tag: Optional[str] = None):
+        """
+        Hold one of the model's concurrency slots (tag: flight key, for promotion)
+
+        Yields a dict in which the caller stores the generated token count
+        ("tokens"); the latency and outcome feed the model's adaptive limit.
+        """
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limiter = self._limiters[model] = AdaptiveConcurrencyLimiter(
+                self.concurrency_limit(model),
+                max_limit=self.max_concurrency,
+                adaptive=self.adaptive_concurrency,
+                latency_tolerance=config.LLM_GATEWAY_LATENCY_TOLERANCE,
+                backoff_ratio=config.LLM_GATEWAY_BACKOFF_RATIO,
+                aging_seconds=config.LLM_GATEWAY_PRIORITY_AGING_SECONDS
+            )
+
+        await limiter.acquire(priority, tag)
+        started = time.monotonic()
+        outcome: Dict[str, Any] = {"tokens": None}
+        try:
+            yield outcome
+        except Exception as e:
+            if is_overload_error(e):
+                limiter.on_overload(started)
+                self.logger.info(f"Surcharge Ollama ({model}) : limite de concurrence réduite à {int(limiter.limit)}")
+            raise
+        else:
+            limiter.on_success(time.monotonic() - started, outcome["tokens"], started)
+        finally:
+            limiter.release()
+
+    async def _call(self, method: str, model: str, priority: int, **kwargs) -> Any:
+        """One non-streamed request, joining an identical one already in flight"""
+        self._stats["requests"] += 1
+        if not self.single_flight:
+            return await self._request(method, model, priority, **kwargs)
+
+        key = self._flight_key(method, model, kwargs)
+        flight = self._flights.get(key)
+        joined = flight is not None
+        if joined:
+            self._stats["coalesced"] += 1
+            self._coalesced_by_model[model] = self._coalesced_by_model.get(model, 0) + 1
+            if priority < flight.priority:
+                # Appelant plus prioritaire : la requête partagée ne doit pas attendre à la priorité du lot
+                flight.priority = priority
+                limiter = self._limiters.get(model)
+                if limiter is not None:
+                    limiter.promote(key, priority)
+        else:
+            # La requête amont appartient au vol, pas au premier appelant : son annulation ne touche pas les autres
+            flight = self._flights[key] = _Flight(key, priority)
+            flight.task = asyncio.get_running_loop().create_task(self._request(method, model, priority, flight, **kwargs))
+            flight.task.add_done_callback(lambda _: self._end_flight(key, flight))
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Plus personne n'attend la réponse : abandonner la génération
+                self._end_flight(key, flight)
+                flight.task.cancel()
+        return copy.deepcopy(result) if joined else result
+
+    def _end_flight(self, key: str, flight: "_Flight"):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    @staticmethod
+    def _flight_key(method: str, model: str, kwargs: Dict[str, Any]) -> str:
+        payload = json.dumps([method, model, kwargs], sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _request(self, method: str, model: str, priority: int, flight: Optional[_Flight] = None, **kwargs) -> Any:
+        """One upstream request, retried with jittered exponential backoff on transient failures"""
+        client = self._get_client()
+        self._stats["upstream_requests"] += 1
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                # Priorité relue à chaque tentative : un appelant plus prioritaire a pu rejoindre le vol
+                slot = self._slot(model, flight.priority, flight.key) if flight else self._slot(model, priority)
+                async with slot as outcome:
+                    response = await getattr(client, method)(model=model, **kwargs)
+                    outcome["tokens"] = _output_tokens(response)
+                    return response
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    self._stats["failures"] += 1
+                    raise
+                self._stats["retries"] += 1
+                delay = self._backoff_delay(attempt)
+                self.logger.warning(
+                    f"Appel {method} ({model}) en échec, tentative {attempt}/{self.max_retries}, "
+                    f"nouvel essai dans {delay:.2f}s : {str(e)}"
+                )
+                await asyncio.sleep(delay)
+
+    async def _embed(self, model: str, texts: List[str], priority: int, **kwargs) -> Dict[str, Any]:
+        client = self._get_client()
+        if hasattr(client, "embed"):
+            return await self._call("embed", model, priority, input=texts, **kwargs)
+
+        # Anciennes versions du client : un appel par texte, en parallèle dans la limite du modèle
+        responses = await asyncio.gather(*(self._call("embeddings", model, priority, prompt=text, **kwargs) for text in texts))
+        return {"embeddings": [response["embedding"] for response in responses]}
+
+    async def _stream(self, method: str, model: str, priority: int, emit: Callable[[Any], None], **kwargs):
+        """Forward the chunks of a streamed request to emit(), ending with _STREAM_END or the error"""
+        self._stats["requests"] += 1
+        try:
+            client = self._get_client()
+        except Exception as e:
+            # Le consommateur attend un élément : lui transmettre l'erreur plutôt que le bloquer
+            self._stats["failures"] += 1
+            emit(e)
+            return
+        self._stats["upstream_requests"] += 1
+        for attempt in range(1, self.max_retries + 1):
+            started = False
+            try:
+                async with self._slot(model, priority) as outcome:
+                    async for chunk in await getattr(client, method)(model=model, stream=True, **kwargs):
+                        started = True
+                        emit(chunk)
+                        outcome["tokens"] = _output_tokens(chunk) or outcome["tokens"]
+                emit(_STREAM_END)
+                return
+            except Exception as e:
+                # Un flux déjà entamé n'est pas rejoué : l'appelant a reçu une partie de la réponse
+                if started or attempt >= self.max_retries or not is_retryable_error(e):
+                    self._stats["failures"] += 1
+                    emit(e)
+                    return
+                self._stats["retries"] += 1
+                await asyncio.sleep(self._backoff_delay(attempt))
+
+    async def _astream(self, method: str, model: str, priority: int, **kwargs) -> AsyncIterator[Any]:
+        consumer_loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        def emit(item):
+            consumer_loop.call_soon_threadsafe(chunks.put_nowait, item)
+
+        producer = asyncio.run_coroutine_threadsafe(self._stream(method, model, priority, emit, **kwargs), self._loop)
+        try:
+            while True:
+                item = await chunks.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+
+    def _stream_sync(self, method: str, model: str, priority: int, **kwargs) -> Iterator[Any]:
+        chunks: queue.Queue = queue.Queue()
+        producer = asyncio.run_coroutine_threadsafe(self._stream(method, model, priority, chunks.put, **kwargs), self._loop)
+
+        def iterate():
+            try:
+                while True:
+                    item = chunks.get()
+                    if item is _STREAM_END:
+                        return
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item
+            finally:
+                producer.cancel()
+
+        return iterate()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # "Full jitter" : évite que les appels en échec simultané réessaient ensemble
+        return random.uniform(0, self.retry_base_delay * (2 ** (attempt - 1)))
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide shared gateway (one connection pool for every component)"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -1,13 +1,16 @@
-import sqlite3
 import json
 import hashlib
 import os
+from array import array
 from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 import logging
+import re
 from dataclasses import dataclass, asdict
 
+from .sqlite_connection_manager import SQLiteConnectionManager
+
 @dataclass
 class ProcessedDocument:
     """Represents a processed document with its metadata"""
@@ -35,12 +38,39 @@ class Project:
     requirements_count: int = 0
     status: str = "active"
 
+# Mots vides ignorés par la recherche plein texte (sans pouvoir discriminant en BM25)
+SEARCH_STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is', 'it', 'its',
+    'of', 'on', 'or', 'that', 'the', 'to', 'was', 'were', 'will', 'with', 'what', 'when', 'where',
+    'who', 'why', 'how', 'le', 'la', 'les', 'de', 'des', 'du', 'un', 'une', 'et', 'ou', 'en'
+}
+
+def _encode_checkpoint_value(value: Any) -> Any:
+    """json.dumps default: tag dates so that loading restores their type"""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    return str(value)
+
+def _decode_checkpoint_object(obj: Dict[str, Any]) -> Any:
+    """json.loads object_hook: inverse of _encode_checkpoint_value"""
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+    return obj
+
 class PersistenceService:
     """Persistence service to manage projects, documents and chunks"""
     
     def __init__(self, db_path: str = "./data/safe_mbse.db"):
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
+        # Créer le répertoire avant l'ouverture de la première connexion
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection_manager = SQLiteConnectionManager(db_path)
         self._ensure_db_structure()
         
     def _ensure_db_structure(self):
@@ -49,7 +79,7 @@ class PersistenceService:
             # Créer le répertoire si nécessaire
             Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Table des projets améliorée
@@ -63,7 +93,8 @@ class PersistenceService:
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         documents_count INTEGER DEFAULT 0,
                         requirements_count INTEGER DEFAULT 0,
-                        status TEXT DEFAULT 'active'
+                        status TEXT DEFAULT 'active',
+                        content_version INTEGER DEFAULT 0
                     )
                 """)
                 
@@ -164,6 +195,31 @@ class PersistenceService:
                     )
                 """)
                 
+                # Cache d'embeddings par modèle et contenu (NOUVELLE)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS embedding_cache (
+                        embedding_model TEXT NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        dimension INTEGER NOT NULL,
+                        vector BLOB NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (embedding_model, content_hash)
+                    )
+                """)
+                
+                # Points de reprise des analyses ARCADIA structurées (NOUVELLE)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS analysis_checkpoints (
+                        analysis_id TEXT NOT NULL,
+                        phase TEXT NOT NULL,
+                        input_fingerprint TEXT NOT NULL,
+                        output_data TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (analysis_id, phase)
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON analysis_checkpoints(created_at)")
+                
                 # Index pour optimiser les performances
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_documents_project ON processed_documents(project_id)")
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_documents_hash ON processed_documents(file_hash)")
@@ -176,6 +232,10 @@ class PersistenceService:
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_project ON project_sessions(project_id)")
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_stakeholders_project ON stakeholders(project_id)")
                 
+                self._ensure_project_counters(cursor)
+                self._ensure_chunk_search_index(cursor)
+                self._ensure_content_version(cursor)
+                
                 conn.commit()
                 self.logger.info("Structure de base de données initialisée avec succès")
                 
@@ -183,12 +243,114 @@ class PersistenceService:
             self.logger.error(f"Erreur lors de l'initialisation de la base de données : {str(e)}")
             raise
     
+    def _ensure_project_counters(self, cursor):
+        """
+        Maintenir projects.documents_count / requirements_count par triggers
+        
+        Les compteurs sont recalculés une seule fois, à la création des triggers,
+        pour les bases existantes ; ensuite chaque écriture les tient à jour.
+        """
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_count_%'")
+        if cursor.fetchone()[0] == 6:
+            return
+        
+        for table, counter in (("processed_documents", "documents_count"), ("requirements", "requirements_count")):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_count_{table}_insert AFTER INSERT ON {table}
+                BEGIN
+                    UPDATE projects SET {counter} = {counter} + 1 WHERE id = NEW.project_id;
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_count_{table}_delete AFTER DELETE ON {table}
+                BEGIN
+                    UPDATE projects SET {counter} = {counter} - 1 WHERE id = OLD.project_id;
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_count_{table}_move AFTER UPDATE OF project_id ON {table}
+                WHEN OLD.project_id IS NOT NEW.project_id
+                BEGIN
+                    UPDATE projects SET {counter} = {counter} - 1 WHERE id = OLD.project_id;
+                    UPDATE projects SET {counter} = {counter} + 1 WHERE id = NEW.project_id;
+                END
+            """)
+        
+        cursor.execute("""
+            UPDATE projects SET
+                documents_count = (SELECT COUNT(*) FROM processed_documents pd WHERE pd.project_id = projects.id),
+                requirements_count = (SELECT COUNT(*) FROM requirements r WHERE r.project_id = projects.id)
+        """)
+        self.logger.info("Compteurs de projets matérialisés")
+    
+    def _ensure_chunk_search_index(self, cursor):
+        """
+        Index plein texte FTS5 (contenu externe) sur document_chunks.content
+        
+        Les triggers gardent l'index synchronisé avec chaque insertion, mise à
+        jour ou suppression de chunk ; l'index est reconstruit une seule fois
+        lorsqu'il est créé sur une base existante.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'document_chunks_fts'")
+        if cursor.fetchone() is None:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE document_chunks_fts USING fts5(
+                    content,
+                    content='document_chunks',
+                    content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute("INSERT INTO document_chunks_fts(document_chunks_fts) VALUES ('rebuild')")
+            self.logger.info("Index plein texte des chunks créé")
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_chunks_fts_insert AFTER INSERT ON document_chunks
+            BEGIN
+                INSERT INTO document_chunks_fts(rowid, content) VALUES (NEW.rowid, NEW.content);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_chunks_fts_delete AFTER DELETE ON document_chunks
+            BEGIN
+                INSERT INTO document_chunks_fts(document_chunks_fts, rowid, content) VALUES ('delete', OLD.rowid, OLD.content);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_chunks_fts_update AFTER UPDATE OF content ON document_chunks
+            BEGIN
+                INSERT INTO document_chunks_fts(document_chunks_fts, rowid, content) VALUES ('delete', OLD.rowid, OLD.content);
+                INSERT INTO document_chunks_fts(rowid, content) VALUES (NEW.rowid, NEW.content);
+            END
+        """)
+    
+    def _ensure_content_version(self, cursor):
+        """
+        Maintenir projects.content_version pour invalider les caches de recherche
+        
+        La version est incrémentée une fois par transaction d'écriture de chunks
+        (_bump_content_version), et non par ligne : SQLite n'a pas de trigger
+        par instruction et un trigger par ligne coûte un UPDATE projects par chunk.
+        """
+        cursor.execute("PRAGMA table_info(projects)")
+        if "content_version" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE projects ADD COLUMN content_version INTEGER DEFAULT 0")
+        
+        # Anciennes bases : triggers par ligne remplacés par l'incrément par transaction
+        cursor.execute("DROP TRIGGER IF EXISTS trg_version_chunks_insert")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_version_chunks_delete")
+    
+    @staticmethod
+    def _bump_content_version(cursor, project_id: str):
+        """Incrémenter la version de contenu d'un projet (dans la transaction qui modifie ses chunks)"""
+        cursor.execute("UPDATE projects SET content_version = content_version + 1 WHERE id = ?", (project_id,))
+    
     def create_project(self, name: str, description: str = "", proposal_text: str = "") -> str:
         """Créer un nouveau projet"""
         project_id = f"proj_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(name) % 10000:04d}"
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO projects (id, name, description, proposal_text)
@@ -206,42 +368,34 @@ class PersistenceService:
     def get_all_projects(self) -> List[Project]:
         """Récupérer tous les projets"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT p.id, p.name, p.description, p.proposal_text, p.created_at, p.updated_at,
-                           p.documents_count, p.requirements_count, p.status,
-                           COUNT(DISTINCT pd.id) as docs_count,
-                           COUNT(DISTINCT r.id) as reqs_count
-                    FROM projects p
-                    LEFT JOIN processed_documents pd ON p.id = pd.project_id
-                    LEFT JOIN requirements r ON p.id = r.project_id
-                    WHERE p.status = 'active'
-                    GROUP BY p.id, p.name, p.description, p.proposal_text, p.created_at, p.updated_at,
-                             p.documents_count, p.requirements_count, p.status
-                    ORDER BY p.updated_at DESC
+                    SELECT id, name, description, proposal_text, created_at, updated_at,
+                           documents_count, requirements_count, status
+                    FROM projects
+                    WHERE status = 'active'
+                    ORDER BY updated_at DESC
                 """)
+                return [self._row_to_project(row) for row in cursor.fetchall()]
                 
-                projects = []
-                for row in cursor.fetchall():
-                    # Safe access with bounds checking
-                    if len(row) < 11:
-                        self.logger.warning(f"Incomplete project record found: {len(row)} columns instead of 11")
-                        continue
-                        
-                    projects.append(Project(
-                        id=row[0] if row[0] else "",
-                        name=row[1] if row[1] else "",
-                        description=row[2] if row[2] else "",
-                        proposal_text=row[3] if row[3] else "",
-                        created_at=datetime.fromisoformat(row[4]) if row[4] else datetime.now(),
-                        updated_at=datetime.fromisoformat(row[5]) if row[5] else datetime.now(),
-                        documents_count=row[9] if len(row) > 9 and row[9] is not None else 0,
-                        requirements_count=row[10] if len(row) > 10 and row[10] is not None else 0,
-                        status=row[8] if len(row) > 8 and row[8] else "active"
-                    ))
-                
-                return projects
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la récupération des projets : {str(e)}")
+            return []
+    
+    def list_projects(self) -> List[Project]:
+        """Lister les projets actifs sans charger proposal_text (affichage de la barre latérale)"""
+        try:
+            with self.connection_manager.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, name, description, '', created_at, updated_at,
+                           documents_count, requirements_count, status
+                    FROM projects
+                    WHERE status = 'active'
+                    ORDER BY updated_at DESC
+                """)
+                return [self._row_to_project(row) for row in cursor.fetchall()]
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des projets : {str(e)}")
@@ -250,45 +404,49 @@ class PersistenceService:
     def get_project(self, project_id: str) -> Optional[Project]:
         """Récupérer un projet par son ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT p.id, p.name, p.description, p.proposal_text, p.created_at, p.updated_at,
-                           p.documents_count, p.requirements_count, p.status,
-                           COUNT(DISTINCT pd.id) as docs_count,
-                           COUNT(DISTINCT r.id) as reqs_count
-                    FROM projects p
-                    LEFT JOIN processed_documents pd ON p.id = pd.project_id
-                    LEFT JOIN requirements r ON p.id = r.project_id
-                    WHERE p.id = ?
-                    GROUP BY p.id, p.name, p.description, p.proposal_text, p.created_at, p.updated_at,
-                             p.documents_count, p.requirements_count, p.status
+                    SELECT id, name, description, proposal_text, created_at, updated_at,
+                           documents_count, requirements_count, status
+                    FROM projects
+                    WHERE id = ?
                 """, (project_id,))
                 
                 row = cursor.fetchone()
-                if row:
-                    # Safe access with bounds checking
-                    if len(row) < 11:
-                        self.logger.warning(f"Incomplete project record found: {len(row)} columns instead of 11")
-                        return None
-                        
-                    return Project(
-                        id=row[0] if row[0] else "",
-                        name=row[1] if row[1] else "",
-                        description=row[2] if row[2] else "",
-                        proposal_text=row[3] if row[3] else "",
-                        created_at=datetime.fromisoformat(row[4]) if row[4] else datetime.now(),
-                        updated_at=datetime.fromisoformat(row[5]) if row[5] else datetime.now(),
-                        documents_count=row[9] if len(row) > 9 and row[9] is not None else 0,
-                        requirements_count=row[10] if len(row) > 10 and row[10] is not None else 0,
-                        status=row[8] if len(row) > 8 and row[8] else "active"
-                    )
-                return None
+                return self._row_to_project(row) if row else None
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération du projet {project_id} : {str(e)}")
             return None
     
+    @staticmethod
+    def _row_to_project(row: Tuple) -> Project:
+        """Construire un Project à partir d'une ligne (id, name, description, proposal_text,
+        created_at, updated_at, documents_count, requirements_count, status)"""
+        return Project(
+            id=row[0] if row[0] else "",
+            name=row[1] if row[1] else "",
+            description=row[2] if row[2] else "",
+            proposal_text=row[3] if row[3] else "",
+            created_at=datetime.fromisoformat(row[4]) if row[4] else datetime.now(),
+            updated_at=datetime.fromisoformat(row[5]) if row[5] else datetime.now(),
+            documents_count=row[6] if row[6] is not None else 0,
+            requirements_count=row[7] if row[7] is not None else 0,
+            status=row[8] if row[8] else "active"
+        )
+    
+    def get_project_content_version(self, project_id: str) -> Optional[int]:
+        """Version du contenu indexé d'un projet (change à chaque ajout/suppression de chunk)"""
+        try:
+            with self.connection_manager.connection() as conn:
+                row = conn.execute("SELECT content_version FROM projects WHERE id = ?", (project_id,)).fetchone()
+                return row[0] if row else None
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la lecture de la version du projet : {str(e)}")
+            return None
+    
     def calculate_file_hash(self, file_path: str) -> str:
         """Calculer le hash SHA-256 d'un fichier"""
         try:
@@ -308,7 +466,7 @@ class PersistenceService:
             if not file_hash:
                 return False, None
                 
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT id, processing_status 
@@ -333,7 +491,7 @@ class PersistenceService:
             filename = os.path.basename(file_path)
             doc_id = f"doc_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(file_path) % 10000:04d}"
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO processed_documents 
@@ -349,27 +507,71 @@ class PersistenceService:
             self.logger.error(f"Erreur lors de l'enregistrement du document : {str(e)}")
             raise
     
-    def save_document_chunks(self, document_id: str, project_id: str, chunks: List[Dict[str, Any]]) -> bool:
-        """Sauvegarder les chunks d'un document"""
+    def save_document_chunks(self, document_id: str, project_id: str, chunks: List[Dict[str, Any]],
+                             append_only: bool = False) -> bool:
+        """
+        Sauvegarder les chunks d'un document en une seule transaction
+        
+        Args:
+            append_only: Document nouvellement enregistré, sans chunks existants :
+                la suppression préalable est inutile et ignorée
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            # Paramètres préparés hors transaction (hash et JSON)
+            rows = [
+                (
+                    f"chunk_{document_id}_{i:04d}",
+                    document_id,
+                    project_id,
+                    i,
+                    chunk.get("content", ""),
+                    self.compute_content_hash(chunk.get("content", "")),
+                    json.dumps(chunk.get("metadata", {}))
+                )
+                for i, chunk in enumerate(chunks)
+            ]
+            
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
-                # Supprimer les anciens chunks
-                cursor.execute("DELETE FROM document_chunks WHERE document_id = ?", (document_id,))
+                changes_before = conn.total_changes
+                changed_projects = {project_id}
                 
-                # Insérer les nouveaux chunks
-                for i, chunk in enumerate(chunks):
-                    chunk_id = f"chunk_{document_id}_{i:04d}"
-                    content = chunk.get("content", "")
-                    content_hash = hashlib.sha256(content.encode()).hexdigest()
-                    metadata = json.dumps(chunk.get("metadata", {}))
+                if append_only:
+                    cursor.executemany("""
+                        INSERT INTO document_chunks 
+                        (id, document_id, project_id, chunk_index, content, content_hash, metadata)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, rows)
+                else:
+                    cursor.execute("SELECT DISTINCT project_id FROM document_chunks WHERE document_id = ?", (document_id,))
+                    changed_projects.update(row[0] for row in cursor.fetchall())
                     
-                    cursor.execute("""
+                    # Réécriture en place : les chunks inchangés ne sont pas touchés, ce qui
+                    # évite de retokeniser leur contenu dans l'index plein texte
+                    cursor.executemany("""
                         INSERT INTO document_chunks 
                         (id, document_id, project_id, chunk_index, content, content_hash, metadata)
                         VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (chunk_id, document_id, project_id, i, content, content_hash, metadata))
+                        ON CONFLICT(id) DO UPDATE SET
+                            project_id = excluded.project_id,
+                            content = excluded.content,
+                            content_hash = excluded.content_hash,
+                            embedding_vector = NULL,
+                            metadata = excluded.metadata
+                        WHERE content_hash IS NOT excluded.content_hash
+                           OR metadata IS NOT excluded.metadata
+                           OR project_id IS NOT excluded.project_id
+                    """, rows)
+                    
+                    # Supprimer les anciens chunks au-delà du nouveau nombre
+                    cursor.execute("DELETE FROM document_chunks WHERE document_id = ? AND chunk_index >= ?",
+                                   (document_id, len(rows)))
+                
+                # Une seule nouvelle version par projet modifié, quel que soit le nombre de chunks
+                if conn.total_changes != changes_before:
+                    for changed_project in changed_projects:
+                        self._bump_content_version(cursor, changed_project)
                 
                 # Mettre à jour le statut du document
                 cursor.execute("""
@@ -386,10 +588,71 @@ class PersistenceService:
             self.logger.error(f"Erreur lors de la sauvegarde des chunks : {str(e)}")
             return False
     
+    @staticmethod
+    def compute_content_hash(content: str) -> str:
+        """Calculer le hash SHA-256 du contenu d'un chunk"""
+        return hashlib.sha256(content.encode()).hexdigest()
+    
+    def get_cached_embeddings(self, embedding_model: str, content_hashes: List[str]) -> Dict[str, List[float]]:
+        """Récupérer les embeddings déjà calculés pour ces contenus"""
+        cached: Dict[str, List[float]] = {}
+        unique_hashes = list(dict.fromkeys(content_hashes))
+        if not unique_hashes:
+            return cached
+        
+        try:
+            with self.connection_manager.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Requêtes par tranches pour rester sous la limite de paramètres SQLite
+                for start in range(0, len(unique_hashes), 500):
+                    batch = unique_hashes[start:start + 500]
+                    placeholders = ", ".join("?" for _ in batch)
+                    cursor.execute(f"""
+                        SELECT content_hash, vector
+                        FROM embedding_cache
+                        WHERE embedding_model = ? AND content_hash IN ({placeholders})
+                    """, (embedding_model, *batch))
+                    
+                    for content_hash, blob in cursor.fetchall():
+                        vector = array('f')
+                        vector.frombytes(blob)
+                        cached[content_hash] = vector.tolist()
+                
+                return cached
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la lecture du cache d'embeddings : {str(e)}")
+            return {}
+    
+    def save_cached_embeddings(self, embedding_model: str, embeddings: Dict[str, List[float]]) -> bool:
+        """Sauvegarder des embeddings (float32 compacts) indexés par hash de contenu"""
+        if not embeddings:
+            return True
+        
+        try:
+            rows = [
+                (embedding_model, content_hash, len(vector), array('f', vector).tobytes())
+                for content_hash, vector in embeddings.items()
+            ]
+            
+            with self.connection_manager.connection() as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO embedding_cache
+                    (embedding_model, content_hash, dimension, vector)
+                    VALUES (?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+                return True
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la sauvegarde du cache d'embeddings : {str(e)}")
+            return False
+    
     def get_project_chunks(self, project_id: str) -> List[Dict[str, Any]]:
         """Récupérer tous les chunks d'un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT dc.content, dc.metadata, pd.filename
@@ -415,10 +678,58 @@ class PersistenceService:
             self.logger.error(f"Erreur lors de la récupération des chunks du projet : {str(e)}")
             return []
     
+    def search_chunks(self, project_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Recherche plein texte des chunks d'un projet, classés par BM25
+        
+        Les termes de la requête sont combinés en OR ; le score renvoyé est
+        l'opposé de bm25() (plus élevé = plus pertinent).
+        """
+        terms = [term for term in dict.fromkeys(re.findall(r"\w+", query.lower()))
+                 if term not in SEARCH_STOP_WORDS]
+        if not terms:
+            return []
+        
+        match_expression = " OR ".join(f'"{term}"' for term in terms)
+        
+        try:
+            with self.connection_manager.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT dc.id, dc.document_id, dc.chunk_index, dc.content, dc.metadata, pd.filename,
+                           bm25(document_chunks_fts) AS rank
+                    FROM document_chunks_fts
+                    JOIN document_chunks dc ON dc.rowid = document_chunks_fts.rowid
+                    JOIN processed_documents pd ON dc.document_id = pd.id
+                    WHERE document_chunks_fts MATCH ? AND dc.project_id = ?
+                    ORDER BY rank
+                    LIMIT ?
+                """, (match_expression, project_id, limit))
+                
+                chunks = []
+                for row in cursor.fetchall():
+                    metadata = json.loads(row[4]) if row[4] else {}
+                    metadata["source_filename"] = row[5]
+                    
+                    chunks.append({
+                        "id": row[0],
+                        "document_id": row[1],
+                        "chunk_index": row[2],
+                        "content": row[3],
+                        "metadata": metadata,
+                        "score": -row[6]
+                    })
+                
+                return chunks
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la recherche plein texte des chunks : {str(e)}")
+            return []
+    
     def get_document_chunks(self, document_id: str) -> List[Dict[str, Any]]:
         """Récupérer tous les chunks d'un document spécifique"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT dc.content, dc.metadata, pd.filename
@@ -447,7 +758,7 @@ class PersistenceService:
     def get_project_documents(self, project_id: str) -> List[ProcessedDocument]:
         """Récupérer tous les documents d'un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT id, filename, file_path, file_hash, file_size, processed_at,
@@ -483,70 +794,94 @@ class PersistenceService:
             self.logger.error(f"Erreur lors de la récupération des documents : {str(e)}")
             return []
     
-    def save_project_requirements(self, project_id: str, requirements: Dict[str, Any]) -> bool:
-        """Sauvegarder les requirements générés pour un projet"""
+    def save_project_requirements(self, project_id: str, requirements: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Sauvegarder les requirements générés pour un projet (upsert ensembliste)
+        
+        Toutes les phases et tous les types sont écrits en un seul lot
+        INSERT ... ON CONFLICT DO UPDATE ; les lignes identiques ne sont pas réécrites.
+        
+        Returns:
+            Compteurs inserted / updated / unchanged / conflicts (identifiant appartenant
+            à un autre projet), ou un dictionnaire vide en cas d'erreur
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            # Paramètres préparés pour toutes les phases et tous les types
+            rows = []
+            for phase, phase_reqs in requirements.get("requirements", {}).items():
+                for req_type, reqs in phase_reqs.items():
+                    if isinstance(reqs, list):
+                        for req in reqs:
+                            rows.append((
+                                req.get("id", f"req_{hash(str(req)) % 100000:05d}"),
+                                phase, req_type,
+                                req.get("title", ""),
+                                req.get("description", ""),
+                                req.get("priority", "SHOULD"),
+                                req.get("verification_method", ""),
+                                req.get("rationale", ""),
+                                project_id
+                            ))
+            
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
-                # Parcourir les requirements par phase et type
-                for phase, phase_reqs in requirements.get("requirements", {}).items():
-                    for req_type, reqs in phase_reqs.items():
-                        if isinstance(reqs, list):
-                            for req in reqs:
-                                req_id = req.get("id", f"req_{hash(str(req)) % 100000:05d}")
-                                
-                                # Vérifier si le requirement existe déjà
-                                cursor.execute("""
-                                    SELECT id FROM requirements 
-                                    WHERE id = ? AND project_id = ?
-                                """, (req_id, project_id))
-                                
-                                if cursor.fetchone():
-                                    # Mettre à jour
-                                    cursor.execute("""
-                                        UPDATE requirements SET
-                                        title = ?, description = ?, priority = ?,
-                                        verification_method = ?, rationale = ?,
-                                        updated_at = CURRENT_TIMESTAMP
-                                        WHERE id = ? AND project_id = ?
-                                    """, (
-                                        req.get("title", ""),
-                                        req.get("description", ""),
-                                        req.get("priority", "SHOULD"),
-                                        req.get("verification_method", ""),
-                                        req.get("rationale", ""),
-                                        req_id, project_id
-                                    ))
-                                else:
-                                    # Insérer nouveau
-                                    cursor.execute("""
-                                        INSERT INTO requirements 
-                                        (id, phase, type, title, description, priority, 
-                                         verification_method, rationale, project_id)
-                                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                    """, (
-                                        req_id, phase, req_type,
-                                        req.get("title", ""),
-                                        req.get("description", ""),
-                                        req.get("priority", "SHOULD"),
-                                        req.get("verification_method", ""),
-                                        req.get("rationale", ""),
-                                        project_id
-                                    ))
+                # Identifiants déjà présents, par projet propriétaire
+                req_ids = list(dict.fromkeys(row[0] for row in rows))
+                owners: Dict[str, str] = {}
+                for start in range(0, len(req_ids), 500):
+                    batch = req_ids[start:start + 500]
+                    cursor.execute(f"""
+                        SELECT id, project_id FROM requirements
+                        WHERE id IN ({",".join("?" * len(batch))})
+                    """, batch)
+                    owners.update(cursor.fetchall())
+                
+                conflicts = [req_id for req_id, owner in owners.items() if owner != project_id]
+                if conflicts:
+                    self.logger.warning(f"{len(conflicts)} requirements appartiennent à un autre projet et sont ignorés")
+                
+                cursor.executemany("""
+                    INSERT INTO requirements 
+                    (id, phase, type, title, description, priority, 
+                     verification_method, rationale, project_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        title = excluded.title,
+                        description = excluded.description,
+                        priority = excluded.priority,
+                        verification_method = excluded.verification_method,
+                        rationale = excluded.rationale,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE requirements.project_id = excluded.project_id
+                      AND (requirements.title IS NOT excluded.title
+                           OR requirements.description IS NOT excluded.description
+                           OR requirements.priority IS NOT excluded.priority
+                           OR requirements.verification_method IS NOT excluded.verification_method
+                           OR requirements.rationale IS NOT excluded.rationale)
+                """, rows)
+                
+                inserted = len([req_id for req_id in req_ids if req_id not in owners])
+                updated = max(cursor.rowcount, 0) - inserted
+                counts = {
+                    "inserted": inserted,
+                    "updated": updated,
+                    "unchanged": len(rows) - inserted - updated - len(conflicts),
+                    "conflicts": len(conflicts)
+                }
                 
                 conn.commit()
-                self.logger.info(f"Requirements sauvegardés pour le projet {project_id}")
-                return True
+                self.logger.info(f"Requirements sauvegardés pour le projet {project_id} : {counts}")
+                return counts
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la sauvegarde des requirements : {str(e)}")
-            return False
+            return {}
     
     def get_project_requirements(self, project_id: str) -> Dict[str, Any]:
         """Récupérer les requirements d'un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 # First check which columns exist in the requirements table
@@ -638,7 +973,7 @@ class PersistenceService:
     def save_arcadia_analysis(self, project_id: str, phase_type: str, analysis_data: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Sauvegarder une analyse ARCADIA pour un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 analysis_id = f"arcadia_{project_id}_{phase_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -666,7 +1001,7 @@ class PersistenceService:
     def get_project_arcadia_analyses(self, project_id: str, phase_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """Récupérer les analyses ARCADIA d'un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 if phase_type:
@@ -707,10 +1042,76 @@ class PersistenceService:
             self.logger.error(f"Erreur lors de la récupération des analyses ARCADIA : {str(e)}")
             return []
     
+    def save_analysis_checkpoint(self, analysis_id: str, phase: str, input_fingerprint: str,
+                                 output_data: Dict[str, Any]) -> bool:
+        """Sauvegarder la sortie d'une phase terminée d'une analyse structurée"""
+        try:
+            with self.connection_manager.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO analysis_checkpoints
+                    (analysis_id, phase, input_fingerprint, output_data)
+                    VALUES (?, ?, ?, ?)
+                """, (analysis_id, phase, input_fingerprint, json.dumps(output_data, default=_encode_checkpoint_value)))
+                conn.commit()
+                self.logger.info(f"Point de reprise sauvegardé : phase {phase} de l'analyse {analysis_id}")
+                return True
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la sauvegarde du point de reprise : {str(e)}")
+            return False
+    
+    def get_analysis_checkpoints(self, analysis_id: str, input_fingerprint: str) -> Dict[str, Dict[str, Any]]:
+        """Récupérer les sorties de phase d'une analyse, uniquement pour des entrées identiques"""
+        try:
+            with self.connection_manager.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT phase, output_data FROM analysis_checkpoints
+                    WHERE analysis_id = ? AND input_fingerprint = ?
+                """, (analysis_id, input_fingerprint))
+                return {
+                    phase: json.loads(output_data, object_hook=_decode_checkpoint_object)
+                    for phase, output_data in cursor.fetchall()
+                }
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la récupération des points de reprise : {str(e)}")
+            return {}
+    
+    def delete_analysis_checkpoints(self, analysis_id: str) -> bool:
+        """Supprimer les points de reprise d'une analyse"""
+        try:
+            with self.connection_manager.connection() as conn:
+                conn.execute("DELETE FROM analysis_checkpoints WHERE analysis_id = ?", (analysis_id,))
+                conn.commit()
+                return True
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la suppression des points de reprise : {str(e)}")
+            return False
+    
+    def delete_expired_analysis_checkpoints(self, max_age_hours: float) -> int:
+        """Supprimer les points de reprise plus anciens que max_age_hours (analyses abandonnées)"""
+        try:
+            with self.connection_manager.connection() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM analysis_checkpoints WHERE created_at < datetime('now', ?)",
+                    (f"-{max_age_hours} hours",)
+                )
+                conn.commit()
+                if cursor.rowcount:
+                    self.logger.info(f"{cursor.rowcount} points de reprise expirés supprimés")
+                return cursor.rowcount
+                
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la purge des points de reprise : {str(e)}")
+            return 0
+    
     def save_stakeholders(self, project_id: str, stakeholders: List[Dict[str, Any]]) -> bool:
         """Sauvegarder les stakeholders d'un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Supprimer les anciens stakeholders du projet
@@ -744,7 +1145,7 @@ class PersistenceService:
     def get_project_stakeholders(self, project_id: str) -> List[Dict[str, Any]]:
         """Récupérer les stakeholders d'un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 # First check which columns exist in the stakeholders table
@@ -822,7 +1223,7 @@ class PersistenceService:
     def log_project_session(self, project_id: str, action_type: str, action_description: str, result_data: Optional[Dict[str, Any]] = None) -> bool:
         """Enregistrer une action dans l'historique du projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
@@ -849,7 +1250,7 @@ class PersistenceService:
     def get_project_sessions(self, project_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Récupérer l'historique des sessions d'un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT id, project_id, action_type, action_description, result_data, user_id, created_at
@@ -885,7 +1286,7 @@ class PersistenceService:
     def delete_project(self, project_id: str) -> bool:
         """Supprimer un projet et toutes ses données associées"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Supprimer dans l'ordre des dépendances
@@ -908,7 +1309,7 @@ class PersistenceService:
     def update_project(self, project_id: str, name: Optional[str] = None, description: Optional[str] = None, proposal_text: Optional[str] = None) -> bool:
         """Mettre à jour les informations d'un projet"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Construire la requête dynamiquement
@@ -947,7 +1348,7 @@ class PersistenceService:
     def check_file_hash_in_project(self, file_hash: str, project_id: str) -> Tuple[bool, Optional[str]]:
         """Vérifier si un fichier a déjà été traité dans le projet spécifique (RECOMMANDÉ)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT id, filename, processed_at 
@@ -969,7 +1370,7 @@ class PersistenceService:
     def check_file_hash_globally(self, file_hash: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """Vérifier si un fichier a déjà été traité dans n'importe quel projet (AVANCÉ)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT id, project_id, filename, processed_at 
@@ -991,7 +1392,7 @@ class PersistenceService:
     def get_database_statistics(self) -> Dict[str, Any]:
         """Obtenir des statistiques globales de la base de données"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 stats = {}
@@ -1029,13 +1430,17 @@ class PersistenceService:
             return {"error": str(e)}
     
     def _get_db_connection(self):
-        """Helper method to get database connection"""
-        return sqlite3.connect(self.db_path)
+        """Helper method to get database connection (context manager committing on exit)"""
+        return self.connection_manager.connection()
+    
+    def close(self):
+        """Close the pooled database connections"""
+        self.connection_manager.close_all()
     
     def link_document_to_project(self, existing_doc_id: str, target_project_id: str) -> bool:
         """Link an existing document to a new project by copying its data and chunks"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection_manager.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Get the existing document details
@@ -1110,6 +1515,8 @@ class PersistenceService:
                         chunk[4]   # metadata
                     ))
                 
+                if chunks:
+                    self._bump_content_version(cursor, target_project_id)
                 conn.commit()
                 
                 self.logger.info(f"Successfully linked document {existing_doc[0]} to project {target_project_id}")
@@ -0,0 +1,147 @@
+"""
+SQLite Connection Manager for SAFE MBSE RAG System
+
+Thread-safe access to a SQLite database file with one reusable connection per
+thread instead of a connect/close cycle per query. Connections are opened in
+WAL journal mode so readers (chat queries, UI reruns) never block on the
+ingestion writer, with tuned pragmas and a busy timeout plus commit retries
+for the remaining writer/writer contention.
+
+A connection lives as long as its thread: it is closed when the thread exits,
+so short-lived threads (Streamlit reruns, worker pools) do not leak file
+descriptors.
+"""
+
+import sqlite3
+import threading
+import time
+import logging
+import weakref
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class _ThreadConnection:
+    """Holder of one thread's connection, closed when the thread's locals are released"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def close(self):
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def __del__(self):
+        self.close()
+
+
+class SQLiteConnectionManager:
+    """Per-thread reusable SQLite connections with WAL mode and busy handling"""
+
+    def __init__(self,
+                 db_path: str,
+                 busy_timeout_ms: int = 5000,
+                 cache_size_kb: int = 20000,
+                 mmap_size_bytes: int = 256 * 1024 * 1024,
+                 synchronous: str = "NORMAL",
+                 max_retries: int = 3):
+        """
+        Args:
+            db_path: SQLite database file
+            busy_timeout_ms: Time a statement waits for a lock before failing
+            cache_size_kb: Page cache size per connection
+            mmap_size_bytes: Memory-mapped I/O size (0 disables)
+            synchronous: synchronous pragma; NORMAL is durable across application crashes in WAL mode
+            max_retries: Commit attempts when the database stays locked beyond the busy timeout
+        """
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size_bytes = mmap_size_bytes
+        self.synchronous = synchronous
+        self.max_retries = max(1, max_retries)
+        self.logger = logging.getLogger(__name__)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Connexions ouvertes ; une entrée disparaît quand son thread se termine
+        self._connections: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yield this thread's connection inside a transaction
+
+        Like `with sqlite3.connect(...) as conn`, the transaction is committed
+        when the block succeeds and rolled back when it raises. Nested blocks
+        share the outermost transaction.
+        """
+        conn = self._get_thread_connection()
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        try:
+            yield conn
+        except BaseException:
+            if self._local.depth == 1 and conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            if self._local.depth == 1:
+                self._commit(conn)
+        finally:
+            self._local.depth -= 1
+
+    @property
+    def open_connections(self) -> int:
+        """Number of connections currently open (one per live thread that used the manager)"""
+        with self._lock:
+            return sum(1 for holder in list(self._connections) if holder.conn is not None)
+
+    def close_all(self):
+        """Close every connection opened by this manager"""
+        with self._lock:
+            holders = list(self._connections)
+            self._connections = weakref.WeakSet()
+        for holder in holders:
+            holder.close()
+        self._local = threading.local()
+
+    def _get_thread_connection(self) -> sqlite3.Connection:
+        holder: Optional[_ThreadConnection] = getattr(self._local, "holder", None)
+        if holder is None or holder.conn is None:
+            # Utilisée par ce seul thread, mais fermée par le thread qui libère ses locales
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+            self._configure(conn)
+            holder = _ThreadConnection(conn)
+            self._local.holder = holder
+            with self._lock:
+                self._connections.add(holder)
+        return holder.conn
+
+    def _configure(self, conn: sqlite3.Connection):
+        """Apply journal mode and performance pragmas to a new connection"""
+        cursor = conn.cursor()
+        journal_mode = cursor.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if str(journal_mode).lower() != "wal":
+            self.logger.warning(f"WAL mode unavailable for {self.db_path}, using {journal_mode} journal")
+        cursor.execute(f"PRAGMA synchronous={self.synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        cursor.execute(f"PRAGMA mmap_size={int(self.mmap_size_bytes)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+
+    def _commit(self, conn: sqlite3.Connection):
+        """Commit, retrying with backoff while another writer holds the lock"""
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                conn.commit()
+                return
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e).lower() or attempt == self.max_retries:
+                    conn.rollback()
+                    raise
+                self.logger.warning(f"Database locked on commit, attempt {attempt}/{self.max_retries}")
+                time.sleep(0.1 * (2 ** (attempt - 1)))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests de la limite de concurrence adaptative (AIMD)
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.adaptive_concurrency import AdaptiveConcurrencyLimiter
+
+
+def test_limit_grows_while_saturated_and_healthy_then_wakes_waiters():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(2, max_limit=4)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["queued"] == 1
+
+        for _ in range(10):
+            limiter.on_success(1.0, tokens=100)
+        await asyncio.sleep(0)
+
+        assert limiter.limit > 3 and waiter.done()
+        assert limiter.snapshot()["in_flight"] == 3 and limiter.snapshot()["queued"] == 0
+
+        # Limite non atteinte : aucune preuve de capacité supplémentaire
+        limiter.release()
+        limit = limiter.limit
+        limiter.on_success(1.0, tokens=100)
+        assert limiter.limit == limit
+
+    asyncio.run(scenario())
+
+
+def test_limit_backs_off_on_overload_and_latency_inflation():
+    limiter = AdaptiveConcurrencyLimiter(8, backoff_ratio=0.5, latency_tolerance=2.0)
+
+    started = time.monotonic()
+    limiter.on_overload(started)
+    limiter.on_overload(started)  # Même rafale d'échecs : une seule réduction
+    assert limiter.limit == 4 and limiter.decreases == 1
+
+    for _ in range(5):
+        limiter.on_success(0.01, tokens=10)
+    for _ in range(5):
+        limiter.on_success(0.1, tokens=10)
+    assert limiter.limit == 2 and limiter.decreases == 2
+
+
+def test_fixed_limit_when_not_adaptive():
+    limiter = AdaptiveConcurrencyLimiter(3, adaptive=False)
+    limiter.in_flight = 3
+    for _ in range(10):
+        limiter.on_success(1.0)
+    limiter.on_overload()
+    assert limiter.limit == 3
+
+
+def test_interactive_waiters_overtake_batch_waiters_with_aging():
+    async def serve_order(aging_seconds):
+        limiter = AdaptiveConcurrencyLimiter(1, adaptive=False, aging_seconds=aging_seconds)
+        await limiter.acquire()
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+            limiter.release()
+
+        batch = asyncio.ensure_future(request("batch", 1))
+        await asyncio.sleep(0.05)
+        interactive = asyncio.ensure_future(request("interactive", 0))
+        await asyncio.sleep(0)
+        assert limiter.queued_by_priority() == {0: 1, 1: 1}
+
+        limiter.release()
+        await asyncio.gather(batch, interactive)
+        return order
+
+    assert asyncio.run(serve_order(aging_seconds=30)) == ["interactive", "batch"]
+    # Attente de 0,05 s >> vieillissement de 0,01 s : la requête batch n'est pas affamée
+    assert asyncio.run(serve_order(aging_seconds=0.01)) == ["batch", "interactive"]
+
+
+def test_promote_raises_a_queued_request_priority():
+    async def serve_order():
+        limiter = AdaptiveConcurrencyLimiter(1, adaptive=False)
+        await limiter.acquire()
+        order = []
+
+        async def request(name, tag):
+            await limiter.acquire(1, tag)
+            order.append(name)
+            limiter.release()
+
+        first = asyncio.ensure_future(request("first", "a"))
+        second = asyncio.ensure_future(request("second", "b"))
+        await asyncio.sleep(0)
+        limiter.promote("b", 0)
+        assert limiter.queued_by_priority() == {0: 1, 1: 1}
+
+        limiter.release()
+        await asyncio.gather(first, second)
+        return order
+
+    assert asyncio.run(serve_order()) == ["second", "first"]
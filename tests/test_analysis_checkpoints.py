@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests des points de reprise des analyses ARCADIA structurées
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models.arcadia_outputs import (
+    OperationalActor, OperationalAnalysisOutput, SystemAnalysisOutput, SystemBoundary,
+    ARCADIAPhaseType, dataclass_to_dict, dataclass_from_dict
+)
+from src.services.persistence_service import PersistenceService
+from src.core.structured_arcadia_service import StructuredARCADIAService
+
+
+def test_phase_output_round_trip():
+    """Une sortie de phase sérialisée en JSON est reconstruite à l'identique"""
+    output = OperationalAnalysisOutput(
+        actors=[OperationalActor("OA-001", "Operator", "desc", "role", responsibilities=["monitor"])],
+        extraction_metadata={"operational_activities": [{"name": "Monitor"}]}
+    )
+    data = json.loads(json.dumps(dataclass_to_dict(output)))
+
+    restored = dataclass_from_dict(OperationalAnalysisOutput, data)
+    assert restored == output
+    assert restored.phase is ARCADIAPhaseType.OPERATIONAL
+    assert isinstance(restored.actors[0], OperationalActor)
+
+    system = SystemAnalysisOutput(system_boundary=SystemBoundary("scope", included_elements=["A"]))
+    assert dataclass_from_dict(SystemAnalysisOutput, dataclass_to_dict(system)) == system
+
+
+def test_checkpoints_are_keyed_by_input_fingerprint(tmp_path):
+    """Les points de reprise ne sont restitués que pour des entrées identiques"""
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+
+    assert persistence.save_analysis_checkpoint("analysis-1", "operational", "fp-1", {"actors": []})
+
+    assert persistence.get_analysis_checkpoints("analysis-1", "fp-1") == {"operational": {"actors": []}}
+    assert persistence.get_analysis_checkpoints("analysis-1", "fp-2") == {}
+
+    assert persistence.delete_analysis_checkpoints("analysis-1")
+    assert persistence.get_analysis_checkpoints("analysis-1", "fp-1") == {}
+
+
+def test_checkpoint_dates_keep_their_type_and_old_checkpoints_expire(tmp_path):
+    """Les dates sont restituées en datetime ; les points de reprise abandonnés expirent"""
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    extracted_at = datetime(2026, 10, 16, 9, 30, 15)
+    persistence.save_analysis_checkpoint("old", "operational", "fp", {"extracted_at": extracted_at})
+    persistence.save_analysis_checkpoint("recent", "operational", "fp", {"label": "x"})
+
+    assert persistence.get_analysis_checkpoints("old", "fp") == {"operational": {"extracted_at": extracted_at}}
+
+    with persistence.connection_manager.connection() as conn:
+        conn.execute("UPDATE analysis_checkpoints SET created_at = datetime('now', '-100 hours') "
+                     "WHERE analysis_id = 'old'")
+    assert persistence.delete_expired_analysis_checkpoints(72) == 1
+    assert persistence.get_analysis_checkpoints("old", "fp") == {}
+    assert persistence.get_analysis_checkpoints("recent", "fp") != {}
+
+
+def test_resumed_analysis_deletes_its_checkpoints_once_complete(tmp_path):
+    """Une analyse reprise puis terminée ne laisse aucun point de reprise"""
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    service = StructuredARCADIAService(None, checkpoint_store=persistence)
+    chunks = [{"content": "The operator monitors the radar"}]
+    fingerprint = service.compute_input_fingerprint(chunks, "proposal", ["proposal_text"])
+
+    output = OperationalAnalysisOutput(
+        actors=[OperationalActor("OA-001", "Operator", "desc", "role")],
+        extraction_metadata={"extracted_at": datetime(2026, 10, 16, 9, 30)}
+    )
+    persistence.save_analysis_checkpoint("analysis-1", "operational", fingerprint, dataclass_to_dict(output))
+
+    result = service.resume_arcadia_analysis("analysis-1", chunks, "proposal", target_phases=["operational"],
+                                             enable_cross_phase_analysis=False)
+
+    assert result.operational_analysis == output
+    assert result.generation_metadata["resumed_phases"] == ["operational"]
+    assert result.generation_metadata["resumable"] is False
+    assert persistence.get_analysis_checkpoints("analysis-1", fingerprint) == {}
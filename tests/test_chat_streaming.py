@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests du streaming des réponses de chat
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.chat_streaming import collect_answer, static_answer_events, stream_chat_answer
+
+
+class _StreamingClient:
+    """Client Ollama minimal renvoyant une réponse découpée en fragments"""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.calls = []
+
+    def chat(self, model, messages, stream=False):
+        self.calls.append({"model": model, "stream": stream})
+        for piece in self.pieces:
+            yield {"message": {"content": piece}, "done": False}
+        yield {"message": {"content": ""}, "done": True, "prompt_eval_duration": 120_000_000, "eval_count": 3}
+
+
+def test_stream_yields_sources_then_tokens_then_metrics():
+    client = _StreamingClient(["The ", "radar ", "detects."])
+    events = list(stream_chat_answer(client, "llama3:instruct", [{"role": "user", "content": "q"}], ["src"]))
+
+    assert client.calls == [{"model": "llama3:instruct", "stream": True}]
+    assert events[0] == {"type": "sources", "sources": ["src"]}
+    assert [event["content"] for event in events if event["type"] == "token"] == ["The ", "radar ", "detects."]
+
+    done = events[-1]
+    assert done["type"] == "done" and done["answer"] == "The radar detects."
+    assert done["metrics"]["ttft_ms"] <= done["metrics"]["total_ms"]
+    assert done["metrics"]["prompt_eval_ms"] == 120.0 and done["metrics"]["eval_count"] == 3
+
+
+def test_collect_answer_reports_partial_text_and_errors():
+    seen = []
+    result = collect_answer(static_answer_events("No documents.", []), on_text=seen.append)
+    assert result["answer"] == "No documents." and seen == ["No documents."]
+    assert set(result["metrics"]) >= {"ttft_ms", "total_ms"}
+
+    failed = collect_answer(iter([{"type": "sources", "sources": []}, {"type": "error", "message": "boom"}]))
+    assert failed["answer"] == "boom"
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests de la recherche hybride BM25 + vectorielle
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion
+from src.services.persistence_service import PersistenceService
+
+
+class _FakeCollection:
+    """Collection renvoyant un classement vectoriel fixe"""
+
+    def __init__(self, doc_id, ranking):
+        self.doc_id = doc_id
+        self.ranking = ranking
+        self.calls = 0
+
+    def query(self, query_texts, n_results, where):
+        self.calls += 1
+        indexes = self.ranking[:n_results]
+        return {
+            "documents": [[f"chunk {i}" for i in indexes]],
+            "metadatas": [[{"document_id": self.doc_id, "chunk_index": i, "project_id": where["project_id"]}
+                           for i in indexes]],
+            "distances": [[0.1 * rank for rank in range(len(indexes))]],
+            "ids": [[f"{self.doc_id}_chunk_{i}" for i in indexes]]
+        }
+
+
+def test_reciprocal_rank_fusion_weights():
+    """Un élément bien classé dans les deux listes passe devant"""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], rrf_k=60)
+    assert [key for key, _ in fused] == ["b", "a", "d", "c"]
+
+    lexical_first = reciprocal_rank_fusion([["a"], ["d"]], weights=[2.0, 1.0])
+    assert lexical_first[0][0] == "a"
+
+
+def test_hybrid_retrieval_fuses_lexical_and_dense(tmp_path):
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    project_id = persistence.create_project("Project", "desc", "proposal")
+    document = tmp_path / "spec.txt"
+    document.write_text("content")
+    doc_id = persistence.register_document(str(document), project_id)
+    persistence.save_document_chunks(doc_id, project_id, [
+        {"content": "General mission overview", "metadata": {}},
+        {"content": "FR-012 shall be reported to the SOC", "metadata": {}},
+        {"content": "Operators supervise the mission", "metadata": {}}
+    ])
+
+    # Le classement vectoriel ignore l'identifiant exact FR-012
+    collection = _FakeCollection(doc_id, [2, 0])
+    retriever = HybridRetriever(persistence, lexical_weight=1.0, dense_weight=1.0, rrf_k=60, candidates=10)
+
+    results = retriever.retrieve(collection, "FR-012 SOC", project_id, top_k=3)
+
+    assert collection.calls == 1
+    assert [r["id"] for r in results] == [f"{doc_id}_chunk_1", f"{doc_id}_chunk_2", f"{doc_id}_chunk_0"]
+    assert results[0]["lexical_rank"] == 1 and results[0]["dense_rank"] is None
+    # Absent des candidats vectoriels : pas de distance inventée, seul le score RRF le classe
+    assert results[0]["distance"] is None and results[0]["score"] > 0
+    assert results[1]["distance"] == 0.0
+    assert results[1]["dense_rank"] == 1
+
+    # Aucune requête ne crée de nouveau thread : le pool vectoriel est réutilisé
+    threads_before = threading.active_count()
+    for _ in range(20):
+        retriever.retrieve(collection, "FR-012 SOC", project_id, top_k=3)
+    assert threading.active_count() <= threads_before + 4
+    assert persistence.connection_manager.open_connections <= 6
+    retriever.close()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests du pipeline d'ingestion parallèle
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.ingestion_pipeline import DocumentIngestionPipeline
+from src.services.persistence_service import PersistenceService
+
+
+class _BrokenPool(ThreadPoolExecutor):
+    """Pool d'analyse refusant toute soumission (comme un pool de processus cassé)"""
+
+    def submit(self, fn, *args, **kwargs):
+        raise RuntimeError("pool broken")
+
+
+class _BrokenPoolPipeline(DocumentIngestionPipeline):
+    def _create_parse_pool(self, document_count):
+        return _BrokenPool(max_workers=1)
+
+
+def test_failed_submissions_release_their_slot(tmp_path):
+    """Un échec de soumission est enregistré pour le document sans bloquer les suivants"""
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    project_id = persistence.create_project("Ingestion")
+    files = []
+    for i in range(3):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(f"document {i}")
+        files.append(str(path))
+
+    pipeline = _BrokenPoolPipeline(persistence, lambda chunks, doc_id, project_id: None,
+                                   max_pending_documents=1)
+    results = {}
+    runner = threading.Thread(target=lambda: results.update(pipeline.run(files, project_id)))
+    runner.start()
+    runner.join(timeout=10)
+
+    assert not runner.is_alive()
+    assert results["processed_files"] == []
+    assert len(results["errors"]) == 3
+    assert all("pool broken" in error for error in results["errors"])
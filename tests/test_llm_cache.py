@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests du cache persistant des réponses LLM
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.llm_cache_service import LLMResponseCache
+
+
+def test_cache_hit_and_miss(tmp_path):
+    """Une réponse stockée est servie pour une requête identique uniquement"""
+    cache = LLMResponseCache(db_path=str(tmp_path / "cache.db"), max_entries=10)
+
+    assert cache.get("gemma3:12b", "prompt", 0.3, 2000) is None
+    assert cache.put("gemma3:12b", "prompt", "answer", 0.3, 2000)
+
+    assert cache.get("gemma3:12b", "prompt", 0.3, 2000) == "answer"
+    assert cache.get("gemma3:12b", "prompt", 0.1, 2000) is None
+    assert cache.get("gemma3:12b", "prompt", 0.3, 1000) is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["entries"] == 1
+
+
+def test_cache_lru_eviction(tmp_path):
+    """Les entrées les moins récemment utilisées sont évincées au-delà de la limite"""
+    cache = LLMResponseCache(db_path=str(tmp_path / "cache.db"), max_entries=2)
+
+    cache.put("m", "a", "A")
+    cache.put("m", "b", "B")
+    assert cache.get("m", "a") == "A"  # "b" devient la plus ancienne
+    cache.put("m", "c", "C")
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == "A"
+    assert cache.get("m", "c") == "C"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_empty_response_not_cached(tmp_path):
+    """Les réponses vides (erreurs) ne sont jamais mises en cache"""
+    cache = LLMResponseCache(db_path=str(tmp_path / "cache.db"))
+
+    assert not cache.put("m", "prompt", "")
+    assert cache.get("m", "prompt") is None
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Tests de la passerelle LLM partagée
+"""
+
+import sys
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.llm_gateway import LLMGateway, llm_priority
+
+
+class _Overloaded(Exception):
+    status_code = 503
+
+
+class _FakeAsyncClient:
+    """Client asynchrone simulant un serveur Ollama lent ou surchargé"""
+
+    def __init__(self, failures=0, delay=0.02):
+        self.failures = failures
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    async def generate(self, model, prompt, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            failing = self.failures > 0
+            self.failures -= 1
+        try:
+            await asyncio.sleep(self.delay)
+            if failing:
+                raise _Overloaded("server busy")
+            return {"response": prompt.upper()}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        async def chunks():
+            for piece in ["a", "b", "c"]:
+                yield {"message": {"content": piece}, "done": False}
+            yield {"message": {"content": ""}, "done": True}
+        return chunks()
+
+    async def embed(self, model, input, **kwargs):
+        return {"embeddings": [[float(len(text))] for text in input]}
+
+
+def _gateway(client, **kwargs):
+    return LLMGateway(client=client, retry_base_delay=0.01, **kwargs)
+
+
+def test_sync_calls_respect_model_concurrency_limit():
+    client = _FakeAsyncClient()
+    gateway = _gateway(client, default_concurrency=2, adaptive_concurrency=False)
+    try:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            responses = list(executor.map(lambda i: gateway.generate(model="m", prompt=f"p{i}"), range(6)))
+        assert [response["response"] for response in responses] == [f"P{i}" for i in range(6)]
+        assert client.max_active == 2
+        assert gateway.embed(model="e", input=["ab", "c"]) == {"embeddings": [[2.0], [1.0]]}
+    finally:
+        gateway.close()
+
+
+def test_transient_failures_are_retried_then_surface():
+    client = _FakeAsyncClient(failures=2)
+    gateway = _gateway(client, max_retries=3)
+    try:
+        assert gateway.generate(model="m", prompt="x")["response"] == "X"
+        assert gateway.stats()["retries"] == 2
+
+        client.failures = 5
+        with pytest.raises(_Overloaded):
+            gateway.generate(model="m", prompt="x")
+        assert gateway.stats()["failures"] == 1
+    finally:
+        gateway.close()
+
+
+def test_streaming_from_sync_and_async_callers():
+    gateway = _gateway(_FakeAsyncClient())
+    try:
+        chunks = gateway.chat(model="m", messages=[], stream=True)
+        assert "".join(chunk["message"]["content"] for chunk in chunks) == "abc"
+
+        async def consume():
+            response = await gateway.agenerate("m", "hi")
+            pieces = [chunk["message"]["content"] async for chunk in gateway.achat_stream("m", [])]
+            return response["response"], "".join(pieces)
+
+        assert asyncio.run(consume()) == ("HI", "abc")
+    finally:
+        gateway.close()
+
+
+def test_streaming_surfaces_client_creation_failure():
+    gateway = _gateway(None)
+
+    def failing_client():
+        raise RuntimeError("no ollama package")
+
+    gateway._get_client = failing_client
+    try:
+        with pytest.raises(RuntimeError):
+            list(gateway.chat(model="m", messages=[], stream=True))
+
+        async def consume():
+            return [chunk async for chunk in gateway.agenerate_stream("m", "hi")]
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(consume())
+    finally:
+        gateway.close()
+
+
+def test_identical_concurrent_requests_share_one_generation():
+    client = _FakeAsyncClient(delay=0.1)
+    gateway = _gateway(client)
+    try:
+        prompts = ["same"] * 5 + ["other"]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            responses = list(executor.map(lambda p: gateway.generate(model="m", prompt=p), prompts))
+
+        assert [response["response"] for response in responses] == ["SAME"] * 5 + ["OTHER"]
+        assert client.calls == 2
+        stats = gateway.stats()
+        assert stats["requests"] == 6 and stats["upstream_requests"] == 2
+        assert stats["coalesced"] == 4 and stats["coalesced_by_model"] == {"m": 4}
+
+        # Requête terminée : un nouvel appel identique repart vers le serveur
+        gateway.generate(model="m", prompt="same")
+        assert client.calls == 3
+    finally:
+        gateway.close()
+
+
+def test_priority_comes_from_argument_then_context_then_default():
+    gateway = _gateway(_FakeAsyncClient(), default_priority="batch")
+    try:
+        assert gateway._priority(None) == 1
+        with llm_priority("interactive"):
+            assert gateway._priority(None) == 0
+            assert gateway._priority("batch") == 1
+        with pytest.raises(ValueError):
+            gateway._priority("urgent")
+    finally:
+        gateway.close()
+
+
+def test_interactive_caller_promotes_the_batch_flight_it_joins():
+    client = _FakeAsyncClient(delay=0.05)
+    gateway = _gateway(client, default_concurrency=1, adaptive_concurrency=False)
+    try:
+        async def scenario():
+            running = asyncio.ensure_future(gateway.agenerate("m", "running", priority="batch"))
+            await asyncio.sleep(0.01)
+            queued = [asyncio.ensure_future(gateway.agenerate("m", f"batch{i}", priority="batch")) for i in range(3)]
+            shared = asyncio.ensure_future(gateway.agenerate("m", "shared", priority="batch"))
+            await asyncio.sleep(0.01)
+            chat = asyncio.ensure_future(gateway.agenerate("m", "shared", priority="interactive"))
+            await asyncio.gather(running, shared, chat, *queued)
+
+        asyncio.run(scenario())
+        assert client.prompts[:2] == ["running", "shared"]
+        assert client.calls == 5
+    finally:
+        gateway.close()
+
+
+def test_cancelling_first_caller_keeps_shared_generation():
+    client = _FakeAsyncClient(delay=0.1)
+    gateway = _gateway(client)
+    try:
+        async def scenario():
+            first = asyncio.ensure_future(gateway.agenerate("m", "p"))
+            second = asyncio.ensure_future(gateway.agenerate("m", "p"))
+            await asyncio.sleep(0.03)
+            first.cancel()
+            response = await second
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return response
+
+        assert asyncio.run(scenario())["response"] == "P"
+        assert client.calls == 1
+
+        # Tous les appelants annulés : la génération amont est abandonnée
+        async def abandon():
+            caller = asyncio.ensure_future(gateway.agenerate("m", "q"))
+            await asyncio.sleep(0.03)
+            caller.cancel()
+            await asyncio.sleep(0.02)
+
+        asyncio.run(abandon())
+        assert client.active == 0
+        assert gateway.generate(model="m", prompt="q")["response"] == "Q"
+    finally:
+        gateway.close()
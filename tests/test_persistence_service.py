@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests des chemins d'écriture du service de persistance
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.persistence_service import PersistenceService
+
+
+def _requirements(title_suffix=""):
+    return {"requirements": {
+        "operational": {"functional": [
+            {"id": "OA-FUN-001", "title": "Monitor" + title_suffix, "description": "desc"},
+            {"id": "OA-FUN-002", "title": "Report", "description": "desc"}
+        ]},
+        "system": {"non_functional": [
+            {"id": "SA-NFR-001", "title": "Latency", "description": "desc"}
+        ]}
+    }}
+
+
+def test_requirements_upsert_counts(tmp_path):
+    """L'upsert distingue insertions, mises à jour et lignes inchangées"""
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    project_id = persistence.create_project("Project", "desc", "proposal")
+
+    assert persistence.save_project_requirements(project_id, _requirements()) == {
+        "inserted": 3, "updated": 0, "unchanged": 0, "conflicts": 0
+    }
+    assert persistence.save_project_requirements(project_id, _requirements(" v2")) == {
+        "inserted": 0, "updated": 1, "unchanged": 2, "conflicts": 0
+    }
+
+    saved = persistence.get_project_requirements(project_id)["requirements"]
+    assert {req["id"]: req["title"] for req in saved["operational"]["functional"]} == {
+        "OA-FUN-001": "Monitor v2", "OA-FUN-002": "Report"
+    }
+    assert [req["id"] for req in saved["system"]["non_functional"]] == ["SA-NFR-001"]
+
+    # Mise à jour en place : aucune ligne dupliquée
+    with persistence._get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM requirements WHERE project_id = ?", (project_id,)).fetchone()[0] == 3
+
+
+def test_project_counters_follow_writes(tmp_path):
+    """Les compteurs matérialisés suivent documents et requirements sans jointure"""
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    project_id = persistence.create_project("Project", "desc", "long proposal")
+
+    document = tmp_path / "spec.txt"
+    document.write_text("content")
+    persistence.register_document(str(document), project_id)
+    persistence.save_project_requirements(project_id, _requirements())
+
+    project = persistence.get_project(project_id)
+    assert (project.documents_count, project.requirements_count) == (1, 3)
+
+    listed = persistence.list_projects()
+    assert [(p.id, p.documents_count, p.requirements_count) for p in listed] == [(project_id, 1, 3)]
+    assert listed[0].proposal_text == ""
+
+    with persistence._get_db_connection() as conn:
+        conn.execute("DELETE FROM requirements WHERE id = 'SA-NFR-001'")
+    assert persistence.get_project(project_id).requirements_count == 2
+
+
+def test_search_chunks_ranks_with_bm25(tmp_path):
+    """La recherche plein texte suit les écritures de chunks et filtre par projet"""
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    project_id = persistence.create_project("Project", "desc", "proposal")
+    other_id = persistence.create_project("Other", "desc", "proposal")
+
+    document = tmp_path / "spec.txt"
+    document.write_text("content")
+    other_document = tmp_path / "other.txt"
+    other_document.write_text("other content")
+    doc_id = persistence.register_document(str(document), project_id)
+    other_doc_id = persistence.register_document(str(other_document), other_id)
+
+    persistence.save_document_chunks(doc_id, project_id, [
+        {"content": "The radar monitors the airspace", "metadata": {}},
+        {"content": "Radar radar tracking of aircraft", "metadata": {}},
+        {"content": "Operators write reports", "metadata": {}}
+    ])
+    persistence.save_document_chunks(other_doc_id, other_id, [
+        {"content": "Radar calibration", "metadata": {}}
+    ])
+
+    results = persistence.search_chunks(project_id, "radar tracking?")
+    assert [chunk["content"] for chunk in results] == [
+        "Radar radar tracking of aircraft", "The radar monitors the airspace"
+    ]
+    assert results[0]["score"] > results[1]["score"]
+    assert results[0]["metadata"]["source_filename"] == "spec.txt"
+
+    # Réécriture partielle : chunk inchangé conservé, chunk modifié réindexé
+    persistence.save_document_chunks(doc_id, project_id, [
+        {"content": "The radar monitors the airspace", "metadata": {}},
+        {"content": "Sonar tracking of submarines", "metadata": {}}
+    ])
+    assert {chunk["content"] for chunk in persistence.search_chunks(project_id, "radar tracking")} == {
+        "Sonar tracking of submarines", "The radar monitors the airspace"
+    }
+    assert persistence.search_chunks(project_id, "reports") == []
+
+    # Remplacement des chunks : l'index suit les suppressions
+    persistence.save_document_chunks(doc_id, project_id, [{"content": "Sonar only", "metadata": {}}])
+    assert persistence.search_chunks(project_id, "radar") == []
+    assert persistence.search_chunks(project_id, "the") == []
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests du cache de résultats de recherche
+"""
+
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.retrieval_cache import RetrievalCache
+from src.services.persistence_service import PersistenceService
+
+
+def test_cache_normalizes_queries_and_evicts_lru():
+    cache = RetrievalCache(max_entries=2, ttl_seconds=60)
+    cache.put("p1", "What is the SOC?", ["a"], 1, top_k=5)
+
+    assert cache.get("p1", "  what is   the soc ", 1, top_k=5) == ["a"]
+    assert cache.get("p1", "what is the soc", 2, top_k=5) is None
+    assert cache.get("p1", "what is the soc", 1, top_k=3) is None
+
+    cache.put("p1", "second", ["b"], 1)
+    cache.get("p1", "what is the soc", 1, top_k=5)
+    cache.put("p1", "third", ["c"], 1)
+    assert cache.get("p1", "second", 1) is None
+    assert cache.get("p1", "what is the soc", 1, top_k=5) == ["a"]
+
+
+def test_cache_ttl_and_invalidation():
+    cache = RetrievalCache(max_entries=10, ttl_seconds=0.05)
+    cache.put("p1", "query", ["a"])
+    cache.put("p2", "query", ["b"])
+
+    cache.invalidate("p1")
+    assert cache.get("p1", "query") is None
+    assert cache.get("p2", "query") == ["b"]
+
+    time.sleep(0.06)
+    assert cache.get("p2", "query") is None
+
+
+def test_cache_discards_results_computed_before_invalidation():
+    cache = RetrievalCache(max_entries=10, ttl_seconds=60)
+    generation = cache.generation("p1")
+
+    # Vecteurs écrits pendant la recherche
+    cache.invalidate("p1")
+    cache.put("p1", "query", ["stale"], 1, generation=generation)
+    assert cache.get("p1", "query", 1) is None
+
+    cache.put("p1", "query", ["fresh"], 1, generation=cache.generation("p1"))
+    assert cache.get("p1", "query", 1) == ["fresh"]
+
+
+def test_content_version_follows_chunk_writes(tmp_path):
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    project_id = persistence.create_project("Project", "desc", "proposal")
+    document = tmp_path / "spec.txt"
+    document.write_text("content")
+    doc_id = persistence.register_document(str(document), project_id)
+
+    initial = persistence.get_project_content_version(project_id)
+    chunks = [{"content": f"chunk {i}", "metadata": {}} for i in range(50)]
+    persistence.save_document_chunks(doc_id, project_id, chunks)
+    assert persistence.get_project_content_version(project_id) == initial + 1
+
+    # Une version par sauvegarde, quel que soit le nombre de chunks ; rien si rien ne change
+    persistence.save_document_chunks(doc_id, project_id, chunks)
+    assert persistence.get_project_content_version(project_id) == initial + 1
+    persistence.save_document_chunks(doc_id, project_id, chunks[:10])
+    persistence.save_document_chunks(doc_id, project_id, [])
+    assert persistence.get_project_content_version(project_id) == initial + 3
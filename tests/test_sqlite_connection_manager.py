@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests du gestionnaire de connexions SQLite
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.sqlite_connection_manager import SQLiteConnectionManager
+
+
+def test_connections_are_reused_per_thread_in_wal_mode(tmp_path):
+    """Une connexion WAL par thread, réutilisée d'un appel à l'autre"""
+    manager = SQLiteConnectionManager(str(tmp_path / "test.db"))
+
+    with manager.connection() as first:
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with manager.connection() as second:
+        assert second is first
+
+    other = []
+
+    def use_connection():
+        with manager.connection() as conn:
+            other.append(conn)
+
+    thread = threading.Thread(target=use_connection)
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+
+    manager.close_all()
+
+
+def test_transaction_commits_or_rolls_back(tmp_path):
+    """Le bloc est validé en cas de succès et annulé en cas d'exception"""
+    manager = SQLiteConnectionManager(str(tmp_path / "test.db"))
+
+    with manager.connection() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+        conn.execute("INSERT INTO items VALUES ('kept')")
+
+    with pytest.raises(RuntimeError):
+        with manager.connection() as conn:
+            conn.execute("INSERT INTO items VALUES ('discarded')")
+            raise RuntimeError("boom")
+
+    with manager.connection() as conn:
+        assert conn.execute("SELECT name FROM items").fetchall() == [("kept",)]
+
+    manager.close_all()
+
+
+def test_connections_of_finished_threads_are_closed(tmp_path):
+    """Les connexions des threads terminés sont fermées : leur nombre reste borné"""
+    manager = SQLiteConnectionManager(str(tmp_path / "test.db"))
+    with manager.connection() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+
+    def use_connection(i):
+        with manager.connection() as conn:
+            conn.execute("INSERT INTO items VALUES (?)", (f"item{i}",))
+
+    for i in range(50):
+        thread = threading.Thread(target=use_connection, args=(i,))
+        thread.start()
+        thread.join()
+        assert manager.open_connections <= 2
+
+    with manager.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 50
+    assert manager.open_connections == 1
+
+    manager.close_all()
+    assert manager.open_connections == 0
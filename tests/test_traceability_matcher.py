@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests du moteur vectorisé d'appariement de traçabilité
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.structured_arcadia_service import StructuredARCADIAService
+from src.core.traceability_matcher import TraceabilityMatcher
+from src.models.arcadia_outputs import (LogicalComponent, LogicalFunction, OperationalCapability,
+                                        PhysicalComponent, SystemCapability)
+
+# Scores du calcul par paire d'origine (_calculate_semantic_similarity), relevés avant sa vectorisation
+REFERENCE_NAME_SCORES = [
+    ("Operator", "System Operator", 0.806667),
+    ("Radar", "Radar Processing Unit", 0.747619),
+    ("Data Manager", "Data Management Service", 0.3),
+    ("monitor", "surveillance", 0.8),
+    ("Track Manager", "Tracking Service", 0.1),
+    ("Network Link", "Communication Interface", 0.6),
+    ("Crew Display", "Display Console", 0.4),
+    ("Power Supply", "Fuel Pump", 0.1875),
+    ("the", "of", 0.0),
+    ("Radar", "radar", 1.0)
+]
+
+
+def _logical(id, name, description=""):
+    return LogicalComponent(id=id, name=name, description=description, component_type="subsystem")
+
+
+def _physical(id, name, description=""):
+    return PhysicalComponent(id=id, name=name, description=description,
+                             component_type="hardware", technology_platform="embedded")
+
+
+def test_best_match_selects_closest_target():
+    """Chaque source est liée à sa meilleure cible au-dessus du seuil"""
+    matcher = TraceabilityMatcher(StructuredARCADIAService(None)._extract_key_terms)
+    sources = [_logical("LC-1", "Radar Data Fusion"), _logical("LC-2", "Crew Display")]
+    targets = [_physical("PC-1", "Power Supply"), _physical("PC-2", "radar data fusion")]
+
+    scores = matcher.similarity_matrix(sources, targets, "name_only")
+    assert scores.shape == (2, 2)
+    assert scores[0, 1] == 1.0
+
+    matches = matcher.best_matches(sources, targets, "name_only", threshold=0.5)
+    assert [(source.id, target.id) for source, target, _ in matches] == [("LC-1", "PC-2")]
+
+
+def test_synonyms_contribute_to_name_similarity():
+    """Les synonymes du domaine ARCADIA rapprochent des noms sans mot commun"""
+    matcher = TraceabilityMatcher(StructuredARCADIAService(None)._extract_key_terms)
+    scores = matcher.similarity_matrix([_logical("LC-1", "monitor")], [_physical("PC-1", "surveillance")], "name_only")
+    assert scores[0, 0] >= 0.8
+
+
+def test_blocking_keeps_matches_and_prunes_unrelated_targets():
+    """Le blocage ne compare une source qu'aux cibles partageant des termes clés"""
+    extractor = StructuredARCADIAService(None)._extract_key_terms
+    sources = [_logical("LC-1", "Radar Data Fusion", "fuses radar tracks"),
+               _logical("LC-2", "Crew Display", "renders tactical situation")]
+    targets = [_physical("PC-1", "Power Supply", "distributes electrical power"),
+               _physical("PC-2", "radar fusion unit", "fuses radar tracks"),
+               _physical("PC-3", "Display Console", "renders tactical situation")]
+
+    full = TraceabilityMatcher(extractor).best_matches(sources, targets, "comprehensive", 0.3)
+    blocked_matcher = TraceabilityMatcher(extractor, blocking_min_pairs=0, max_candidates=2)
+    blocked = blocked_matcher.best_matches(sources, targets, "comprehensive", 0.3)
+
+    assert [(s.id, t.id) for s, t, _ in blocked] == [(s.id, t.id) for s, t, _ in full]
+    assert [(s.id, t.id) for s, t, _ in blocked] == [("LC-1", "PC-2"), ("LC-2", "PC-3")]
+
+
+def test_scores_match_reference_per_pair_scorer():
+    """Parité avec le calcul par paire d'origine : sous-chaînes, synonymes, racines, interfaces"""
+    matcher = TraceabilityMatcher(StructuredARCADIAService(None)._extract_key_terms)
+
+    names = matcher.text_similarity([left for left, _, _ in REFERENCE_NAME_SCORES],
+                                    [right for _, right, _ in REFERENCE_NAME_SCORES])
+    assert np.allclose(np.diag(names), [score for _, _, score in REFERENCE_NAME_SCORES], atol=1e-6)
+
+    operational = [
+        OperationalCapability(id="OC-1", name="Threat Monitoring", description="monitoring of airspace threats by radar operators",
+                              mission_statement="detect threats early", involved_actors=["OA-1"]),
+        OperationalCapability(id="OC-2", name="Mission Planning", description="planning the mission route and schedule",
+                              mission_statement="prepare missions")
+    ]
+    system = [
+        SystemCapability(id="SC-1", name="Threat Monitor", description="monitors airspace threats with radar data"),
+        SystemCapability(id="SC-2", name="Route Planner", description="computes mission routes"),
+        SystemCapability(id="SC-3", name="Operator Console", description="display for radar operators")
+    ]
+    assert np.allclose(matcher.similarity_matrix(operational, system, "comprehensive"),
+                       [[0.474454, 0.091765, 0.205412], [0.096562, 0.09, 0.12]], atol=1e-6)
+    assert np.allclose(matcher.similarity_matrix(operational, system, "functional"),
+                       [[0.142857, 0.0, 0.0], [0.05, 0.185417, 0.0]], atol=1e-6)
+
+    functions = [
+        LogicalFunction(id="LF-1", name="Filter Tracks", description="filters radar tracks", sub_functions=["F1", "F2"],
+                        input_interfaces=[{"type": "Data Flow"}, {"type": "control"}], output_interfaces=[{"type": "data"}]),
+        LogicalFunction(id="LF-2", name="Display Tracks", description="renders tracks",
+                        input_interfaces=[{"type": "data"}], output_interfaces=[{"type": "video"}])
+    ]
+    refined = [
+        LogicalFunction(id="LF-3", name="Track Filtering", description="track filtering",
+                        input_interfaces=[{"type": "data"}, {"type": "Control Command"}], output_interfaces=[{"type": "Data"}]),
+        LogicalFunction(id="LF-4", name="Render", description="rendering of situation", sub_functions=["F2", "F3", "F3"],
+                        input_interfaces=[{"type": "data"}], output_interfaces=[{"type": "video"}, {"type": "audio"}])
+    ]
+    assert np.allclose(matcher.similarity_matrix(functions, refined, "functional"),
+                       [[0.525, 0.175], [0.25, 0.75]], atol=1e-6)
+    assert np.allclose(matcher.similarity_matrix(functions, refined, "contextual"),
+                       [[0.159074, 0.112781], [0.128611, 0.06102]], atol=1e-6)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests du vectorstore NumPy en mémoire mappée
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.vector_store import NumpyVectorStore
+from src.core.embedding_service import NomicEmbeddingFunction
+from src.services.persistence_service import PersistenceService
+
+_VOCABULARY = ["radar", "sonar", "mission", "operator", "report"]
+
+
+def _embed(texts):
+    """Embedding déterministe : comptage des mots du vocabulaire"""
+    return [[float(text.lower().split().count(word)) for word in _VOCABULARY] for text in texts]
+
+
+def test_numpy_store_partitions_by_project(tmp_path):
+    store = NumpyVectorStore("test", _embed, root_path=str(tmp_path))
+    store.add(
+        documents=["radar radar mission", "sonar report", "radar operator"],
+        metadatas=[{"project_id": "p1", "chunk_index": 0}, {"project_id": "p1", "chunk_index": 1},
+                   {"project_id": "p2", "chunk_index": 0}],
+        ids=["a", "b", "c"]
+    )
+
+    results = store.query(query_texts=["radar"], n_results=5, where={"project_id": "p1"})
+    assert results["ids"] == [["a", "b"]]
+    assert results["distances"][0][0] < results["distances"][0][1]
+
+    assert store.query(query_texts=["radar operator"], n_results=1)["ids"] == [["c"]]
+    assert store.get(where={"project_id": "p2"})["ids"] == ["c"]
+    assert store.count() == 3
+
+
+def test_numpy_store_persists_and_deletes(tmp_path):
+    store = NumpyVectorStore("test", _embed, root_path=str(tmp_path))
+    store.add(documents=["radar", "sonar", "mission"], metadatas=[{"project_id": "p1"}] * 3, ids=["a", "b", "c"])
+    store.delete(ids=["b"])
+
+    reopened = NumpyVectorStore("test", _embed, root_path=str(tmp_path))
+    assert reopened.get()["ids"] == ["a", "c"]
+    assert reopened.query(query_texts=["mission"], n_results=1)["ids"] == [["c"]]
+
+    reopened.delete(where={"project_id": "p1"})
+    assert reopened.count() == 0
+
+
+def test_numpy_store_recovers_from_interrupted_append(tmp_path):
+    """Vecteurs écrits sans leurs enregistrements : tronqués au rechargement"""
+    store = NumpyVectorStore("test", _embed, root_path=str(tmp_path))
+    store.add(documents=["radar", "sonar"], metadatas=[{"project_id": "p1"}] * 2, ids=["a", "b"])
+
+    partition = store._partitions["p1"]
+    with open(partition.vectors_path, "ab") as f:
+        f.write(np.ones((2, len(_VOCABULARY)), dtype=np.float32).tobytes())
+    with open(partition.records_path, "a", encoding="utf-8") as f:
+        f.write('{"id": "x", "key"')
+
+    reopened = NumpyVectorStore("test", _embed, root_path=str(tmp_path))
+    assert reopened.get()["ids"] == ["a", "b"]
+    reopened.add(documents=["mission"], metadatas=[{"project_id": "p1"}], ids=["c"])
+
+    results = NumpyVectorStore("test", _embed, root_path=str(tmp_path)).query(query_texts=["mission"], n_results=1)
+    assert results["ids"] == [["c"]]
+    assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-6)
+
+
+class _FakeEmbedClient:
+    def __init__(self):
+        self.texts = []
+
+    def embed(self, model, input):
+        self.texts.extend(input)
+        return {"embeddings": _embed(input)}
+
+
+def test_query_embeddings_bypass_the_embedding_cache(tmp_path):
+    persistence = PersistenceService(db_path=str(tmp_path / "test.db"))
+    client = _FakeEmbedClient()
+    embedding_function = NomicEmbeddingFunction(client, model="nomic", embedding_cache=persistence)
+    store = NumpyVectorStore("test", embedding_function, root_path=str(tmp_path))
+
+    store.add(documents=["radar mission", "sonar"], metadatas=[{"project_id": "p1"}] * 2, ids=["a", "b"])
+    assert store.query(query_texts=["radar"], n_results=1)["ids"] == [["a"]]
+
+    hashes = [persistence.compute_content_hash(text) for text in ["radar mission", "sonar", "radar"]]
+    assert set(persistence.get_cached_embeddings("nomic", hashes)) == set(hashes[:2])
+    # Documents déjà embeddés : servis par le cache ; requête répétée : recalculée
+    store.query(query_texts=["radar"], n_results=1)
+    embedding_function(["radar mission"])
+    assert client.texts == ["radar mission", "sonar", "radar", "radar"]
+
+
+def test_numpy_store_drops_project_partition(tmp_path):
+    store = NumpyVectorStore("test", _embed, root_path=str(tmp_path))
+    store.add(documents=["radar", "sonar", "mission"],
+              metadatas=[{"project_id": "p1"}, {"project_id": "p1"}, {"project_id": "p2"}], ids=["a", "b", "c"])
+
+    store.drop_partition("p1")
+    assert not (tmp_path / "test" / "p1").exists()
+    assert store.get()["ids"] == ["c"]
+    assert NumpyVectorStore("test", _embed, root_path=str(tmp_path)).count() == 1
+
+
+def test_numpy_store_queries_during_deletes(tmp_path):
+    """Requêtes concurrentes pendant les compactages : aucune erreur, fichiers cohérents"""
+    store = NumpyVectorStore("test", _embed, root_path=str(tmp_path))
+    ids = [f"c{i}" for i in range(220)]
+    store.add(documents=[f"radar {'sonar ' * (i % 5)}" for i in range(220)],
+              metadatas=[{"project_id": "p1"}] * 220, ids=ids)
+
+    errors = []
+    done = threading.Event()
+
+    def query_loop():
+        try:
+            while not done.is_set():
+                results = store.query(query_texts=["radar sonar"], n_results=10, where={"project_id": "p1"})
+                assert len(results["ids"][0]) == len(results["documents"][0]) == len(results["metadatas"][0])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=query_loop) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for chunk_id in ids[:200]:
+        store.delete(ids=[chunk_id])
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    partition_files = sorted(path.name for path in (tmp_path / "test" / "p1").iterdir())
+    assert len(partition_files) == 2 and "records.jsonl" in partition_files
+    assert NumpyVectorStore("test", _embed, root_path=str(tmp_path)).get()["ids"] == ids[200:]
+
+
+def test_faiss_store_incremental_and_persisted(tmp_path):
+    pytest.importorskip("faiss")
+    from src.core.faiss_vector_store import FaissVectorStore
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(300, 16)).astype(np.float32)
+    ids = [f"c{i}" for i in range(300)]
+
+    store = FaissVectorStore("test", _embed, root_path=str(tmp_path), nprobe=4, min_ivf_size=200, save_every=50)
+    store.add(["doc"] * 250, [{"project_id": "p1"}] * 250, ids[:250], embeddings=vectors[:250])
+    assert store.query(query_embeddings=[vectors[10]], n_results=1, where={"project_id": "p1"})["ids"] == [["c10"]]
+
+    # Ajouts et suppressions incrémentaux sur l'index chargé
+    store.add(["doc"] * 50, [{"project_id": "p1"}] * 50, ids[250:], embeddings=vectors[250:])
+    store.delete(ids=["c10"])
+    assert "c10" not in store.query(query_embeddings=[vectors[10]], n_results=5)["ids"][0]
+
+    # Rechargement paresseux depuis les fichiers persistés
+    reopened = FaissVectorStore("test", _embed, root_path=str(tmp_path), nprobe=64, min_ivf_size=200)
+    assert reopened.query(query_embeddings=[vectors[280]], n_results=1)["ids"] == [["c280"]]
+    assert reopened.index_stats()["p1"] == {"kind": "ivf", "vectors": 299, "unsaved": 0}
+
+
+def test_faiss_index_built_from_snapshot_catches_up_and_defers_delete_saves(tmp_path):
+    pytest.importorskip("faiss")
+    from src.core.faiss_vector_store import FaissVectorStore
+
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(300, 16)).astype(np.float32)
+    ids = [f"c{i}" for i in range(300)]
+
+    store = FaissVectorStore("test", _embed, root_path=str(tmp_path), nprobe=64, min_ivf_size=200, save_every=100)
+    store.add(["doc"] * 250, [{"project_id": "p1"}] * 250, ids[:250], embeddings=vectors[:250])
+    with store._lock:
+        view = store._partitions["p1"].snapshot()
+
+    # Lignes ajoutées pendant la construction de l'index : ajoutées à l'installation
+    store.add(["doc"] * 50, [{"project_id": "p1"}] * 50, ids[250:], embeddings=vectors[250:])
+    state = store._index_for(view)
+    assert state.index.ntotal == 300
+    assert store.query(query_embeddings=[vectors[290]], n_results=1)["ids"] == [["c290"]]
+
+    # Une suppression ne réécrit pas le fichier d'index ; le rechargement reconstruit l'index
+    index_file = tmp_path / "test" / "p1" / "index.faiss"
+    saved = index_file.stat().st_mtime_ns
+    store.delete(ids=["c290"])
+    assert index_file.stat().st_mtime_ns == saved
+    reopened = FaissVectorStore("test", _embed, root_path=str(tmp_path), nprobe=64, min_ivf_size=200)
+    assert "c290" not in reopened.query(query_embeddings=[vectors[290]], n_results=5)["ids"][0]
+    assert reopened.index_stats()["p1"]["vectors"] == 299
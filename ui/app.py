@@ -5,6 +5,7 @@ import sys
 from pathlib import Path
 from datetime import datetime
 import time
+import uuid
 
 # Add the project root to Python path for proper imports
 project_root = Path(__file__).parent.parent
@@ -12,6 +13,8 @@ sys.path.insert(0, str(project_root))
 
 from src.core.rag_system import SAFEMBSERAGSystem
 from src.core.enhanced_structured_rag_system import EnhancedStructuredRAGSystem
+from src.core.chat_streaming import ChatTurnMetrics, collect_answer, static_answer_events, stream_chat_answer
+from src.services.llm_gateway import llm_priority
 from src.services.evaluation_service import EvaluationService
 from config import config, arcadia_config
 import pandas as pd
@@ -551,6 +554,23 @@ MBSE_CONTEXT_PROMPTS = {
     "traceability": "Consider traceability links between different architectural levels."
 }
 
+def start_structured_analysis():
+    """Return the structured analysis id to run, reusing the one of an interrupted run"""
+    resuming = 'arcadia_analysis_id' in st.session_state
+    if not resuming:
+        # Conservé en session avant le lancement : une exécution interrompue reprendra ses phases terminées
+        st.session_state['arcadia_analysis_id'] = str(uuid.uuid4())
+    else:
+        st.info("Resuming the interrupted structured analysis: completed phases are reused")
+    return st.session_state['arcadia_analysis_id']
+
+def finish_structured_analysis(results):
+    """Forget the analysis id once every phase completed (its checkpoints are gone)"""
+    structured_analysis = results.get('structured_analysis')
+    metadata = getattr(structured_analysis, 'generation_metadata', None) or {}
+    if structured_analysis is not None and not metadata.get('resumable', False):
+        st.session_state.pop('arcadia_analysis_id', None)
+
 # Initialize services
 @st.cache_resource
 def init_services(use_enhanced=True):
@@ -1202,8 +1222,10 @@ def generate_requirements_tab(rag_system, target_phase, req_types, export_format
                         target_phase=target_phase,
                         requirement_types=req_types,
                         enable_structured_analysis=enable_structured_analysis,
-                        enable_cross_phase_analysis=enable_cross_phase_analysis
+                        enable_cross_phase_analysis=enable_cross_phase_analysis,
+                        analysis_id=start_structured_analysis() if enable_structured_analysis else None
                     )
+                    finish_structured_analysis(results)
                     # Store enhanced results for the new tab
                     st.session_state['enhanced_results'] = results
                     logger.info(f"Enhanced generation completed - Traditional requirements: {len(results.get('requirements', {}))}")
@@ -2564,6 +2586,8 @@ def chat_tab(rag_system):
                             {message["content"]}
                         </div>
                         """, unsafe_allow_html=True)
+                        if message.get("metrics"):
+                            st.caption(_format_turn_metrics(message["metrics"]))
                         
                         # Show context sources if available
                         if "context" in message and message["context"]:
@@ -2601,8 +2625,13 @@ def chat_tab(rag_system):
                         mbse_context = st.session_state.get('mbse_context', 'None')
                         enhanced_prompt = get_enhanced_prompt(user_prompt, mbse_context)
                         
-                        # Use RAG system to generate response
-                        response_data = rag_system.query_documents(enhanced_prompt)
+                        # Use RAG system to generate response, streamed token by token when supported.
+                        # Chat calls are interactive: they overtake queued generation/extraction calls.
+                        with llm_priority("interactive"):
+                            if hasattr(rag_system, 'query_documents_stream'):
+                                response_data = _render_answer_stream(rag_system.query_documents_stream(enhanced_prompt))
+                            else:
+                                response_data = rag_system.query_documents(enhanced_prompt)
                         
                         if isinstance(response_data, dict):
                             response = response_data.get('answer', 'I apologize, but I could not generate a response.')
@@ -2618,6 +2647,7 @@ def chat_tab(rag_system):
                             "role": "assistant",
                             "content": response,
                             "context": [{"content": doc.page_content, "metadata": doc.metadata} for doc in context_docs] if context_docs else [],
+                            "metrics": response_data.get('metrics', {}) if isinstance(response_data, dict) else {},
                             "timestamp": datetime.now().isoformat()
                         })
                         
@@ -4282,6 +4312,40 @@ def process_documents_with_duplicate_detection(rag_system, current_project, uplo
         status_text.empty()
         progress_bar.empty()
 
+def _render_answer_stream(events):
+    """
+    Display a streamed chat answer while the model generates it
+    
+    Returns:
+        Dict with 'answer', 'sources' and 'metrics' keys
+    """
+    placeholder = st.empty()
+    last_render = [0.0]
+    
+    def show_partial(text):
+        # Limit UI refreshes to ~20 per second
+        now = time.monotonic()
+        if now - last_render[0] >= 0.05:
+            placeholder.markdown(f"""
+            <div class="chat-message assistant-message">
+                <strong>Assistant:</strong><br>
+                {text} ▌
+            </div>
+            """, unsafe_allow_html=True)
+            last_render[0] = now
+    
+    result = collect_answer(events, on_text=show_partial)
+    placeholder.empty()
+    return result
+
+
+def _format_turn_metrics(metrics):
+    """Short latency caption of a chat turn"""
+    if not metrics:
+        return ""
+    return f"First token {metrics['ttft_ms'] / 1000:.1f}s • total {metrics['total_ms'] / 1000:.1f}s"
+
+
 def _query_project_documents_robust(rag_system, user_prompt, project_id, project_name, ready_docs):
     """
     Robust project-specific document query with similarity search on stored chunks
@@ -4294,8 +4358,20 @@ def _query_project_documents_robust(rag_system, user_prompt, project_id, project
         ready_docs: List of ready/processed documents
     
     Returns:
-        Dict with 'answer' and 'sources' keys
+        Dict with 'answer', 'sources' and 'metrics' keys
+    """
+    return collect_answer(_stream_project_documents(rag_system, user_prompt, project_id, project_name, ready_docs))
+
+
+def _stream_project_documents(rag_system, user_prompt, project_id, project_name, ready_docs):
     """
+    Streaming variant of _query_project_documents_robust
+    
+    Yields the events of src.core.chat_streaming: the sources once retrieval
+    is done, then the answer tokens as the model generates them, then a
+    "done" event carrying the turn latency metrics.
+    """
+    metrics = ChatTurnMetrics()
     try:
         # Method 1: Try dedicated project query method (preferred)
         if hasattr(rag_system, 'query_project_documents'):
@@ -4305,20 +4381,36 @@ def _query_project_documents_robust(rag_system, user_prompt, project_id, project
             # Validate response format
             if isinstance(response_data, dict) and response_data.get('answer'):
                 logger.info("✅ Project query successful")
-                return response_data
+                yield from static_answer_events(response_data['answer'], response_data.get('sources', []), metrics)
+                return
             else:
                 logger.warning("Project query returned invalid format, falling back")
         
+        # Prompt and sources of the answer to stream, from the first method that finds context
+        chat_request = None
+        
         # Method 2: Enhanced ChromaDB similarity search with project filter
         if hasattr(rag_system, 'collection'):
             logger.info(f"🔍 Performing similarity search for project {project_id}")
             try:
-                # Query with project filter for similarity search
-                chroma_results = rag_system.collection.query(
-                    query_texts=[user_prompt],
-                    n_results=10,  # Get more results for better similarity filtering
-                    where={"project_id": project_id}
-                )
+                # Reuse cached results for repeated questions (invalidated when project content changes)
+                retrieval_cache = getattr(rag_system, 'retrieval_cache', None)
+                content_version = None
+                generation = retrieval_cache.generation(project_id) if retrieval_cache is not None else None
+                if retrieval_cache is not None and hasattr(rag_system, 'persistence_service'):
+                    content_version = rag_system.persistence_service.get_project_content_version(project_id)
+                chroma_results = retrieval_cache.get(project_id, user_prompt, content_version, source="chroma", n_results=10) if retrieval_cache else None
+                
+                if chroma_results is None:
+                    # Query with project filter for similarity search
+                    chroma_results = rag_system.collection.query(
+                        query_texts=[user_prompt],
+                        n_results=10,  # Get more results for better similarity filtering
+                        where={"project_id": project_id}
+                    )
+                    if retrieval_cache is not None:
+                        retrieval_cache.put(project_id, user_prompt, chroma_results, content_version,
+                                            generation=generation, source="chroma", n_results=10)
                 
                 # Build response from ChromaDB results with similarity scoring
                 if chroma_results.get('documents') and chroma_results['documents'][0]:
@@ -4368,37 +4460,37 @@ IMPORTANT:
 
 Question: {user_prompt}"""
                         
-                        response = rag_system.ollama_client.chat(
-                            model="llama3:instruct",
-                            messages=[{"role": "user", "content": project_prompt}]
-                        )
-                        
-                        logger.info(f"✅ ChromaDB similarity search successful - used {len(relevant_docs)} chunks")
-                        return {
-                            'answer': response["message"]["content"],
-                            'sources': relevant_docs
-                        }
+                        chat_request = (project_prompt, relevant_docs)
+                        logger.info(f"✅ ChromaDB similarity search successful - using {len(relevant_docs)} chunks")
             except Exception as chroma_error:
                 logger.warning(f"ChromaDB similarity search failed: {str(chroma_error)}")
         
         # Method 3: Persistence service similarity search (for systems with stored chunks)
-        if hasattr(rag_system, 'persistence_service') and ready_docs:
+        if chat_request is None and hasattr(rag_system, 'persistence_service') and ready_docs:
             logger.info(f"🔍 Performing manual similarity search on stored chunks for project {project_id}")
             try:
-                # Get stored chunks from persistence service
-                project_chunks = rag_system.persistence_service.get_project_chunks(project_id)
+                persistence_service = rag_system.persistence_service
+                ready_filenames = [doc.filename for doc in ready_docs]
+                
+                if hasattr(persistence_service, 'search_chunks'):
+                    # BM25 full-text search inside SQLite
+                    project_chunks = persistence_service.search_chunks(project_id, user_prompt, limit=20)
+                else:
+                    project_chunks = persistence_service.get_project_chunks(project_id)
                 
                 if project_chunks:
                     # Filter chunks by ready documents
-                    ready_filenames = [doc.filename for doc in ready_docs]
                     ready_chunks = [
                         chunk for chunk in project_chunks 
                         if chunk.get('metadata', {}).get('source_filename') in ready_filenames
                     ]
                     
                     if ready_chunks:
-                        # Perform similarity search on chunks
-                        similar_chunks = _calculate_chunk_similarity(user_prompt, ready_chunks)
+                        # Perform similarity search on chunks (already ranked by the full-text index)
+                        if hasattr(persistence_service, 'search_chunks'):
+                            similar_chunks = ready_chunks
+                        else:
+                            similar_chunks = _calculate_chunk_similarity(user_prompt, ready_chunks)
                         
                         if similar_chunks:
                             # Use top similar chunks for context
@@ -4421,11 +4513,6 @@ IMPORTANT:
 
 Question: {user_prompt}"""
                             
-                            response = rag_system.ollama_client.chat(
-                                model="llama3:instruct",
-                                messages=[{"role": "user", "content": project_prompt}]
-                            )
-                            
                             # Create mock sources for display
                             mock_sources = []
                             for chunk in top_chunks:
@@ -4434,34 +4521,37 @@ Question: {user_prompt}"""
                                     'metadata': chunk['metadata']
                                 })())
                             
-                            logger.info(f"✅ Manual similarity search successful - used {len(top_chunks)} chunks")
-                            return {
-                                'answer': response["message"]["content"],
-                                'sources': mock_sources
-                            }
+                            chat_request = (project_prompt, mock_sources)
+                            logger.info(f"✅ Manual similarity search successful - using {len(top_chunks)} chunks")
             except Exception as manual_error:
                 logger.warning(f"Manual similarity search failed: {str(manual_error)}")
         
+        if chat_request is not None:
+            project_prompt, sources = chat_request
+            yield from stream_chat_answer(
+                rag_system.ollama_client,
+                "llama3:instruct",
+                [{"role": "user", "content": project_prompt}],
+                sources,
+                metrics
+            )
+            return
+        
         # Method 4: Fallback - inform user about document availability
         logger.warning("No similarity search method available")
         
         if ready_docs:
             doc_list = ", ".join([doc.filename for doc in ready_docs])
-            return {
-                'answer': f"I have access to {len(ready_docs)} documents in project '{project_name}': {doc_list}. However, I need a properly configured similarity search system to answer questions about their content. Please ensure your RAG system supports project-specific document queries.",
-                'sources': []
-            }
+            answer = f"I have access to {len(ready_docs)} documents in project '{project_name}': {doc_list}. However, I need a properly configured similarity search system to answer questions about their content. Please ensure your RAG system supports project-specific document queries."
         else:
-            return {
-                'answer': f"No processed documents are available in project '{project_name}'. Please upload and process documents first before asking questions.",
-                'sources': []
-            }
+            answer = f"No processed documents are available in project '{project_name}'. Please upload and process documents first before asking questions."
+        yield from static_answer_events(answer, [], metrics)
     
     except Exception as e:
         logger.error(f"Error in robust project query: {str(e)}")
-        return {
-            'answer': f"I encountered an error while searching the project documents: {str(e)}. Please try again or contact support if the issue persists.",
-            'sources': []
+        yield {
+            "type": "error",
+            "message": f"I encountered an error while searching the project documents: {str(e)}. Please try again or contact support if the issue persists."
         }
 
 
@@ -4817,11 +4907,16 @@ def _refresh_project_data_safely(rag_system, project_id):
             # Clear ChromaDB entries if available
             if hasattr(rag_system, 'collection'):
                 try:
-                    # Delete from ChromaDB
-                    chroma_results = rag_system.collection.get(where={"project_id": project_id})
-                    if chroma_results.get('ids'):
-                        rag_system.collection.delete(ids=chroma_results['ids'])
-                        logger.info(f"Deleted {len(chroma_results['ids'])} ChromaDB entries")
+                    if hasattr(rag_system.collection, 'drop_partition'):
+                        # Per-project partition: dropped without listing its vectors
+                        rag_system.collection.drop_partition(project_id)
+                        logger.info(f"Dropped vector partition of project {project_id}")
+                    else:
+                        # Delete from ChromaDB
+                        chroma_results = rag_system.collection.get(where={"project_id": project_id})
+                        if chroma_results.get('ids'):
+                            rag_system.collection.delete(ids=chroma_results['ids'])
+                            logger.info(f"Deleted {len(chroma_results['ids'])} ChromaDB entries")
                 except Exception as chroma_error:
                     logger.warning(f"ChromaDB deletion error: {str(chroma_error)}")
             
@@ -5122,6 +5217,8 @@ def project_documents_tab(rag_system, current_project, has_project_management):
                             {message["content"]}
                         </div>
                         """, unsafe_allow_html=True)
+                        if message.get("metrics"):
+                            st.caption(_format_turn_metrics(message["metrics"]))
                         
                         # Show context sources if available (project-specific)
                         if "context" in message and message["context"]:
@@ -5256,9 +5353,10 @@ def project_documents_tab(rag_system, current_project, has_project_management):
                 # Generate response with project-specific context
                 with st.spinner(f"Analyzing {current_project.name} documents and generating response..."):
                     try:
-                        response_data = _query_project_documents_robust(
-                            rag_system, user_prompt, project_id, current_project.name, ready_docs
-                        )
+                        with llm_priority("interactive"):
+                            response_data = _render_answer_stream(_stream_project_documents(
+                                rag_system, user_prompt, project_id, current_project.name, ready_docs
+                            ))
                         
                         # Extract response and context with better error handling
                         if isinstance(response_data, dict):
@@ -5286,6 +5384,7 @@ def project_documents_tab(rag_system, current_project, has_project_management):
                             "role": "assistant",
                             "content": response,
                             "context": [{"content": doc.page_content, "metadata": doc.metadata} for doc in context_docs] if context_docs else [],
+                            "metrics": response_data.get('metrics', {}) if isinstance(response_data, dict) else {},
                             "timestamp": datetime.now().isoformat(),
                             "project_id": project_id,
                             "project_name": current_project.name
@@ -5782,8 +5881,10 @@ def requirements_analysis_tab(rag_system, eval_service, target_phase, req_types,
                         target_phase=target_phase_local,
                         requirement_types=req_types_local,
                         enable_structured_analysis=enable_structured_analysis_local,
-                        enable_cross_phase_analysis=enable_cross_phase_analysis_local
+                        enable_cross_phase_analysis=enable_cross_phase_analysis_local,
+                        analysis_id=start_structured_analysis() if enable_structured_analysis_local else None
                     )
+                    finish_structured_analysis(results)
                     # Store enhanced results
                     st.session_state['enhanced_results'] = results
                 else:
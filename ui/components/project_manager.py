@@ -39,9 +39,10 @@ class ProjectManager:
             
         st.sidebar.markdown("## 🗂️ Project Management")
         
-        # Get all projects
+        # Get all projects (lightweight listing when available)
         try:
-            projects = self.rag_system.get_all_projects()
+            list_projects = getattr(self.rag_system, 'list_projects', self.rag_system.get_all_projects)
+            projects = list_projects()
         except Exception as e:
             st.sidebar.error(f"❌ Error retrieving projects: {str(e)}")
             return None